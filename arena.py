@@ -0,0 +1,139 @@
+from lexer import lexer
+from parse import parser
+from classes import *
+
+
+INT, VARIABLE, FUNC_EXE, OPERATION, ASSIGN, PRINT, IF_WHILE, FUNC_DEF = range(8)
+
+SPECIES = tuple(TokenSpecies)
+
+
+class NodeArena(Frozen):
+    """ An ast kept as columns of arrays in which nodes refer to each other by index instead of by reference.
+    Node i has kind kinds[i] and position positions[i], what firsts[i], seconds[i] and thirds[i] mean depends on the kind.
+    Names and numbers are indexes in strings, a list of nodes or names is an index in lists where its length is
+    followed by its elements. Children come before their parents and roots are the indexes of the FuncDefNodes. """
+    __slots__ = ("kinds", "positions", "firsts", "seconds", "thirds", "lists", "strings", "roots")
+
+    def __init__(self, kinds: array, positions: array, firsts: array, seconds: array, thirds: array, lists: array,
+                 strings: Tuple[str, ...], roots: Tuple[int, ...]):
+        """ Init for NodeArena, the arrays are not copied and shouldn't be changed anymore. """
+        self._set(kinds=kinds, positions=positions, firsts=firsts, seconds=seconds, thirds=thirds, lists=lists,
+                  strings=tuple(strings), roots=tuple(roots))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> Type[Node]:
+        """ Returns node index as a Node object together with all nodes under it. """
+        return node_at(self, index)
+
+    def nbytes(self) -> int:
+        """ Returns the amount of bytes in the columns, without the strings. """
+        columns = (self.kinds, self.positions, self.firsts, self.seconds, self.thirds, self.lists)
+        return sum(map(lambda column: column.itemsize * len(column), columns))
+
+    def __str__(self) -> str:
+        return f"NodeArena with {len(self)} nodes in {self.nbytes()} bytes"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# list_at :: NodeArena -> int -> Tuple[int, ...]
+@deepcopy_decorator
+def list_at(arena: NodeArena, offset: int) -> Tuple[int, ...]:
+    """ Returns the elements of the list that starts at offset in lists. """
+    return tuple(arena.lists[offset + 1:offset + 1 + arena.lists[offset]])
+
+
+# node_at :: NodeArena -> int -> Type[Node]
+@deepcopy_decorator
+def node_at(arena: NodeArena, index: int) -> Type[Node]:
+    """ Creates the Node object of node index in the arena. """
+    kind, pos = arena.kinds[index], arena.positions[index]
+    first, second, third = arena.firsts[index], arena.seconds[index], arena.thirds[index]
+
+    def nodes(offset: int) -> Tuple[Type[Node], ...]:
+        return tuple(map(lambda child: node_at(arena, child), list_at(arena, offset)))
+
+    if kind == INT:
+        return IntNode(Token(TokenSpecies.DIGIT, arena.strings[first], pos))
+    elif kind == VARIABLE:
+        return VariableNode(Token(TokenSpecies.ID, arena.strings[first], pos))
+    elif kind == FUNC_EXE:
+        return FuncExeNode(Token(TokenSpecies.ID, arena.strings[first], pos), nodes(second))
+    elif kind == OPERATION:
+        return OperationNode(node_at(arena, first), Token(SPECIES[third], "", pos), node_at(arena, second))
+    elif kind == ASSIGN:
+        return AssignNode(Token(TokenSpecies.ID, arena.strings[first], pos), node_at(arena, second))
+    elif kind == PRINT:
+        return PrintNode(nodes(second), pos)
+    elif kind == IF_WHILE:
+        return IfWhileNode(node_at(arena, first), nodes(second), bool(third))
+    params = tuple(map(lambda string: arena.strings[string], list_at(arena, third)))
+    return FuncDefNode(Token(TokenSpecies.ID, arena.strings[first], pos), params, nodes(second))
+
+
+# to_arena :: Tuple[FuncDefNode, ...] -> NodeArena
+@deepcopy_decorator
+def to_arena(ast: Tuple[FuncDefNode, ...]) -> NodeArena:
+    """ Stores the ast in a NodeArena, every distinct name or number is stored once. """
+    kinds, positions, firsts, seconds, thirds = array("B"), array("I"), array("i"), array("i"), array("i")
+    lists = array("i")
+    strings = {}
+
+    def string(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    def add_list(elements: Tuple[int, ...]) -> int:
+        lists.append(len(elements))
+        lists.extend(elements)
+        return len(lists) - len(elements) - 1
+
+    def add(kind: int, pos: int, first: int = 0, second: int = 0, third: int = 0) -> int:
+        kinds.append(kind)
+        positions.append(pos)
+        firsts.append(first)
+        seconds.append(second)
+        thirds.append(third)
+        return len(kinds) - 1
+
+    def add_node(node: Type[Node]) -> int:
+        if isinstance(node, IntNode):
+            return add(INT, node.pos, string(node.value))
+        elif isinstance(node, VariableNode):
+            return add(VARIABLE, node.pos, string(node.name))
+        elif isinstance(node, FuncExeNode):
+            return add(FUNC_EXE, node.pos, string(node.name), add_list(tuple(map(add_node, node.params))))
+        elif isinstance(node, OperationNode):
+            return add(OPERATION, node.pos, add_node(node.lhs), add_node(node.rhs), SPECIES.index(node.operator))
+        elif isinstance(node, AssignNode):
+            return add(ASSIGN, node.pos, string(node.name), add_node(node.value))
+        elif isinstance(node, PrintNode):
+            return add(PRINT, node.pos, 0, add_list(tuple(map(add_node, node.value))))
+        elif isinstance(node, IfWhileNode):
+            return add(IF_WHILE, node.pos, add_node(node.condition), add_list(tuple(map(add_node, node.actions))), int(node.is_while))
+        params = add_list(tuple(map(string, node.params)))
+        return add(FUNC_DEF, node.pos, string(node.name), add_list(tuple(map(add_node, node.actions))), params)
+
+    roots = tuple(map(add_node, ast))
+    return NodeArena(kinds, positions, firsts, seconds, thirds, lists, tuple(strings.keys()), roots)
+
+
+# from_arena :: NodeArena -> Tuple[FuncDefNode, ...]
+@deepcopy_decorator
+def from_arena(arena: NodeArena) -> Tuple[FuncDefNode, ...]:
+    """ Creates the FuncDefNodes of the ast that is stored in the arena. """
+    return FrozenTuple(map(lambda root: node_at(arena, root), arena.roots))
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    tokenized_code = lexer(file_content)
+    arena = to_arena(parser(tokenized_code))
+    print(arena)
+    print(from_arena(arena))
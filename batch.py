@@ -0,0 +1,96 @@
+from main import worse_file
+from runner import Limits
+from sinks import BytesSink
+from classes import *
+from multiprocessing import Pool
+import glob
+import json
+import os
+import sys
+import time
+
+
+# A program to run as (filename, is_morse, to_compile, target, limits).
+Job = Tuple[str, bool, bool, str, Limits]
+
+
+# read_manifest :: str -> bool -> Tuple[Tuple[str, bool], ...]
+@deepcopy_decorator
+def read_manifest(manifest: str, is_morse: bool) -> Tuple[Tuple[str, bool], ...]:
+    """ Reads a manifest with a filename on every line, optionally followed by y or n for whether it is morse.
+    Filenames are relative to the manifest, empty lines and lines starting with # are skipped. """
+    file = open(manifest)
+    lines = file.read().splitlines()
+    file.close()
+
+    directory = os.path.dirname(manifest)
+    entries = map(str.split, filter(lambda line: line.strip() and not line.lstrip().startswith("#"), lines))
+    return tuple(map(lambda entry: (os.path.join(directory, entry[0]), entry[1] == "y" if len(entry) > 1 else is_morse), entries))
+
+
+# collect_programs :: str -> bool -> Tuple[Tuple[str, bool], ...]
+@deepcopy_decorator
+def collect_programs(target: str, is_morse: bool) -> Tuple[Tuple[str, bool], ...]:
+    """ Returns the programs that target names with whether they are morse. Target is a directory of which every
+    file is a program, a glob pattern or a manifest. """
+    if os.path.isdir(target):
+        filenames = map(lambda name: os.path.join(target, name), sorted(os.listdir(target)))
+        return tuple(map(lambda filename: (filename, is_morse), filter(os.path.isfile, filenames)))
+    elif os.path.isfile(target):
+        return read_manifest(target, is_morse)
+    return tuple(map(lambda filename: (filename, is_morse), filter(os.path.isfile, sorted(glob.glob(target)))))
+
+
+# run_job :: Job -> Dict[str, Any]
+def run_job(job: Job) -> Dict[str, Any]:
+    """ Runs one program with its own sink and returns its result, output and error as a dict that can be JSON.
+    The output of a failed program ends with the reason it failed, which is also given as error. """
+    filename, is_morse, to_compile, target, limits = job
+    sink = BytesSink()
+    start = time.perf_counter()
+    cache_dir = os.path.join(os.path.dirname(filename), "__worsecache__")
+    try:
+        result = worse_file(filename, is_morse, to_compile, target, True, cache_dir, sink, None, limits)
+        output = sink.getvalue().decode()
+        error = output.splitlines()[-1] if result is None and output else None
+    except Exception as e:
+        # Errors the interpreter doesn't report itself, like a missing file, shouldn't stop the other programs.
+        result, output, error = None, sink.getvalue().decode(), f"{type(e).__name__}: {e}"
+    return {"file": filename, "morse": is_morse, "result": result, "output": output, "error": error,
+            "seconds": time.perf_counter() - start}
+
+
+# batch :: Tuple[Job, ...] -> int -> Callable[[Dict[str, Any]], None] -> int
+def batch(jobs: Tuple[Job, ...], workers: int, report: Callable[[Dict[str, Any]], None]) -> int:
+    """ Runs the jobs on a pool of workers processes and calls report with every result in the order of jobs,
+    as soon as it is known. Returns the amount of programs that failed. Jobs are handed out a few at a time, so
+    every worker stays busy without sending every program on its own. """
+    chunksize = max(1, len(jobs) // (workers * 8))
+    if workers == 1:
+        results = map(run_job, jobs)
+        return sum(map(lambda result: (report(result), result["error"] is not None)[1], results))
+    with Pool(workers) as pool:
+        results = pool.imap(run_job, jobs, chunksize)
+        return sum(map(lambda result: (report(result), result["error"] is not None)[1], results))
+
+
+if __name__ == "__main__":
+    # python batch.py <directory|glob|manifest> <y|n> [y|py] [--workers=N] [--output=results.jsonl]
+    #                 [--fuel=STEPS] [--depth=CALLS] [--seconds=SECONDS]
+    options = dict(map(lambda arg: arg[2:].split("=", 1), filter(lambda arg: arg.startswith("--"), sys.argv)))
+    _, target, do_morse, *do_compile = filter(lambda arg: not arg.startswith("--"), sys.argv)
+
+    programs = collect_programs(target, do_morse == "y")
+    limits = Limits(int(options["fuel"]) if "fuel" in options else None, int(options["depth"]) if "depth" in options else None,
+                    float(options["seconds"]) if "seconds" in options else None)
+    jobs = tuple(map(lambda program: (program[0], program[1], do_compile in (["y"], ["py"]),
+                                      "python" if do_compile == ["py"] else "vm", limits), programs))
+    workers = int(options.get("workers", os.cpu_count() or 1))
+
+    output = open(options["output"], "w") if "output" in options else sys.stdout
+    start = time.perf_counter()
+    failed = batch(jobs, workers, lambda result: output.write(json.dumps(result) + "\n"))
+    if output is not sys.stdout:
+        output.close()
+    print(f"Ran {len(jobs)} programs on {workers} workers in {time.perf_counter() - start:.3f}s, {failed} failed",
+          file=sys.stderr)
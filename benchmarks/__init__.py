@@ -0,0 +1,3 @@
+""" Benchmarks for the Worse interpreter, run them from the root of the repository with python -m benchmarks.<name>.
+benchmarks.harness times every stage on the programs of benchmarks.corpus and writes the results as JSON,
+benchmarks.compare shows the differences between two of those files. """
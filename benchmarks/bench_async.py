@@ -0,0 +1,58 @@
+from lexer import lexer
+from parse import parser
+from runner import runner, async_runner, MemoCache, NO_LIMITS
+from purity import pure_functions
+from sinks import DiscardSink
+from benchmarks.harness import timed
+import asyncio
+import time
+
+
+COUNT = """
+?main()
+    i = 0;
+    while(i =: 2000)
+        i = i + 1;
+    ;
+    sos = i;
+;
+"""
+
+
+# time_serial :: Tuple[FuncDefNode, ...] -> int -> float
+def time_serial(ast: tuple, programs: int) -> float:
+    """ Times running the program programs times one after another with the blocking runner. """
+    return timed(lambda: tuple(map(lambda _: runner(ast, "main", MemoCache(pure_functions(ast)), DiscardSink()), range(programs))))[1]
+
+
+# time_concurrent :: Tuple[FuncDefNode, ...] -> int -> int -> Tuple[float, float]
+def time_concurrent(ast: tuple, programs: int, interval: int) -> tuple:
+    """ Times running the program programs times at once in one event loop. Also returns the longest round, the
+    time between two turns of a task that only yields, in which every program has had a turn. """
+    async def run_all() -> float:
+        waits = []
+
+        async def watch() -> None:
+            while True:
+                before = time.perf_counter()
+                await asyncio.sleep(0)
+                waits.append(time.perf_counter() - before)
+
+        watcher = asyncio.create_task(watch())
+        await asyncio.gather(*map(lambda _: async_runner(ast, "main", MemoCache(pure_functions(ast)), DiscardSink(), NO_LIMITS, interval),
+                                  range(programs)))
+        watcher.cancel()
+        return max(waits)
+
+    longest_round, seconds = timed(lambda: asyncio.run(run_all()))
+    return seconds, longest_round
+
+
+if __name__ == "__main__":
+    ast = parser(lexer(COUNT))
+    print(f"{'programs':>9} {'serial (s)':>11} {'interval':>9} {'concurrent (s)':>15} {'longest round (ms)':>19}")
+    for programs in [100, 1000]:
+        serial = time_serial(ast, programs)
+        for interval in [64, 1024]:
+            concurrent, longest_round = time_concurrent(ast, programs, interval)
+            print(f"{programs:>9} {serial:>11.3f} {interval:>9} {concurrent:>15.3f} {longest_round * 1000:>19.2f}")
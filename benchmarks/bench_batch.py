@@ -0,0 +1,33 @@
+from batch import batch
+from runner import NO_LIMITS
+from benchmarks.corpus import loop_iterations
+from benchmarks.harness import timed
+import os
+import subprocess
+import sys
+import tempfile
+
+
+# write_programs :: str -> int -> Tuple[str, ...]
+def write_programs(directory: str, amount: int) -> tuple:
+    """ Writes amount small loop programs to directory and returns their filenames. """
+    def write(index: int) -> str:
+        filename = os.path.join(directory, f"program{index}.txt")
+        with open(filename, "w") as file:
+            file.write(loop_iterations(1_000 + index))
+        return filename
+    return tuple(map(write, range(amount)))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        filenames = write_programs(directory, 200)
+        jobs = tuple(map(lambda filename: (filename, False, False, "vm", NO_LIMITS), filenames))
+
+        run_main = lambda filename: subprocess.run([sys.executable, "main.py", filename, "n"], stdout=subprocess.DEVNULL, check=True)
+        per_process = timed(lambda: tuple(map(run_main, filenames[:20])))[1] / 20
+        print(f"{'one process per program':>26} {per_process * len(jobs):>10.3f}s (estimated from 20)")
+
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            seconds = timed(lambda: batch(jobs, workers, lambda result: None))[1]
+            print(f"{f'batch, {workers} workers':>26} {seconds:>10.3f}s")
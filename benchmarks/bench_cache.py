@@ -0,0 +1,23 @@
+from lexer import lexer
+from parse import parser
+from cache import source_key, load_ast, store_ast
+from benchmarks.bench_parser import generate_program
+from benchmarks.harness import timed
+import tempfile
+
+
+# bench_cache :: int -> Tuple[float, float]
+def bench_cache(functions: int) -> tuple:
+    """ Times lexing and parsing a program against hashing it and loading its cached ast. """
+    text = generate_program(functions)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ast, parse_seconds = timed(lambda: parser(lexer(text)))
+        store_ast(cache_dir, source_key((text,), False), ast)
+        return parse_seconds, timed(lambda: load_ast(cache_dir, source_key((text,), False)))[1]
+
+
+if __name__ == "__main__":
+    print(f"{'functions':>10} {'parse':>10} {'cached':>10}")
+    for functions in [100, 1_000, 10_000]:
+        parse_seconds, load_seconds = bench_cache(functions)
+        print(f"{functions:>10} {parse_seconds:>9.3f}s {load_seconds:>9.3f}s")
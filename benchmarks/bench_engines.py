@@ -0,0 +1,59 @@
+from lexer import lexer
+from parse import parser
+from runner import runner
+from compiler import compiler
+from vm import vm_runner
+from transpiler import transpiler, py_runner
+from sinks import DiscardSink
+from benchmarks.harness import timed
+from typing import Tuple
+
+
+PROGRAMS = {
+    "fib": """
+?fib(n)
+    sos = n;
+    if(n := 1)
+        sos = fib(n-1) + fib(n-2);
+    ;
+;
+?main()
+    sos = fib(18);
+;
+""",
+    "loop": """
+?main()
+    n = 100000;
+    t = 0;
+    while(n := 0)
+        t = t + n ++ 3 -- 2;
+        n = n - 1;
+    ;
+    sos = t;
+;
+""",
+}
+
+
+# chain_results :: int -> Tuple[int, int, int]
+def chain_results(terms: int) -> Tuple[int, int, int]:
+    """ Runs a flat chain of terms additions on the tree walker, the vm and the python target and returns their results,
+    which should all be terms. """
+    ast = parser(lexer("?main() x = 1; sos = " + " + ".join(["x"] * terms) + ";;"))
+    return runner(ast, "main", None, DiscardSink()), vm_runner(compiler(ast), "main", DiscardSink()), \
+        py_runner(transpiler(ast), "main", DiscardSink())
+
+
+if __name__ == "__main__":
+    for terms in [300, 600]:
+        print(f"Results of a chain of {terms} additions on tree, vm and python: {chain_results(terms)}")
+
+    print(f"{'program':>8} {'tree (s)':>10} {'vm (s)':>10} {'python (s)':>11}")
+    for name, source in PROGRAMS.items():
+        ast = parser(lexer(source))
+        program = compiler(ast)
+        py_program = transpiler(ast)
+        tree_time = timed(lambda: runner(ast), True)[1]
+        vm_time = timed(lambda: vm_runner(program), True)[1]
+        py_time = timed(lambda: py_runner(py_program), True)[1]
+        print(f"{name:>8} {tree_time:>10.3f} {vm_time:>10.3f} {py_time:>11.4f}")
@@ -0,0 +1,79 @@
+from incremental import document, edit, Document
+from lexer import LexerError
+from parse import ParserError
+from cache import encode_node
+from benchmarks.corpus import functions, random_program
+from benchmarks.harness import timed
+from typing import Tuple
+import random
+import re
+
+
+# Text that the random edits insert.
+SNIPPETS = (";", "?", "?g(x)\n sos = x;\n;\n", " ", "\n", "a", "1", "+", "++", "=", ":=", "(", ")", "while", "if",
+            "x = 3;", ",", "$", "sos = 2;", "!", "e", "")
+
+
+# outcome :: Callable[[], Document] -> tuple
+def outcome(make) -> tuple:
+    """ Returns what make gives as something that can be compared: the tokens, ast and bounds or the error. """
+    try:
+        doc = make()
+        return "ok", tuple(map(repr, doc.tokens)), tuple(map(encode_node, doc.ast)), tuple(doc.bounds)
+    except (LexerError, ParserError) as e:
+        return "error", type(e).__name__, str(e)
+
+
+# random_edit :: random.Random -> str -> Tuple[int, int, str]
+def random_edit(generator: random.Random, text: str) -> Tuple[int, int, str]:
+    """ Picks an edit of text: a changed number, a new or removed function or a random snippet anywhere. """
+    choice = generator.random()
+    numbers = list(re.finditer(r"\d+", text))
+    starts = list(map(lambda match: match.start(), re.finditer(r"\?", text))) + [len(text)]
+    if choice < 0.4 and numbers:
+        number = generator.choice(numbers)
+        return number.start(), number.end(), str(generator.randint(0, 12345))
+    elif choice < 0.55:
+        start = generator.choice(starts)
+        return start, start, generator.choice(("?g(x)\n sos = x;\n;\n", "?h()\n    sos = 1;\n;\n"))
+    elif choice < 0.65 and len(starts) > 1:
+        index = generator.randrange(len(starts) - 1)
+        return starts[index], starts[index + 1], ""
+    start = generator.randrange(len(text) + 1)
+    return start, min(len(text), start + generator.choice((0, 0, 1, 2, 5, 30))), generator.choice(SNIPPETS)
+
+
+# check_edits :: int -> int -> int
+def check_edits(programs: int, edits: int) -> int:
+    """ Makes edits random edits to each of programs random programs and compares every edit with lexing and parsing
+    the new text from scratch, errors included. An edit that fails is undone. Returns the amount of mismatches. """
+    mismatches = 0
+    for seed in range(programs):
+        generator = random.Random(seed)
+        text = random_program(seed)
+        doc = document(text)
+        for _ in range(edits):
+            start, end, replacement = random_edit(generator, text)
+            new_text = text[:start] + replacement + text[end:]
+            expected, got = outcome(lambda: document(new_text)), outcome(lambda: edit(doc, start, end, replacement))
+            if expected != got:
+                mismatches += 1
+                print(f"Mismatch for program {seed}, replacing {start}:{end} with {replacement!r}")
+            if expected[0] == "ok":
+                text, doc = new_text, edit(doc, start, end, replacement)
+    return mismatches
+
+
+if __name__ == "__main__":
+    print(f"Random edits that differ from parsing from scratch: {check_edits(200, 5)} of {200 * 5}")
+
+    print(f"{'functions':>10} {'full (s)':>10} {'same length (s)':>16} {'longer (s)':>11}")
+    for amount in [100, 1_000, 5_000]:
+        text = functions(amount)
+        doc = document(text)
+        # An edit of a number in the middle of the file, once without and once with a change in length.
+        middle = text.index("sos", len(text) // 2)
+        full = timed(lambda: document(text[:middle] + "sos = 7;" + text[middle:]))[1]
+        same = timed(lambda: edit(doc, middle, middle + 3, "sos"))[1]
+        longer = timed(lambda: edit(doc, middle, middle, "sos = 7;"))[1]
+        print(f"{amount:>10} {full:>10.3f} {same:>16.4f} {longer:>11.4f}")
@@ -0,0 +1,94 @@
+from lexer import lexer, LexerError
+from classes import *
+from benchmarks.corpus import source_size
+from benchmarks.harness import timed
+import random
+import re
+import subprocess
+import sys
+
+
+# two_pass_lexer :: str -> Type[Enum] -> str -> Tuple[Token, ...]
+def two_pass_lexer(code: str, rules: Type[Enum] = TokenSpecies, unknowns: str = r"[^\:\=\!\+\-\(\)\,\;\?\s\w]") -> Tuple[Token, ...]:
+    """ The lexer as it was before it had a master pattern, which looks for unknowns and tokens in separate passes. """
+    if unknown := list(re.compile(unknowns).finditer(code)):
+        raise LexerError(unknown[0][0], "char pos", unknown[0].start())
+    joined_rules = "|".join(list(map(lambda r: f"(?P<{r.name}>{r.value})", rules)))
+    search = re.compile(joined_rules).finditer
+    return FrozenTuple(map(lambda m: Token(rules[m.lastgroup], m[0], m.start()), search(code)))
+
+
+# Pieces of the random texts that are lexed by check_lexer, with unknown chars and words that look like keywords.
+PIECES = ("while", "if", "print", "x", "=", "==", "+", "++", "-", "--", ":=", "=:", "!=", "!", " ", "\n", "\t", "1", "(",
+          ")", ";", "?", ",", "whilex", "_if", "$", ".", "#")
+
+
+# lexed :: Callable -> str -> Union[Tuple[str, ...], str]
+def lexed(lex, text: str):
+    """ Returns the tokens that lex finds in text as text, or its error. """
+    try:
+        return tuple(map(repr, lex(text)))
+    except LexerError as e:
+        return f"LexerError: {e}"
+
+
+# check_lexer :: int -> int
+def check_lexer(cases: int) -> int:
+    """ Lexes cases random texts with the lexer and with two_pass_lexer and returns in how many they differ. """
+    def text(seed: int) -> str:
+        generator = random.Random(seed)
+        return "".join(map(lambda _: generator.choice(PIECES), range(generator.randint(0, 30))))
+
+    mismatches = tuple(filter(lambda seed: lexed(lexer, text(seed)) != lexed(two_pass_lexer, text(seed)), range(cases)))
+    for seed in mismatches[:5]:
+        print(f"Mismatch for {text(seed)!r}")
+    return len(mismatches)
+
+
+# Texts with a long run of whitespace that no token follows, by name, for a run of the given length.
+WHITESPACE_RUNS = {"trailing newlines": lambda length: "?main() sos = 1;;" + "\n" * length,
+                   "spaces before !": lambda length: " " * length + "!",
+                   "spaces before _a": lambda length: " " * length + "_a"}
+
+
+# time_lex :: Callable -> str -> float
+def time_lex(lex, text: str) -> float:
+    """ Times lexing text with lex once. """
+    return timed(lambda: lex(text))[1]
+
+
+# cold_start :: str -> float
+def cold_start(statement: str) -> float:
+    """ Times the first time a small program is lexed with statement in a new Python process, so no pattern has been
+    compiled yet. The process times it itself, the imports of the benchmarks aren't counted. The fastest of five. """
+    program = "from benchmarks.corpus import source_size; import lexer, time; text = source_size(3); " \
+              "from benchmarks.bench_lexer import two_pass_lexer; start = time.perf_counter(); " \
+              f"{statement}; print(time.perf_counter() - start)"
+
+    def run(_: int) -> float:
+        return float(subprocess.run([sys.executable, "-c", program], capture_output=True, text=True, check=True).stdout)
+    return min(map(run, range(5)))
+
+
+# throughput :: Callable -> str -> float
+def throughput(lex, text: str) -> float:
+    """ Lexes text with lex and returns the speed in MB per second. """
+    return len(text) / 1e6 / time_lex(lex, text)
+
+
+if __name__ == "__main__":
+    print(f"Random texts that the lexers lex differently: {check_lexer(3000)} of 3000")
+
+    print(f"{'whitespace run':>22} {'length':>8} {'two pass (ms)':>14} {'master (ms)':>12}")
+    for name, make in WHITESPACE_RUNS.items():
+        for length in [2_000, 8_000, 32_000]:
+            text = make(length)
+            print(f"{name:>22} {length:>8} {time_lex(two_pass_lexer, text) * 1000:>14.2f} {time_lex(lexer, text) * 1000:>12.2f}")
+
+    print(f"{'first lex in a process':>22} {'two pass (ms)':>14} {'master (ms)':>12}")
+    print(f"{'':>22} {cold_start('two_pass_lexer(text)') * 1000:>14.1f} {cold_start('lexer.lexer(text)') * 1000:>12.1f}")
+
+    print(f"{'statements':>22} {'MB':>8} {'two pass (MB/s)':>16} {'master (MB/s)':>14}")
+    for statements in [1_000, 5_000, 20_000]:
+        text = source_size(statements)
+        print(f"{statements:>22} {len(text) / 1e6:>8.2f} {throughput(two_pass_lexer, text):>16.2f} {throughput(lexer, text):>14.2f}")
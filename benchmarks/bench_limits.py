@@ -0,0 +1,16 @@
+from lexer import lexer
+from parse import parser
+from runner import runner, Limits, NO_LIMITS
+from sinks import DiscardSink
+from benchmarks.corpus import loop_iterations, recursion_depth
+from benchmarks.harness import best_of
+
+
+if __name__ == "__main__":
+    metered = Limits(10 ** 9, 10 ** 6, 3600.0)
+    print(f"{'program':>22} {'no limits (s)':>14} {'limits (s)':>11} {'overhead':>10}")
+    for name, text in [("loop 100000", loop_iterations(100_000)), ("recursion 5000", recursion_depth(5_000))]:
+        ast = parser(lexer(text))
+        off = best_of(lambda: runner(ast, "main", None, DiscardSink(), None, NO_LIMITS), 3)
+        on = best_of(lambda: runner(ast, "main", None, DiscardSink(), None, metered), 3)
+        print(f"{name:>22} {off:>14.3f} {on:>11.3f} {on / off - 1:>9.1%}")
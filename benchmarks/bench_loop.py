@@ -0,0 +1,31 @@
+from lexer import lexer
+from parse import parser
+from runner import runner
+from benchmarks.harness import timed
+
+
+COUNTDOWN = """
+?main()
+    n = {iterations};
+    t = 0;
+    while(n := 0)
+        t = t + n;
+        n = n - 1;
+    ;
+    sos = t;
+;
+"""
+
+
+# bench_countdown :: int -> float
+def bench_countdown(iterations: int) -> float:
+    """ Times a while loop running the given amount of iterations. """
+    ast = parser(lexer(COUNTDOWN.replace("{iterations}", str(iterations))))
+    return timed(lambda: runner(ast), True)[1]
+
+
+if __name__ == "__main__":
+    print(f"{'iterations':>12} {'seconds':>10} {'us/iteration':>14}")
+    for iterations in [1_000, 10_000, 100_000, 1_000_000]:
+        seconds = bench_countdown(iterations)
+        print(f"{iterations:>12} {seconds:>10.3f} {seconds / iterations * 1e6:>14.2f}")
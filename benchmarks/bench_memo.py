@@ -0,0 +1,34 @@
+from lexer import lexer
+from parse import parser
+from runner import runner, MemoCache
+from purity import pure_functions
+from benchmarks.harness import timed
+
+
+FIB = """
+?fib(n)
+    sos = n;
+    if(n := 1)
+        sos = fib(n-1) + fib(n-2);
+    ;
+;
+?main()
+    sos = fib({n});
+;
+"""
+
+
+# time_fib :: int -> int -> Tuple[float, MemoCache]
+def time_fib(n: int, size: int) -> tuple:
+    """ Times fib(n) on the tree walking runner with a memo cache of the given size. """
+    ast = parser(lexer(FIB.replace("{n}", str(n))))
+    memo = MemoCache(pure_functions(ast), size)
+    return timed(lambda: runner(ast, "main", memo), True)[1], memo
+
+
+if __name__ == "__main__":
+    print(f"{'n':>4} {'no memo (s)':>12} {'memo (s)':>10}  cache")
+    for n in [10, 15, 20, 200]:
+        without = f"{time_fib(n, 0)[0]:>12.4f}" if n <= 20 else f"{'-':>12}"
+        seconds, memo = time_fib(n, 4096)
+        print(f"{n:>4} {without} {seconds:>10.4f}  {memo}")
@@ -0,0 +1,30 @@
+from lexer import lexer, compact_lexer
+from parse import parser
+from optimizer import count_nodes
+from arena import to_arena
+from benchmarks.bench_parser import generate_program
+from typing import Callable
+import tracemalloc
+
+
+# allocated :: Callable -> Tuple[Any, int]
+def allocated(func: Callable) -> tuple:
+    """ Returns the result of func and the amount of bytes that is still allocated for it afterwards. """
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+if __name__ == "__main__":
+    text = generate_program(2_000)
+    tokens, token_bytes = allocated(lambda: lexer(text))
+    buffer, buffer_bytes = allocated(lambda: compact_lexer(text))
+    print(f"{len(tokens)} tokens, bytes per token: Token objects {token_bytes / len(tokens):.1f}, "
+          f"TokenBuffer {buffer_bytes / len(buffer):.1f}")
+
+    ast, ast_bytes = allocated(lambda: parser(tokens))
+    nodes = count_nodes(ast)
+    arena, arena_bytes = allocated(lambda: to_arena(ast))
+    print(f"{nodes} nodes, bytes per node: Node objects {ast_bytes / nodes:.1f}, NodeArena {arena_bytes / nodes:.1f}")
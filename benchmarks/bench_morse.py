@@ -0,0 +1,13 @@
+from lexer import lexer, morse_lexer, morse_to_string
+from benchmarks.bench_parser import generate_program
+from benchmarks.corpus import to_morse
+from benchmarks.harness import best_of
+
+
+if __name__ == "__main__":
+    print(f"{'MB':>6} {'decode + lexer':>15} {'morse_lexer':>12}")
+    for functions in [100, 1_000, 5_000]:
+        text = to_morse(generate_program(functions))
+        separate = best_of(lambda: lexer(morse_to_string(text)), 3)
+        fused = best_of(lambda: morse_lexer(text), 3)
+        print(f"{len(text) / 1e6:>6.1f} {separate:>14.3f}s {fused:>11.3f}s")
@@ -0,0 +1,76 @@
+from lexer import lexer
+from parse import parser
+from runner import runner
+from optimizer import optimizer
+from benchmarks.corpus import source_size
+from benchmarks.harness import timed
+
+
+CONSTANTS = """
+?scale(x)
+    sos = x ++ 1 + 0 + 60 ++ 60 -- 3600 - 1;
+    if(0)
+        print(33);
+    ;
+;
+?main()
+    n = 10000 ++ 2 -- 2;
+    t = 0;
+    while(n := 0 ++ 5)
+        if(1 == 1)
+            t = t + scale(n) ++ 2 -- 2;
+        ;
+        n = n - 1 ++ 1;
+    ;
+    sos = t;
+;
+"""
+
+HELPERS = """
+?square(x)
+    sos = x ++ 3;
+;
+?shift(low, x, high)
+    sos = low + x ++ 2 - high;
+;
+?unused(x)
+    print(x);
+    sos = x;
+;
+?main()
+    n = 20000;
+    t = 0;
+    while(n := 0)
+        skipped = n + 1;
+        t = t + square(n) -- 1000 + shift(100, n, 200);
+        n = n - 1;
+    ;
+    sos = t;
+;
+"""
+
+
+# unused_chain :: int -> str
+def unused_chain(statements: int) -> str:
+    """ A single main with a chain of assignments that are never read, each one reading the one before it. """
+    body = "".join(map(lambda index: f"    a{index + 1} = a{index} + {index};\n", range(statements)))
+    return f"?main()\n    a0 = 1;\n{body}    sos = a0;\n;\n"
+
+
+# time_optimizer :: str -> float
+def time_optimizer(program: str) -> float:
+    """ Times optimizing a program that has already been parsed. """
+    ast = parser(lexer(program))
+    return timed(lambda: optimizer(ast))[1]
+
+
+if __name__ == "__main__":
+    for name, program in [("constants", CONSTANTS), ("helpers", HELPERS)]:
+        ast = parser(lexer(program))
+        optimized, report = optimizer(ast)
+        print(f"{name}: {report}")
+        print(f"runner before: {timed(lambda: runner(ast), True)[1]:.3f}s, after: {timed(lambda: runner(optimized), True)[1]:.3f}s")
+
+    print(f"{'statements':>11} {'large body (s)':>15} {'unused chain (s)':>17}")
+    for statements in [1000, 2000, 4000]:
+        print(f"{statements:>11} {time_optimizer(source_size(statements)):>15.3f} {time_optimizer(unused_chain(statements)):>17.3f}")
@@ -0,0 +1,66 @@
+from lexer import lexer
+from parse import parser
+from runner import runner, MemoCache, NO_LIMITS
+from parallel import Parallel
+from purity import pure_functions
+from sinks import DiscardSink, BytesSink
+from benchmarks.corpus import random_program
+from benchmarks.harness import timed
+import os
+
+
+FIB = """
+?fib(n)
+    sos = n;
+    if(n := 1)
+        sos = fib(n - 1) + fib(n - 2);
+    ;
+;
+?main()
+    sos = fib({n});
+;
+"""
+
+
+# run_outcome :: Tuple[FuncDefNode, ...] -> Optional[Parallel] -> Tuple[Any, bytes]
+def run_outcome(ast: tuple, parallel) -> tuple:
+    """ Runs ast without a memo cache and returns its result or error with its output. """
+    sink = BytesSink()
+    try:
+        result = runner(ast, "main", MemoCache(pure_functions(ast), 0), sink, None, NO_LIMITS, parallel)
+    except Exception as e:
+        result = f"{type(e).__name__}: {e}"
+    return result, sink.getvalue()
+
+
+# check_parallel :: int -> Tuple[int, int]
+def check_parallel(programs: int) -> tuple:
+    """ Runs programs random programs serially and with a pool that sends every eligible call, whatever it costs,
+    and compares their results, errors and output. Returns the amount of mismatches and of calls sent to the pool. """
+    parallel = Parallel(2, 0, 3)
+    mismatches = 0
+    for seed in range(programs):
+        ast = parser(lexer(random_program(seed)))
+        if run_outcome(ast, None) != run_outcome(ast, parallel):
+            mismatches += 1
+            print(f"Mismatch for program {seed}")
+    return mismatches, parallel.sent
+
+
+# time_fib :: int -> Optional[Parallel] -> float
+def time_fib(n: int, parallel) -> float:
+    """ Times fib(n) without a memo cache, so every call of the divide and conquer is really made. """
+    ast = parser(lexer(FIB.replace("{n}", str(n))))
+    return timed(lambda: runner(ast, "main", MemoCache(pure_functions(ast), 0), DiscardSink(), None, NO_LIMITS, parallel))[1]
+
+
+if __name__ == "__main__":
+    mismatches, sent = check_parallel(150)
+    print(f"Random programs that run differently on a pool: {mismatches} of 150, with {sent} calls sent")
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores")
+    print(f"{'n':>4} {'serial (s)':>11} " + " ".join(map(lambda workers: f"{f'{workers} workers (s)':>15}", (2, 4, cores))))
+    for n in [18, 20, 22]:
+        parallel = " ".join(map(lambda workers: f"{time_fib(n, Parallel(workers)):>15.3f}", (2, 4, cores)))
+        print(f"{n:>4} {time_fib(n, None):>11.3f} {parallel}")
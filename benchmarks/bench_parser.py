@@ -0,0 +1,34 @@
+from lexer import lexer
+from parse import parser
+from benchmarks.harness import timed
+
+
+FUNCTION = """
+?f{index}(a, b)
+    c = a + b ++ {index};
+    if(c := 10)
+        print(c, a);
+    ;
+    sos = c;
+;
+"""
+
+
+# generate_program :: int -> str
+def generate_program(functions: int) -> str:
+    """ Generates a Worse program with the given amount of function definitions. """
+    return "".join(map(lambda index: FUNCTION.replace("{index}", str(index)), range(functions)))
+
+
+# bench_parse :: int -> float
+def bench_parse(functions: int) -> float:
+    """ Times parsing a program with the given amount of function definitions. """
+    tokens = lexer(generate_program(functions))
+    return timed(lambda: parser(tokens))[1]
+
+
+if __name__ == "__main__":
+    print(f"{'functions':>10} {'seconds':>10} {'us/function':>12}")
+    for functions in [100, 1_000, 10_000, 50_000]:
+        seconds = bench_parse(functions)
+        print(f"{functions:>10} {seconds:>10.3f} {seconds / functions * 1e6:>12.1f}")
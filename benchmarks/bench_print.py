@@ -0,0 +1,43 @@
+from lexer import lexer
+from parse import parser
+from runner import runner
+from sinks import Sink, FileSink, BytesSink, DiscardSink
+from benchmarks.harness import timed
+import os
+import tempfile
+
+
+PRINTER = """
+?main()
+    n = {lines};
+    while(n := 0)
+        print(72, 101, 108, 108, 111, 32, 119, 111, 114, 108, 100);
+        n = n - 1;
+    ;
+    sos = 0;
+;
+"""
+
+
+# time_sink :: Tuple[FuncDefNode, ...] -> Sink -> float
+def time_sink(ast: tuple, sink: Sink) -> float:
+    """ Times running the ast with its output going to sink. """
+    return timed(lambda: runner(ast, "main", None, sink))[1]
+
+
+if __name__ == "__main__":
+    lines = 20_000
+    ast = parser(lexer(PRINTER.replace("{lines}", str(lines))))
+    filename = os.path.join(tempfile.mkdtemp(), "output.txt")
+    sinks = {"file, flushed every line": lambda: FileSink(filename, 1),
+             "file, buffered": lambda: FileSink(filename),
+             "bytes": BytesSink,
+             "discard": DiscardSink}
+    print(f"{'sink':>26} {'seconds':>8} {'us/line':>8}")
+    for name, make_sink in sinks.items():
+        sink = make_sink()
+        seconds = time_sink(ast, sink)
+        if isinstance(sink, FileSink):
+            sink.close()
+        print(f"{name:>26} {seconds:>8.3f} {seconds / lines * 1e6:>8.1f}")
+    os.remove(filename)
@@ -0,0 +1,16 @@
+from lexer import lexer
+from parse import parser
+from runner import runner
+from profiler import Profile
+from sinks import DiscardSink
+from benchmarks.corpus import loop_iterations, recursion_depth
+from benchmarks.harness import best_of
+
+
+if __name__ == "__main__":
+    print(f"{'program':>22} {'off (s)':>10} {'on (s)':>10} {'overhead':>10}")
+    for name, text in [("loop 100000", loop_iterations(100_000)), ("recursion 5000", recursion_depth(5_000))]:
+        ast = parser(lexer(text))
+        off = best_of(lambda: runner(ast, "main", None, DiscardSink(), None), 3)
+        on = best_of(lambda: runner(ast, "main", None, DiscardSink(), Profile()), 3)
+        print(f"{name:>22} {off:>10.3f} {on:>10.3f} {on / off - 1:>9.1%}")
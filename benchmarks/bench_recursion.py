@@ -0,0 +1,47 @@
+from lexer import lexer
+from parse import parser
+from runner import runner
+from benchmarks.harness import best_of, measure
+
+
+EVEN_ODD = """
+?odd(n)
+    sos = 0;
+    if(n != 0)
+        sos = even(n-1);
+    ;
+;
+
+?even(n)
+    sos = 1;
+    if(n != 0)
+        sos = odd(n-1);
+    ;
+;
+
+?main()
+    sos = even({depth});
+;
+"""
+
+
+# bench_even_odd :: int -> int -> float
+def bench_even_odd(depth: int, repeat: int = 5) -> float:
+    """ Times running the mutual recursion of worse.txt with the given depth. """
+    ast = parser(lexer(EVEN_ODD.replace("{depth}", str(depth))))
+    return best_of(lambda: runner(ast), repeat, True)
+
+
+# peak_memory :: int -> int
+def peak_memory(depth: int) -> int:
+    """ Returns the peak of memory in bytes that is allocated while running the mutual recursion. """
+    ast = parser(lexer(EVEN_ODD.replace("{depth}", str(depth))))
+    return measure(lambda: runner(ast), True)[2]
+
+
+if __name__ == "__main__":
+    print(f"{'depth':>8} {'seconds':>10} {'us/call':>10} {'peak KiB':>10}")
+    for depth in [25, 50, 100, 200, 10_000, 100_000, 1_000_000]:
+        seconds = bench_even_odd(depth, 5 if depth < 10_000 else 1)
+        peak = f"{peak_memory(depth) / 1024:>10.1f}" if depth <= 10_000 else f"{'-':>10}"
+        print(f"{depth:>8} {seconds:>10.4f} {seconds / (depth + 2) * 1e6:>10.1f} {peak}")
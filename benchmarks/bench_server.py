@@ -0,0 +1,43 @@
+from server import Client
+from benchmarks.corpus import loop_iterations, to_morse
+from benchmarks.harness import timed
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+PROGRAM = "?main()\n    print(72, 105);\n    sos = 1;\n;\n"
+
+
+# latencies :: Client -> str -> int -> Dict[str, Any] -> List[float]
+def latencies(client: Client, text: str, amount: int, **options) -> list:
+    """ Sends text amount times and returns the sorted round trip times. """
+    return sorted(map(lambda _: timed(lambda: client.request(text, **options))[1], range(amount)))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "worse.sock")
+        server = subprocess.Popen([sys.executable, "server.py", path], stderr=subprocess.DEVNULL)
+        while not os.path.exists(path):
+            time.sleep(0.01)
+        client = Client(path)
+
+        print(f"{'program':>22} {'first (ms)':>11} {'median (ms)':>12} {'p99 (ms)':>10}")
+        for name, text, options in [("hello", PROGRAM, {}), ("hello morse", to_morse(PROGRAM), {"morse": True}),
+                                    ("loop 100", loop_iterations(100), {})]:
+            first = latencies(client, text, 1, **options)[0]
+            times = latencies(client, text, 1000, **options)
+            print(f"{name:>22} {first * 1000:>11.3f} {times[len(times) // 2] * 1000:>12.3f} {times[len(times) * 99 // 100] * 1000:>10.3f}")
+
+        client.close()
+        server.terminate()
+        server.wait()
+
+        program = os.path.join(directory, "hello.txt")
+        with open(program, "w") as file:
+            file.write(PROGRAM)
+        seconds = timed(lambda: subprocess.run([sys.executable, "main.py", program, "n"], stdout=subprocess.DEVNULL, check=True))[1]
+        print(f"{'python main.py':>22} {seconds * 1000:>11.3f}")
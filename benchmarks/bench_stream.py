@@ -0,0 +1,63 @@
+from lexer import lexer, lexer_stream, read_chunks
+from parse import parser
+from main import worse, worse_file
+from sinks import BytesSink
+from benchmarks.bench_parser import generate_program
+from benchmarks.harness import measure
+from classes import TokenStream
+from collections import deque
+from typing import Tuple
+import os
+import tempfile
+
+
+# read_whole :: str -> str
+def read_whole(filename: str) -> str:
+    """ Reads the whole file at once. """
+    with open(filename) as file:
+        return file.read()
+
+
+# lex_streaming :: str -> None
+def lex_streaming(filename: str) -> None:
+    """ Lexes the file while it is read and throws every token away. """
+    deque(lexer_stream(read_chunks(filename)), maxlen=0)
+
+
+# Programs with an error early and an error late, far enough apart to be in different chunks of read_chunks.
+ERROR_PROGRAMS = {"parse error, unknown later": "?main() sos = ;;\n" + " " * 100_000 + "$",
+                  "unknown, parse error later": "?main() $ sos = 1;;\n" + " " * 100_000 + "?x(",
+                  "parse error only": "?main() sos = ;;\n" + " " * 100_000,
+                  "unknown only": "?main() sos = 1;;\n" + " " * 100_000 + "$"}
+
+
+# reported :: str -> Tuple[bytes, bytes]
+def reported(text: str) -> Tuple[bytes, bytes]:
+    """ Runs text with worse and from a file with worse_file and returns what each of them reported. """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+        file.write(text)
+    from_text, from_file = BytesSink(), BytesSink()
+    worse(text, False, False, "vm", True, None, from_text)
+    worse_file(file.name, False, False, "vm", True, None, from_file)
+    os.remove(file.name)
+    return from_text.getvalue(), from_file.getvalue()
+
+
+if __name__ == "__main__":
+    for name, text in ERROR_PROGRAMS.items():
+        from_text, from_file = reported(text)
+        print(f"{name}: {'same' if from_text == from_file else 'different'} error, {from_file.decode().strip()}")
+
+    print(f"{'MB':>6} {'mode':>16} {'seconds':>8} {'peak MiB':>9}")
+    for functions in [2_000, 10_000]:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+            file.write(generate_program(functions))
+        size = os.path.getsize(file.name) / 1e6
+        cases = {"lex whole": lambda: lexer(read_whole(file.name)),
+                 "lex streaming": lambda: lex_streaming(file.name),
+                 "parse whole": lambda: parser(lexer(read_whole(file.name))),
+                 "parse streaming": lambda: parser(TokenStream(lexer_stream(read_chunks(file.name))))}
+        for mode, case in cases.items():
+            _, seconds, peak = measure(case)
+            print(f"{size:>6.1f} {mode:>16} {seconds:>8.2f} {peak / 2 ** 20:>9.1f}")
+        os.remove(file.name)
@@ -0,0 +1,54 @@
+from lexer import lexer
+from parse import parser
+from resolver import resolver
+from purity import pure_functions
+from runner import run_function, MemoCache
+from sinks import DiscardSink
+from vectorized import vectorized
+from benchmarks.harness import timed
+import random
+
+
+PRICE = """
+?price(amount, size, member)
+    sos = amount ++ size;
+    if(amount := 100)
+        sos = sos - sos -- 10;
+    ;
+    if(member)
+        sos = sos - sos -- 20;
+        if(size =: 3)
+            sos = sos + 5;
+        ;
+    ;
+;
+"""
+
+
+# time_loop :: FuncDefNode -> Tuple[Tuple[int, ...], ...] -> Tuple[float, Tuple[int, ...]]
+def time_loop(function, columns) -> tuple:
+    """ Times a call of run_function for every row without a memo cache, as a batch would run it today. """
+    resolution = resolver((function,))
+    memo = MemoCache(pure_functions((function,)), 0)
+    results, seconds = timed(lambda: tuple(map(lambda *row: run_function(function.name, row, resolution, memo, DiscardSink()), *columns)))
+    return seconds, results
+
+
+# time_vectorized :: FuncDefNode -> Tuple[Tuple[int, ...], ...] -> Tuple[float, Tuple[int, ...]]
+def time_vectorized(function, columns) -> tuple:
+    """ Times a single vectorized run over all rows. """
+    results, seconds = timed(lambda: vectorized(function, columns))
+    return seconds, results
+
+
+if __name__ == "__main__":
+    function = parser(lexer(PRICE))[0]
+    generator = random.Random(0)
+    print(f"{'rows':>9} {'run_function (s)':>17} {'vectorized (s)':>15} {'same':>5}")
+    for rows in [1_000, 10_000, 100_000]:
+        columns = (tuple(map(lambda _: generator.randint(-50, 500), range(rows))),
+                   tuple(map(lambda _: generator.randint(0, 9), range(rows))),
+                   tuple(map(lambda _: generator.randint(0, 1), range(rows))))
+        loop, expected = time_loop(function, columns)
+        vector, results = time_vectorized(function, columns)
+        print(f"{rows:>9} {loop:>17.3f} {vector:>15.3f} {str(results == expected):>5}")
@@ -0,0 +1,30 @@
+from typing import Any, Dict, Tuple
+import json
+import sys
+
+
+# load :: str -> Dict[Tuple[str, int, str], Dict[str, Any]]
+def load(filename: str) -> Dict[Tuple[str, int, str], Dict[str, Any]]:
+    """ Reads the results of benchmarks.harness keyed by axis, size and stage. """
+    with open(filename) as file:
+        report = json.load(file)
+    return dict(map(lambda result: ((result["axis"], result["size"], result["stage"]), result), report["results"]))
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.compare old.json new.json [threshold], exits with 1 if anything got slower than threshold.
+    _, old_file, new_file, *rest = sys.argv
+    threshold = float(rest[0]) if rest else 0.10
+    old, new = load(old_file), load(new_file)
+
+    regressions = 0
+    print(f"{'axis':>18} {'size':>7} {'stage':>16} {'old s':>9} {'new s':>9} {'time':>7} {'memory':>7}")
+    for key in filter(lambda key: key in old, new.keys()):
+        time_ratio = new[key]["seconds"] / max(old[key]["seconds"], 1e-9)
+        memory_ratio = new[key]["peak_bytes"] / max(old[key]["peak_bytes"], 1)
+        slower = time_ratio > 1 + threshold or memory_ratio > 1 + threshold
+        regressions += slower
+        print(f"{key[0]:>18} {key[1]:>7} {key[2]:>16} {old[key]['seconds']:>9.4f} {new[key]['seconds']:>9.4f} "
+              f"{time_ratio:>6.2f}x {memory_ratio:>6.2f}x{'  <-- regression' if slower else ''}")
+    print(f"{regressions} regressions above {threshold:.0%}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,140 @@
+from lexer import MORSE_CODES
+from benchmarks.bench_parser import generate_program
+from typing import Callable, Dict, List, Tuple
+import random
+
+
+STATEMENTS = """
+    a{index} = {index} ++ 3 - b -- 2;
+    if(a{index} := b)
+        b = b + a{index};
+    ;
+"""
+
+
+# to_morse :: str -> str
+def to_morse(text: str) -> str:
+    """ Encodes text as morse with a space after every code, indentation is left out. """
+    encode = dict(map(lambda item: (item[1], item[0]), MORSE_CODES.items()))
+    return "".join(map(lambda char: encode[char] + " " if char != "\n" else "\n", text.replace("    ", "")))
+
+
+# source_size :: int -> str
+def source_size(statements: int) -> str:
+    """ A single main function with the given amount of statements. """
+    body = "".join(map(lambda index: STATEMENTS.replace("{index}", str(index)), range(statements)))
+    return f"?main()\n    b = 1;{body}    sos = b;\n;\n"
+
+
+# functions :: int -> str
+def functions(amount: int) -> str:
+    """ The given amount of small function definitions and a main that calls the last one. """
+    return generate_program(amount) + f"?main()\n    sos = f{amount - 1}(1, 2);\n;\n"
+
+
+# expression_length :: int -> str
+def expression_length(terms: int) -> str:
+    """ A main that evaluates one expression of the given amount of terms a thousand times. """
+    expression = " + ".join(map(lambda index: f"n ++ {index % 7 + 1}", range(terms)))
+    return f"?main()\n    n = 1000;\n    t = 0;\n    while(n := 0)\n        t = {expression};\n        n = n - 1;\n    ;\n    sos = t;\n;\n"
+
+
+# loop_iterations :: int -> str
+def loop_iterations(iterations: int) -> str:
+    """ A while loop that runs the given amount of iterations. """
+    return f"?main()\n    n = {iterations};\n    t = 0;\n    while(n := 0)\n        t = t + n;\n        n = n - 1;\n    ;\n    sos = t;\n;\n"
+
+
+# recursion_depth :: int -> str
+def recursion_depth(depth: int) -> str:
+    """ A function that recurses to the given depth and adds up on the way back, so it can't be a tail call. """
+    return "?sum(n)\n    sos = 0;\n    if(n := 0)\n        sos = n + sum(n - 1);\n    ;\n;\n" \
+           f"?main()\n    sos = sum({depth});\n;\n"
+
+
+# print_volume :: int -> str
+def print_volume(lines: int) -> str:
+    """ A main that prints the given amount of lines. """
+    return f"?main()\n    n = {lines};\n    while(n := 0)\n        print(72, 101, 108, 108, 111, 32, 119, 111, 114, 108, 100);\n" \
+           "        n = n - 1;\n    ;\n    sos = 0;\n;\n"
+
+
+# morse :: int -> str
+def morse(statements: int) -> str:
+    """ The source_size program with the given amount of statements as morse. """
+    return to_morse(source_size(statements))
+
+
+# Operators of random programs, -- is rarer because it can fail.
+RANDOM_OPERATORS = ("+", "-", "++", "==", "!=", ":=", "=:") * 3 + ("--",)
+
+
+# random_program :: int -> str
+def random_program(seed: int) -> str:
+    """ A random program with up to four functions and a main, the same for the same seed. Every while loop ends,
+    but the programs do print, divide by zero, read variables that aren't defined and call functions with the wrong
+    amount of params now and then. For checking that two ways of running or parsing a program agree. """
+    generator = random.Random(seed)
+
+    def value(variables: List[str], calls: List[Tuple[str, int]], depth: int) -> str:
+        choice = generator.random()
+        if depth > 2 or choice < 0.3:
+            return str(generator.randint(0, 9))
+        if choice < 0.6 and variables:
+            return generator.choice(variables)
+        if choice < 0.7 and calls:
+            name, params = generator.choice(calls)
+            return f"{name}({', '.join(map(lambda _: value(variables, calls, depth + 1), range(params)))})"
+        return f"{value(variables, calls, depth + 1)} {generator.choice(RANDOM_OPERATORS)} {value(variables, calls, depth + 1)}"
+
+    def body(variables: List[str], calls: List[Tuple[str, int]], depth: int, indent: str) -> List[str]:
+        lines = []
+        for _ in range(generator.randint(1, 4)):
+            choice = generator.random()
+            if choice < 0.5:
+                name = generator.choice(["a", "b", "c", "sos"])
+                lines.append(f"{indent}{name} = {value(variables, calls, 0)};")
+                variables = variables + [name]
+            elif choice < 0.65:
+                chars = map(lambda _: str(generator.randint(35, 90)) + (f" + {generator.choice(variables)} -- 10"
+                            if variables and generator.random() < 0.3 else ""), range(generator.randint(1, 3)))
+                lines.append(f"{indent}print({', '.join(chars)});")
+            elif choice < 0.8 and depth < 2:
+                lines.append(f"{indent}if({value(variables, calls, 1)})")
+                lines += body(variables, calls, depth + 1, indent + "    ") + [f"{indent};"]
+            elif depth < 2:
+                counter = generator.choice(["i", "j"])
+                lines.append(f"{indent}{counter} = {generator.randint(0, 5)};")
+                variables = variables + [counter]
+                lines.append(f"{indent}while({counter} := 0)")
+                lines += body(variables, calls, depth + 1, indent + "    ")
+                lines += [f"{indent}    {counter} = {counter} - 1;", f"{indent};"]
+        return lines
+
+    functions, calls = [], []
+    for index in range(generator.randint(0, 4)):
+        params = generator.sample(["x", "y", "z"], generator.randint(0, 3))
+        lines = body(list(params), list(calls), 0, "    ")
+        if generator.random() < 0.9:
+            lines.append(f"    sos = {value(list(params), list(calls), 0)};")
+        functions.append(f"?f{index}({', '.join(params)})\n" + "\n".join(lines) + "\n;\n")
+        calls.append((f"f{index}", len(params) if generator.random() < 0.95 else len(params) + 1))
+    lines = body([], calls, 0, "    ") + [f"    sos = {value([], calls, 0)};"]
+    return "\n".join(functions + ["?main()\n" + "\n".join(lines) + "\n;\n"])
+
+
+# Every axis with the generator of its programs, whether they are morse and the sizes that are benchmarked.
+AXES: Dict[str, Tuple[Callable[[int], str], bool, Tuple[int, ...]]] = {
+    "source_size": (source_size, False, (100, 1_000, 5_000)),
+    "functions": (functions, False, (100, 1_000, 5_000)),
+    "expression_length": (expression_length, False, (1, 10, 100)),
+    "loop_iterations": (loop_iterations, False, (1_000, 10_000, 100_000)),
+    "recursion_depth": (recursion_depth, False, (100, 1_000, 10_000)),
+    "print_volume": (print_volume, False, (100, 1_000, 10_000)),
+    "morse": (morse, True, (100, 1_000, 5_000)),
+}
+
+
+if __name__ == "__main__":
+    for axis, (generate, is_morse, sizes) in AXES.items():
+        print(f"{axis:>18} {'morse' if is_morse else 'plain':>6} " + " ".join(map(lambda size: f"{len(generate(size)):>9}", sizes)))
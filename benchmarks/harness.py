@@ -0,0 +1,101 @@
+from lexer import lexer, morse_lexer, morse_to_string
+from parse import parser
+from runner import runner
+from sinks import DiscardSink
+from contextlib import nullcontext, redirect_stdout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+# timed :: Callable -> bool -> Tuple[Any, float]
+def timed(func: Callable, quiet: bool = False) -> Tuple[Any, float]:
+    """ Returns the result of func and the time it took in seconds, quiet throws away what func prints. """
+    with redirect_stdout(io.StringIO()) if quiet else nullcontext():
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start
+
+
+# best_of :: Callable -> int -> bool -> float
+def best_of(func: Callable, repeat: int = 5, quiet: bool = False) -> float:
+    """ Returns the fastest time in seconds out of repeat calls of func. """
+    return min(map(lambda _: timed(func, quiet)[1], range(repeat)))
+
+
+# measure :: Callable -> bool -> Tuple[Any, float, int]
+def measure(func: Callable, quiet: bool = False) -> Tuple[Any, float, int]:
+    """ Returns the result of func, the time it took in seconds and the peak of memory it allocated in bytes.
+    The time comes from a run without tracemalloc, because tracing slows the interpreter down. """
+    result, seconds = timed(func, quiet)
+
+    tracemalloc.start()
+    timed(func, quiet)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+# run_case :: str -> int -> Callable -> bool -> List[Dict[str, Any]]
+def run_case(axis: str, size: int, generate: Callable[[int], str], is_morse: bool) -> List[Dict[str, Any]]:
+    """ Times morse_to_string, lexer, parser and runner separately on one program of the corpus.
+    Morse programs are also lexed by morse_lexer, which replaces the first two stages. """
+    text = generate(size)
+    source = text
+    stages = []
+    if is_morse:
+        _, seconds, peak = measure(lambda: morse_lexer(text))
+        stages.append(("morse_lexer", seconds, peak))
+        source, seconds, peak = measure(lambda: morse_to_string(text))
+        stages.append(("morse_to_string", seconds, peak))
+    tokens, seconds, peak = measure(lambda: lexer(source))
+    stages.append(("lexer", seconds, peak))
+    ast, seconds, peak = measure(lambda: parser(tokens))
+    stages.append(("parser", seconds, peak))
+    _, seconds, peak = measure(lambda: runner(ast, "main", None, DiscardSink()))
+    stages.append(("runner", seconds, peak))
+
+    return list(map(lambda stage: {"axis": axis, "size": size, "stage": stage[0], "seconds": stage[1],
+                                   "peak_bytes": stage[2], "source_bytes": len(text), "tokens": len(tokens)}, stages))
+
+
+# revision :: -> Optional[str]
+def revision() -> Optional[str]:
+    """ Returns the git commit that is checked out, or None outside of a git repository. """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# harness :: Dict[str, Tuple[Callable, bool, Tuple[int, ...]]] -> Dict[str, Any]
+def harness(axes: Dict[str, Tuple[Callable[[int], str], bool, Tuple[int, ...]]]) -> Dict[str, Any]:
+    """ Runs every size of every axis and returns the results with the revision and Python they were measured on. """
+    results = []
+    for axis, (generate, is_morse, sizes) in axes.items():
+        for size in sizes:
+            results += run_case(axis, size, generate, is_morse)
+            print(f"{axis} {size} done", file=sys.stderr)
+    return {"revision": revision(), "python": platform.python_version(), "results": results}
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.harness [output.json] [quick], quick only runs the smallest size of each axis.
+    # The corpus is imported here, it uses bench_parser which times itself with this module.
+    from benchmarks.corpus import AXES
+    _, *args = sys.argv
+    output = args[0] if args else None
+    smallest = lambda axis: (AXES[axis][0], AXES[axis][1], AXES[axis][2][:1])
+    axes = dict(map(lambda axis: (axis, smallest(axis) if "quick" in args[1:] else AXES[axis]), AXES.keys()))
+
+    report = json.dumps(harness(axes), indent=2)
+    if output is None:
+        print(report)
+    else:
+        with open(output, "w") as file:
+            file.write(report + "\n")
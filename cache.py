@@ -0,0 +1,133 @@
+from lexer import lexer
+from parse import parser
+from classes import *
+import hashlib
+import marshal
+import os
+import tempfile
+
+
+# Changes whenever the serialized form of the nodes changes, so older cache files are not read anymore.
+FORMAT_VERSION = 1
+MAGIC = b"WORSE-AST"
+SUFFIX = ".worse-ast"
+
+INT, VARIABLE, FUNC_EXE, OPERATION, ASSIGN, PRINT, IF_WHILE, FUNC_DEF = range(8)
+
+
+# encode_node :: Type[Node] -> tuple
+@deepcopy_decorator
+def encode_node(node: Type[Node]) -> tuple:
+    """ Encodes a node as nested tuples of ints and strings, which marshal can store. """
+    if isinstance(node, IntNode):
+        return INT, node.pos, node.value
+    elif isinstance(node, VariableNode):
+        return VARIABLE, node.pos, node.name
+    elif isinstance(node, FuncExeNode):
+        return FUNC_EXE, node.pos, node.name, tuple(map(encode_node, node.params))
+    elif isinstance(node, OperationNode):
+        return OPERATION, node.pos, node.operator.name, encode_node(node.lhs), encode_node(node.rhs)
+    elif isinstance(node, AssignNode):
+        return ASSIGN, node.pos, node.name, encode_node(node.value)
+    elif isinstance(node, PrintNode):
+        return PRINT, node.pos, tuple(map(encode_node, node.value))
+    elif isinstance(node, IfWhileNode):
+        return IF_WHILE, encode_node(node.condition), tuple(map(encode_node, node.actions)), node.is_while
+    return FUNC_DEF, node.pos, node.name, node.params, tuple(map(encode_node, node.actions))
+
+
+# decode_node :: tuple -> Type[Node]
+def decode_node(encoded: tuple) -> Type[Node]:
+    """ Creates the node that encode_node encoded. Not deepcopied, as checking the nested tuples costs more than decoding them. """
+    kind = encoded[0]
+    if kind == INT:
+        return IntNode(Token(TokenSpecies.DIGIT, encoded[2], encoded[1]))
+    elif kind == VARIABLE:
+        return VariableNode(Token(TokenSpecies.ID, encoded[2], encoded[1]))
+    elif kind == FUNC_EXE:
+        return FuncExeNode(Token(TokenSpecies.ID, encoded[2], encoded[1]), map(decode_node, encoded[3]))
+    elif kind == OPERATION:
+        return OperationNode(decode_node(encoded[3]), Token(TokenSpecies[encoded[2]], "", encoded[1]), decode_node(encoded[4]))
+    elif kind == ASSIGN:
+        return AssignNode(Token(TokenSpecies.ID, encoded[2], encoded[1]), decode_node(encoded[3]))
+    elif kind == PRINT:
+        return PrintNode(map(decode_node, encoded[2]), encoded[1])
+    elif kind == IF_WHILE:
+        return IfWhileNode(decode_node(encoded[1]), map(decode_node, encoded[2]), encoded[3])
+    return FuncDefNode(Token(TokenSpecies.ID, encoded[2], encoded[1]), encoded[3], map(decode_node, encoded[4]))
+
+
+# source_key :: Iterable[str] -> bool -> str
+def source_key(chunks: Iterable[str], is_morse: bool) -> str:
+    """ Hashes the source text that is given in chunks together with the format version and whether it is morse. """
+    digest = hashlib.sha256(f"{FORMAT_VERSION} {is_morse}\n".encode())
+    for chunk in chunks:
+        digest.update(chunk.encode())
+    return digest.hexdigest()
+
+
+# cache_path :: str -> str -> str
+def cache_path(cache_dir: str, key: str) -> str:
+    """ Returns the path of the cache file for key. """
+    return os.path.join(cache_dir, key + SUFFIX)
+
+
+# load_ast :: str -> str -> Optional[Tuple[FuncDefNode, ...]]
+@deepcopy_decorator
+def load_ast(cache_dir: str, key: str) -> Optional[Tuple[FuncDefNode, ...]]:
+    """ Returns the cached ast for key, or None if there is no valid cache file for it. """
+    try:
+        with open(cache_path(cache_dir, key), "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    header = MAGIC + bytes((FORMAT_VERSION,)) + bytes.fromhex(key)
+    if not data.startswith(header):
+        return None
+    try:
+        return FrozenTuple(map(decode_node, marshal.loads(data[len(header):])))
+    except (EOFError, ValueError, TypeError, IndexError, KeyError):
+        return None
+
+
+# store_ast :: str -> str -> Tuple[FuncDefNode, ...] -> bool
+@deepcopy_decorator
+def store_ast(cache_dir: str, key: str, ast: Tuple[FuncDefNode, ...]) -> bool:
+    """ Writes the ast to the cache file for key and returns whether that succeeded.
+    The file is written under a temporary name first and then renamed, so other processes read either the
+    whole old file or the whole new file and never a half written one. """
+    header = MAGIC + bytes((FORMAT_VERSION,)) + bytes.fromhex(key)
+    data = header + marshal.dumps(tuple(map(encode_node, ast)))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, cache_path(cache_dir, key))
+        return True
+    except OSError:
+        os.remove(temp_path)
+        return False
+
+
+# cached_parse :: str -> str -> Callable -> Tuple[FuncDefNode, ...]
+def cached_parse(cache_dir: str, key: str, parse: Callable) -> Tuple[FuncDefNode, ...]:
+    """ Returns the cached ast for key or calls parse and caches its ast when there is none. """
+    ast = load_ast(cache_dir, key)
+    if ast is None:
+        ast = parse()
+        store_ast(cache_dir, key, ast)
+    return ast
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    key = source_key((file_content,), False)
+    print(cached_parse("__worsecache__", key, lambda: parser(lexer(file_content))))
@@ -1,11 +1,109 @@
+from array import array
 from copy import deepcopy
-from enum import Enum
-from typing import Tuple, List, Type, Dict, Optional, Callable, Union
+from itertools import chain
+from enum import Enum, IntEnum
+import operator
+from typing import Tuple, List, Type, Dict, Optional, Callable, Union, Any, FrozenSet, Iterator, Iterable
+
+
+class Frozen:
+    """ Base for objects that can't be changed anymore once they are created. """
+    __slots__ = ()
+
+    def _set(self, **fields: Any) -> None:
+        """ Sets the fields of a frozen object, only meant to be used from __init__. """
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def fields(self) -> Dict[str, Any]:
+        """ Returns the fields of a frozen object by name, whether they are kept in __slots__ or in a __dict__. """
+        names = chain.from_iterable(map(lambda cls: cls.__dict__.get("__slots__", ()), reversed(type(self).__mro__)))
+        return {**dict(map(lambda name: (name, getattr(self, name)), filter(lambda name: hasattr(self, name), names))),
+                **getattr(self, "__dict__", {})}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.fields()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._set(**state)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is frozen, \"{name}\" can't be set.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is frozen, \"{name}\" can't be deleted.")
+
+    def __copy__(self) -> "Frozen":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "Frozen":
+        return self
+
+
+class FrozenDict(dict):
+    """ Dict that can't be changed after creation, its values have to be immutable as well. """
+
+    def _frozen(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("FrozenDict can't be changed.")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _frozen
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "FrozenDict":
+        return self
+
+    def __reduce__(self) -> tuple:
+        return FrozenDict, (dict(self),)
+
+
+class FrozenTuple(tuple):
+    """ Tuple of which all elements are checked to be immutable once, so it doesn't have to be checked again. """
+
+    def __new__(cls, elements: Any = ()) -> "FrozenTuple":
+        frozen = super().__new__(cls, elements)
+        if not all(map(is_immutable, frozen)):
+            raise TypeError("FrozenTuple can only contain immutable elements.")
+        return frozen
+
+    def __copy__(self) -> "FrozenTuple":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "FrozenTuple":
+        return self
+
+    def __reduce__(self) -> tuple:
+        return FrozenTuple, (tuple(self),)
+
+
+class Shared:
+    """ Base for objects that are shared on purpose instead of copied when given as parameter, like caches. """
+    __slots__ = ()
+
+
+# replace :: Frozen -> Any -> Frozen
+def replace(frozen: Frozen, **fields: Any) -> Frozen:
+    """ Returns a copy of a frozen object with the given fields replaced. """
+    new = object.__new__(type(frozen))
+    new._set(**{**frozen.fields(), **fields})
+    return new
+
+
+# is_immutable :: Any -> bool
+def is_immutable(element: Any) -> bool:
+    """ Returns True if element and everything in it can't be changed. """
+    if isinstance(element, (int, float, str, bytes, type(None), Enum, Frozen, FrozenDict, FrozenTuple, type)):
+        return True
+    if isinstance(element, (tuple, frozenset)):
+        return all(map(is_immutable, element))
+    return False
 
 
 def deepcopy_decorator(func):
+    """ Deepcopies every given parameter, immutable and Shared parameters are passed through without a copy. """
     def inner(*args):
-        return func(*list(map(lambda element: deepcopy(element), args)))
+        return func(*list(map(lambda element: element if is_immutable(element) or isinstance(element, Shared) else deepcopy(element), args)))
     return inner
 
 
@@ -31,12 +129,26 @@ class TokenSpecies(Enum):
     DIGIT   = "[0-9]+"
 
 
-class Token:
+# Python function of every operator.
+OPERATORS = FrozenDict({TokenSpecies.ADD: operator.add,
+                        TokenSpecies.SUB: operator.sub,
+                        TokenSpecies.GREATER: operator.gt,
+                        TokenSpecies.LESSER: operator.lt,
+                        TokenSpecies.EQUALS: operator.eq,
+                        TokenSpecies.NOTEQUAL: operator.ne,
+                        TokenSpecies.MUL: operator.mul,
+                        TokenSpecies.DIV: operator.floordiv})
+
+
+class Token(Frozen):
+    __slots__ = ("content", "species", "pos")
+
     def __init__(self, species: Type[Enum], content: str, pos: int):
         """ Creates a Token containing content, pos and kind. """
-        self.content = content
-        self.species = species
-        self.pos = pos
+        # Set directly instead of with _set, the lexers create a Token for every match.
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "species", species)
+        object.__setattr__(self, "pos", pos)
 
     def __str__(self) -> str:
         """ returns content, pos and kind of Token. """
@@ -48,12 +160,74 @@ class Token:
 
 
 
-class Node:
+class TokenBuffer(Frozen):
+    """ Tokens kept as columns of arrays, with the species as an index into species and the content as a slice of text.
+    A Token is only created when it is asked for, so a token takes 9 bytes instead of a Token object and its content. """
+    __slots__ = ("text", "species", "codes", "starts", "lengths")
+
+    def __init__(self, text: str, species: Tuple[Enum, ...], codes: array, starts: array, lengths: array):
+        """ Init for TokenBuffer, the arrays are not copied and shouldn't be changed anymore. """
+        self._set(text=text, species=tuple(species), codes=codes, starts=starts, lengths=lengths)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, pos: int) -> Token:
+        """ Returns a Token for the token at pos, or raises an IndexError if pos is at the end of the tokens. """
+        start = self.starts[pos]
+        return Token(self.species[self.codes[pos]], self.text[start:start + self.lengths[pos]], start)
+
+    def nbytes(self) -> int:
+        """ Returns the amount of bytes in the columns, without the text. """
+        return sum(map(lambda column: column.itemsize * len(column), (self.codes, self.starts, self.lengths)))
+
+    def __str__(self) -> str:
+        return f"TokenBuffer with {len(self)} tokens in {self.nbytes()} bytes"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class TokenStream(Shared):
+    """ Gives indexed access to tokens that are lexed lazily, only the tokens from the last release on are kept. """
+
+    def __init__(self, tokens: Iterator[Token]):
+        """ Init for TokenStream. """
+        self.tokens = tokens
+        self.offset = 0
+        self.window = []
+
+    def __getitem__(self, pos: int) -> Token:
+        """ Returns the token at pos, lexing more tokens if they haven't been lexed yet. """
+        if pos < self.offset:
+            raise LookupError(f"Token {pos} has already been released by the TokenStream.")
+        while pos >= self.offset + len(self.window):
+            token = next(self.tokens, None)
+            if token is None:
+                raise IndexError(f"TokenStream has no token at {pos}.")
+            self.window.append(token)
+        return self.window[pos - self.offset]
+
+    def release(self, pos: int) -> None:
+        """ Forgets all tokens before pos. """
+        if pos > self.offset:
+            del self.window[:pos - self.offset]
+            self.offset = pos
+
+    def __str__(self) -> str:
+        return f"TokenStream at {self.offset} with {len(self.window)} tokens in window"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class Node(Frozen):
     """ Base class for nodes. """
+    __slots__ = ("pos",)
 
     def __init__(self, pos: int):
         """ Init for Node. """
-        self.pos = pos
+        self._set(pos=pos)
 
     def __str__(self) -> str:
         return f"Empty base Node at {self.pos}"
@@ -64,6 +238,8 @@ class Node:
 
 class ValueNode(Node):
     """ Nodes that can return values. """
+    __slots__ = ()
+
     def __init__(self, pos: int):
         """ Init for Node. """
         Node.__init__(self, pos)
@@ -76,10 +252,12 @@ class ValueNode(Node):
 
 
 class IntNode(ValueNode):
+    __slots__ = ("value",)
+
     def __init__(self, value: Token):
         """ Init for IntNode. """
         ValueNode.__init__(self, value.pos)
-        self.value = value.content
+        self._set(value=value.content)
 
     def __str__(self) -> str:
         return f"{self.value}"
@@ -89,10 +267,12 @@ class IntNode(ValueNode):
 
 
 class VariableNode(ValueNode):
+    __slots__ = ("name",)
+
     def __init__(self, name: Token):
         """ Init for VariableNode. """
         ValueNode.__init__(self, name.pos)
-        self.name = name.content
+        self._set(name=name.content)
 
     def __str__(self) -> str:
         return self.__repr__()
@@ -102,11 +282,12 @@ class VariableNode(ValueNode):
 
 
 class FuncExeNode(ValueNode):
-    def __init__(self, name: Token, params: List[Type[Node]]):
+    __slots__ = ("name", "params")
+
+    def __init__(self, name: Token, params: Tuple[Type[Node], ...]):
         """ Init for FuncExeNode. """
         ValueNode.__init__(self, name.pos)
-        self.name = name.content
-        self.params = params
+        self._set(name=name.content, params=tuple(params))
 
     def __str__(self) -> str:
         return self.__repr__()
@@ -117,12 +298,11 @@ class FuncExeNode(ValueNode):
 
 class OperationNode(ValueNode):
     """ Init for operationNode. """
+    __slots__ = ("lhs", "operator", "rhs")
 
     def __init__(self, lhs: Type[ValueNode], operator: Token, rhs: Type[ValueNode]):
         ValueNode.__init__(self, operator.pos)
-        self.operator = operator.species
-        self.rhs = rhs
-        self.lhs = lhs
+        self._set(operator=operator.species, rhs=rhs, lhs=lhs)
 
     def __str__(self) -> str:
         return f"({self.lhs} {self.operator} {self.rhs})"
@@ -133,6 +313,8 @@ class OperationNode(ValueNode):
 
 class ActionNode(Node):
     """ Nodes that do an action. """
+    __slots__ = ()
+
     def __init__(self, pos: int):
         """ Init for Node. """
         Node.__init__(self, pos)
@@ -145,11 +327,12 @@ class ActionNode(Node):
 
 
 class AssignNode(ActionNode):
+    __slots__ = ("name", "value")
+
     def __init__(self, variable: Token, value: Type[ValueNode]):
         """ Init for AssignNode. """
         ActionNode.__init__(self, variable.pos)
-        self.name = variable.content
-        self.value = value
+        self._set(name=variable.content, value=value)
 
     def __str__(self) -> str:
         return f"{self.name} = {self.value}"
@@ -159,10 +342,12 @@ class AssignNode(ActionNode):
 
 
 class PrintNode(ActionNode):
-    def __init__(self, value: List[Type[ValueNode]], pos: int):
+    __slots__ = ("value",)
+
+    def __init__(self, value: Tuple[Type[ValueNode], ...], pos: int):
         """ Init for PrintNode. """
         ActionNode.__init__(self, pos)
-        self.value = value
+        self._set(value=tuple(value))
 
     def __str__(self) -> str:
         return f"print {self.value}"
@@ -172,12 +357,12 @@ class PrintNode(ActionNode):
 
 
 class IfWhileNode(ActionNode):
-    def __init__(self, condition: Type[ValueNode], actions: List[Type[ActionNode]], is_while: bool):
+    __slots__ = ("condition", "actions", "is_while")
+
+    def __init__(self, condition: Type[ValueNode], actions: Tuple[Type[ActionNode], ...], is_while: bool):
         """ Init for IfWhileNode. """
         ActionNode.__init__(self, condition.pos)
-        self.condition = condition
-        self.actions = actions
-        self.is_while = is_while
+        self._set(condition=condition, actions=tuple(actions), is_while=is_while)
 
     def __str__(self) -> str:
         loop = "while" if self.is_while else "if"
@@ -188,12 +373,12 @@ class IfWhileNode(ActionNode):
 
 
 class FuncDefNode(Node):
-    def __init__(self, name: Token, params: Dict[str, int], actions: List[Type[ActionNode]]):
+    __slots__ = ("name", "params", "actions")
+
+    def __init__(self, name: Token, params: Tuple[str, ...], actions: Tuple[Type[ActionNode], ...]):
         """ Init for FuncDefNode. """
         Node.__init__(self, name.pos)
-        self.name = name.content
-        self.params = params
-        self.actions = actions
+        self._set(name=name.content, params=tuple(params), actions=tuple(actions))
 
     def __str__(self) -> str:
         return f"Define {self.name}({self.params}){self.actions};"
@@ -202,4 +387,166 @@ class FuncDefNode(Node):
         return self.__str__()
 
 
+class ConstNode(ValueNode):
+    __slots__ = ("value",)
+
+    def __init__(self, value: int, pos: int):
+        """ Init for ConstNode, an IntNode of which the value has been converted to an int once. """
+        ValueNode.__init__(self, pos)
+        self._set(value=value)
+
+    def __str__(self) -> str:
+        return f"{self.value}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class ApplyNode(ValueNode):
+    __slots__ = ("lhs", "operator", "function", "rhs")
+
+    def __init__(self, operation: OperationNode, lhs: Type[ValueNode], rhs: Type[ValueNode]):
+        """ Init for ApplyNode, an OperationNode that is bound to the Python function of its operator. """
+        ValueNode.__init__(self, operation.pos)
+        self._set(operator=operation.operator, function=OPERATORS[operation.operator], lhs=lhs, rhs=rhs)
+
+    def __str__(self) -> str:
+        return f"({self.lhs} {self.operator} {self.rhs})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class SlotNode(ValueNode):
+    __slots__ = ("name", "slot")
+
+    def __init__(self, variable: VariableNode, slot: int):
+        """ Init for SlotNode, a VariableNode that reads the variable at slot of its frame. """
+        ValueNode.__init__(self, variable.pos)
+        self._set(name=variable.name, slot=slot)
+
+    def __str__(self) -> str:
+        return f"{self.name}@{self.slot}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class CallNode(ValueNode):
+    __slots__ = ("name", "params", "callee")
+
+    def __init__(self, call: FuncExeNode, params: Tuple[Type[ValueNode], ...], callee: int):
+        """ Init for CallNode, a FuncExeNode that is bound to the function at index callee with the right arity. """
+        ValueNode.__init__(self, call.pos)
+        self._set(name=call.name, params=tuple(params), callee=callee)
+
+    def __str__(self) -> str:
+        return f"{self.name}@{self.callee} {self.params}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class FailNode(ValueNode):
+    __slots__ = ("message", "params")
+
+    def __init__(self, message: str, params: Tuple[Type[ValueNode], ...], pos: int):
+        """ Init for FailNode, a call that raises message once its params have been evaluated. """
+        ValueNode.__init__(self, pos)
+        self._set(message=message, params=tuple(params))
+
+    def __str__(self) -> str:
+        return f"fail {self.params}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class SlotAssignNode(ActionNode):
+    __slots__ = ("name", "value", "slot")
+
+    def __init__(self, assign: AssignNode, value: Type[ValueNode], slot: int):
+        """ Init for SlotAssignNode, an AssignNode that writes to the variable at slot of its frame. """
+        ActionNode.__init__(self, assign.pos)
+        self._set(name=assign.name, value=value, slot=slot)
+
+    def __str__(self) -> str:
+        return f"{self.name}@{self.slot} = {self.value}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class ResolvedFunction(Frozen):
+    def __init__(self, function: FuncDefNode, varnames: Tuple[str, ...], actions: Tuple[Type[ActionNode], ...]):
+        """ Creates a resolved function, the variable called varnames[i] is kept at slot i and the params come first. """
+        self._set(name=function.name, pos=function.pos, varnames=tuple(varnames), argcount=len(function.params),
+                  sos=varnames.index("sos"), actions=tuple(actions))
+
+    def __str__(self) -> str:
+        return f"Define {self.name}({', '.join(self.varnames[:self.argcount])}){self.actions};"
+
+    def __repr__(self) -> str:
+        return f"ResolvedFunction {self.name} with {len(self.varnames)} slots"
+
+
+class Resolution(Frozen):
+    def __init__(self, functions: Tuple[ResolvedFunction, ...], problems: Tuple[str, ...]):
+        """ Creates the resolution of a program, index refers from a function name to its position in functions.
+        problems are the errors that will be raised if the code that causes them is ever run. """
+        self._set(functions=tuple(functions), problems=tuple(problems),
+                  index=FrozenDict(map(lambda i: (functions[i].name, i), range(len(functions)))))
+
+    def __str__(self) -> str:
+        return "\n".join(map(str, self.functions))
+
+    def __repr__(self) -> str:
+        return f"Resolution {list(self.index.keys())} with {len(self.problems)} problems"
+
+
+class Opcode(IntEnum):
+    CONST        = 0
+    LOAD         = 1
+    STORE        = 2
+    ADD          = 3
+    SUB          = 4
+    MUL          = 5
+    DIV          = 6
+    EQUALS       = 7
+    NOTEQUAL     = 8
+    GREATER      = 9
+    LESSER       = 10
+    JUMP         = 11
+    JUMP_IF_ZERO = 12
+    CALL         = 13
+    RETURN       = 14
+    PRINT        = 15
+    RAISE        = 16
+
+
+class Code(Frozen):
+    def __init__(self, name: str, pos: int, varnames: Tuple[str, ...], argcount: int, instructions: Tuple[Tuple[Opcode, Any, int], ...]):
+        """ Creates bytecode for a function, instructions are (opcode, argument, character position) triples. """
+        self._set(name=name, pos=pos, varnames=tuple(varnames), argcount=argcount,
+                  ops=tuple(map(lambda instr: (int(instr[0]), instr[1]), instructions)),
+                  positions=tuple(map(lambda instr: instr[2], instructions)))
+
+    def __str__(self) -> str:
+        lines = map(lambda i: f"  {i:>4} {Opcode(self.ops[i][0]).name:<12} {self.ops[i][1]!r:<8} @{self.positions[i]}",
+                    range(len(self.ops)))
+        return f"Code {self.name}({', '.join(self.varnames[:self.argcount])})\n" + "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"Code {self.name} with {len(self.ops)} instructions"
+
+
+class Program(Frozen):
+    def __init__(self, codes: Tuple[Code, ...]):
+        """ Creates a Program out of the bytecode of all functions, index refers from a function name to its code. """
+        self._set(codes=tuple(codes), index=FrozenDict(map(lambda i: (codes[i].name, i), range(len(codes)))))
+
+    def __str__(self) -> str:
+        return "\n\n".join(map(str, self.codes))
 
+    def __repr__(self) -> str:
+        return f"Program {list(self.index.keys())}"
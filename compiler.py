@@ -0,0 +1,103 @@
+from lexer import lexer
+from parse import parser
+from classes import *
+
+
+Instructions = Tuple[Tuple[Opcode, Any, int], ...]
+
+
+# collect_names :: Tuple[Type[Node], ...] -> Tuple[str, ...]
+@deepcopy_decorator
+def collect_names(nodes: Tuple[Type[Node], ...]) -> Tuple[str, ...]:
+    """ Returns the names of all variables that are used or assigned in nodes in order of appearance. """
+    def names(node: Type[Node]) -> Tuple[str, ...]:
+        if isinstance(node, VariableNode):
+            return node.name,
+        elif isinstance(node, OperationNode):
+            return names(node.lhs) + names(node.rhs)
+        elif isinstance(node, FuncExeNode):
+            return collect_names(node.params)
+        elif isinstance(node, AssignNode):
+            return (node.name,) + names(node.value)
+        elif isinstance(node, PrintNode):
+            return collect_names(node.value)
+        elif isinstance(node, IfWhileNode):
+            return names(node.condition) + collect_names(node.actions)
+        return ()
+    return tuple(dict.fromkeys(sum(map(names, nodes), ())))
+
+
+# compile_value :: Type[ValueNode] -> Dict[str, int] -> Dict[str, FuncDefNode] -> Dict[str, int] -> Instructions
+@deepcopy_decorator
+def compile_value(value: Type[ValueNode], slots: Dict[str, int], functions: Dict[str, FuncDefNode], index: Dict[str, int]) -> Instructions:
+    """ Compiles a value to instructions that leave its integer on the stack. """
+    if isinstance(value, OperationNode):
+        lhs = compile_value(value.lhs, slots, functions, index)
+        rhs = compile_value(value.rhs, slots, functions, index)
+        return lhs + rhs + ((Opcode[value.operator.name], None, value.pos),)
+
+    elif isinstance(value, VariableNode):
+        return (Opcode.LOAD, slots[value.name], value.pos),
+
+    elif isinstance(value, IntNode):
+        return (Opcode.CONST, int(value.value), value.pos),
+
+    # FuncExeNode
+    if value.name not in functions.keys():
+        return (Opcode.RAISE, f"Function \"{value.name}\" at character {value.pos} does not exist.", value.pos),
+    params = sum(map(lambda param: compile_value(param, slots, functions, index), value.params), ())
+    if len(value.params) != len(functions[value.name].params):
+        return params + ((Opcode.RAISE, f"Params for \"{value.name}\" given at character {value.pos} dont match function.", value.pos),)
+    return params + ((Opcode.CALL, index[value.name], value.pos),)
+
+
+# compile_actions :: Tuple[Type[ActionNode], ...] -> Dict[str, int] -> Dict[str, FuncDefNode] -> Dict[str, int] -> Instructions
+@deepcopy_decorator
+def compile_actions(actions: Tuple[Type[ActionNode], ...], slots: Dict[str, int], functions: Dict[str, FuncDefNode], index: Dict[str, int]) -> Instructions:
+    """ Compiles actions to instructions, jumps are relative to the instruction after the jump. """
+    def compile_action(action: Type[ActionNode]) -> Instructions:
+        if isinstance(action, AssignNode):
+            return compile_value(action.value, slots, functions, index) + ((Opcode.STORE, slots[action.name], action.pos),)
+
+        elif isinstance(action, PrintNode):
+            values = sum(map(lambda val: compile_value(val, slots, functions, index), action.value), ())
+            return values + ((Opcode.PRINT, len(action.value), action.pos),)
+
+        # IfWhileNode
+        condition = compile_value(action.condition, slots, functions, index)
+        body = compile_actions(action.actions, slots, functions, index)
+        if action.is_while:
+            loop_back = (Opcode.JUMP, -(len(condition) + 1 + len(body) + 1), action.pos),
+            return condition + ((Opcode.JUMP_IF_ZERO, len(body) + 1, action.pos),) + body + loop_back
+        return condition + ((Opcode.JUMP_IF_ZERO, len(body), action.pos),) + body
+
+    return sum(map(compile_action, actions), ())
+
+
+# compile_function :: FuncDefNode -> Dict[str, FuncDefNode] -> Dict[str, int] -> Code
+@deepcopy_decorator
+def compile_function(function: FuncDefNode, functions: Dict[str, FuncDefNode], index: Dict[str, int]) -> Code:
+    """ Compiles a function definition to bytecode that ends by returning sos. """
+    varnames = tuple(dict.fromkeys(function.params + collect_names(function.actions) + ("sos",)))
+    slots = FrozenDict(map(lambda i: (varnames[i], i), range(len(varnames))))
+    body = compile_actions(function.actions, slots, functions, index)
+    return Code(function.name, function.pos, varnames, len(function.params), body + ((Opcode.RETURN, slots["sos"], function.pos),))
+
+
+# compiler :: Tuple[FuncDefNode, ...] -> Program
+@deepcopy_decorator
+def compiler(ast: Tuple[FuncDefNode, ...]) -> Program:
+    """ Compiles all functions in the ast to bytecode, a later definition of a function replaces an earlier one. """
+    functions = FrozenDict(map(lambda func: (func.name, func), ast))
+    names = tuple(functions.keys())
+    index = FrozenDict(map(lambda i: (names[i], i), range(len(names))))
+    return Program(tuple(map(lambda name: compile_function(functions[name], functions, index), names)))
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    tokenized_code = lexer(file_content)
+    print(compiler(parser(tokenized_code)))
@@ -0,0 +1,124 @@
+from lexer import lexer, master_pattern, match_tokens, UNKNOWNS
+from parse import parser, parse_function
+from classes import *
+from bisect import bisect_left, bisect_right
+
+
+class Document(Frozen):
+    """ Text with its tokens and ast, kept so an edit of the text only has to lex and parse the functions it touches.
+    bounds has the index of the first token of every function and the index after its last token. """
+    __slots__ = ("text", "tokens", "ast", "bounds")
+
+    def __init__(self, text: str, tokens: Tuple[Token, ...], ast: Tuple[FuncDefNode, ...], bounds: Tuple[Tuple[int, int], ...]):
+        """ Init for Document. """
+        self._set(text=text, tokens=FrozenTuple(tokens), ast=FrozenTuple(ast), bounds=FrozenTuple(bounds))
+
+    def __str__(self) -> str:
+        return f"Document of {len(self.text)} characters, {len(self.tokens)} tokens and {len(self.ast)} functions"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# shift_node :: Type[Node] -> int -> Type[Node]
+@deepcopy_decorator
+def shift_node(node: Type[Node], delta: int) -> Type[Node]:
+    """ Returns node with the positions of it and everything under it moved by delta. """
+    def shift_all(nodes: Tuple[Type[Node], ...]) -> Tuple[Type[Node], ...]:
+        return tuple(map(lambda child: shift_node(child, delta), nodes))
+
+    pos = node.pos + delta
+    if isinstance(node, IntNode):
+        return IntNode(Token(TokenSpecies.DIGIT, node.value, pos))
+    elif isinstance(node, VariableNode):
+        return VariableNode(Token(TokenSpecies.ID, node.name, pos))
+    elif isinstance(node, FuncExeNode):
+        return FuncExeNode(Token(TokenSpecies.ID, node.name, pos), shift_all(node.params))
+    elif isinstance(node, OperationNode):
+        return OperationNode(shift_node(node.lhs, delta), Token(node.operator, "", pos), shift_node(node.rhs, delta))
+    elif isinstance(node, AssignNode):
+        return AssignNode(Token(TokenSpecies.ID, node.name, pos), shift_node(node.value, delta))
+    elif isinstance(node, PrintNode):
+        return PrintNode(shift_all(node.value), pos)
+    elif isinstance(node, IfWhileNode):
+        return IfWhileNode(shift_node(node.condition, delta), shift_all(node.actions), node.is_while)
+    return FuncDefNode(Token(TokenSpecies.ID, node.name, pos), node.params, shift_all(node.actions))
+
+
+# parse_functions :: Tuple[Token, ...] -> int -> Callable[[int], bool] -> Tuple[Tuple[FuncDefNode, ...], Tuple[Tuple[int, int], ...], int]
+@deepcopy_decorator
+def parse_functions(tokens: Tuple[Token, ...], pos: int, is_done: Callable[[int], bool]) -> Tuple[Tuple[FuncDefNode, ...], Tuple[Tuple[int, int], ...], int]:
+    """ Parses functions from pos until is_done says the position after a function is far enough or the tokens run out.
+    Returns the functions, their bounds and the position after the last one. """
+    functions, bounds = [], []
+    while pos < len(tokens) and not is_done(pos):
+        function, end = parse_function(tokens, pos)
+        functions.append(function)
+        bounds.append((pos, end))
+        pos = end
+    return tuple(functions), tuple(bounds), pos
+
+
+# document :: str -> Document
+@deepcopy_decorator
+def document(text: str) -> Document:
+    """ Lexes and parses the whole text. """
+    tokens = lexer(text)
+    if not tokens:
+        parser(tokens)
+    ast, bounds, _ = parse_functions(tokens, 0, lambda pos: False)
+    return Document(text, tokens, ast, bounds)
+
+
+# edit :: Document -> int -> int -> str -> Document
+@deepcopy_decorator
+def edit(doc: Document, start: int, end: int, replacement: str) -> Document:
+    """ Replaces the characters from start up to end with replacement, which gives the same Document as lexing and
+    parsing the new text from scratch and raises the same errors.
+    Only the text from the end of the last function before the edit up to the start of the first function after it is
+    lexed again. Those are separated from the edit by at least one character that isn't part of a token, so no token
+    that crosses them can change. The functions in it are parsed again, when one of them now runs on into a later
+    function that one is parsed again as well. Everything after the edit is only moved by the change in length. """
+    text = doc.text[:start] + replacement + doc.text[end:]
+    delta = len(replacement) - (end - start)
+    tokens, bounds = doc.tokens, doc.bounds
+
+    # Functions reach from their first character up to and including the character after their last.
+    starts = tuple(map(lambda bound: tokens[bound[0]].pos, bounds))
+    ends = tuple(map(lambda bound: tokens[bound[1] - 1].pos + len(tokens[bound[1] - 1].content), bounds))
+    first = bisect_left(ends, start)
+    last = bisect_right(starts, end)
+
+    text_from = ends[first - 1] if first > 0 else 0
+    text_to = starts[last] + delta if last < len(bounds) else len(text)
+    tokens_from = bounds[first - 1][1] if first > 0 else 0
+    tokens_to = bounds[last][0] if last < len(bounds) else len(tokens)
+
+    pattern, species = master_pattern(TokenSpecies, UNKNOWNS)
+    lexed = match_tokens(pattern.finditer(text, text_from, text_to), species)
+    moved = tuple(map(lambda token: Token(token.species, token.content, token.pos + delta), tokens[tokens_to:])) if delta else tokens[tokens_to:]
+    new_tokens = FrozenTuple(tokens[:tokens_from] + lexed + moved)
+    if not new_tokens:
+        parser(new_tokens)
+
+    # Index of the new tokens at which every function after the edit now starts.
+    offset = tokens_from + len(lexed) - tokens_to
+    later_starts = FrozenDict(map(lambda index: (bounds[index][0] + offset, index), range(last, len(bounds))))
+    parsed, parsed_bounds, pos = parse_functions(new_tokens, tokens_from, lambda pos: pos >= tokens_from + len(lexed) and pos in later_starts)
+
+    reused = range(later_starts[pos], len(bounds)) if pos in later_starts else range(0)
+    ast = doc.ast[:first] + parsed + tuple(map(lambda index: shift_node(doc.ast[index], delta) if delta else doc.ast[index], reused))
+    new_bounds = bounds[:first] + parsed_bounds + tuple(map(lambda index: (bounds[index][0] + offset, bounds[index][1] + offset), reused))
+    return Document(text, new_tokens, ast, new_bounds)
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    doc = document(file_content)
+    print(doc)
+    changed = edit(doc, 0, 0, "?extra()\n    sos = 1;\n;\n")
+    print(changed)
+    print(changed.ast[0])
@@ -1,4 +1,5 @@
 import re
+from itertools import chain
 from classes import *
 
 
@@ -11,87 +12,197 @@ class LexerError(Exception):
         super().__init__(f"Encountered unknown char \"{self.char}\" at {self.postype} {self.pos}")
 
 
-# lexer :: str -> Type[Enum] -> str -> List[Token]
+UNKNOWNS = r"[^\:\=\!\+\-\(\)\,\;\?\s\w]"
+
+# Master pattern and species of every group of it by rules and unknowns, so each combination is only compiled once.
+MASTER_PATTERNS = {}
+
+# Group of the whitespace between tokens in every master pattern, the groups of the rules come right after it.
+SPACE = 1
+
+
+# master_pattern :: Type[Enum] -> str -> Tuple[re.Pattern, Tuple[Optional[Type[Enum]], ...]]
+def master_pattern(rules: Type[Enum], unknowns: str) -> Tuple[re.Pattern, Tuple[Optional[Type[Enum]], ...]]:
+    """ Joins every rule into a single pattern with a group per rule, after a group for whitespace and followed by a
+    last group for unknown chars. Returns the pattern with the species of each group by its index, which is None for
+    the whitespace and the unknown group.
+    A run of whitespace is a match of its own, so the rules aren't all tried on every space and a run that isn't
+    followed by a token is only scanned once. """
+    key = rules, unknowns
+    if key not in MASTER_PATTERNS:
+        joined = "|".join([r"(\s+)"] + list(map(lambda r: f"(?P<{r.name}>{r.value})", rules)) + [f"({unknowns})"])
+        MASTER_PATTERNS[key] = re.compile(joined), (None, None) + tuple(rules) + (None,)
+    return MASTER_PATTERNS[key]
+
+
+# match_group :: re.Match -> Tuple[Optional[Type[Enum]], ...] -> int
+def match_group(match: re.Match, species: Tuple[Optional[Type[Enum]], ...]) -> int:
+    """ Returns the group of the rule that a match of a master pattern matched, species is the one that came with the
+    pattern. Raises a LexerError if the match is an unknown char. """
+    group = match.lastindex
+    if species[group] is None:
+        raise LexerError(match[group], "char pos", match.start(group))
+    return group
+
+
+# match_token :: re.Match -> Tuple[Optional[Type[Enum]], ...] -> Token
+def match_token(match: re.Match, species: Tuple[Optional[Type[Enum]], ...]) -> Token:
+    """ Turns a match of a master pattern that isn't whitespace into a Token, species is the one that came with the
+    pattern. Raises a LexerError if the match is an unknown char. """
+    group = match_group(match, species)
+    return Token(species[group], match[group], match.start(group))
+
+
+# match_tokens :: Iterator[re.Match] -> Tuple[Optional[Type[Enum]], ...] -> Tuple[Token, ...]
+def match_tokens(matches: Iterator[re.Match], species: Tuple[Optional[Type[Enum]], ...]) -> Tuple[Token, ...]:
+    """ Turns the matches of a master pattern into Tokens, the whitespace between them is skipped. """
+    return FrozenTuple(map(lambda match: match_token(match, species), filter(lambda match: match.lastindex != SPACE, matches)))
+
+
+# lexer :: str -> Type[Enum] -> str -> Tuple[Token, ...]
+@deepcopy_decorator
+def lexer(code: str, rules: Type[Enum] = TokenSpecies, unknowns: str = UNKNOWNS) -> Tuple[Token, ...]:
+    """ Finds all tokens in string and throws LexerError if an unknown is found.
+    Tokens and unknowns are found in the same pass, an unknown can't be part of a token so the first unknown in the
+    code is still the one that is reported. """
+    pattern, species = master_pattern(rules, unknowns)
+    return match_tokens(pattern.finditer(code), species)
+
+
+# compact_lexer :: str -> Type[Enum] -> str -> TokenBuffer
 @deepcopy_decorator
-def lexer(code: str, rules: Type[Enum] = TokenSpecies, unknowns: str = r"[^\:\=\!\+\-\(\)\,\;\?\s\w]") -> List[Token]:
-    """ Finds all tokens in string and throws LexerError if an unknown is found"""
-    # Check for unknowns and throw LexerError if found.
-    if unknown := list(re.compile(unknowns).finditer(code)):
-        raise LexerError(unknown[0][0], "char pos", unknown[0].start())
+def compact_lexer(code: str, rules: Type[Enum] = TokenSpecies, unknowns: str = UNKNOWNS) -> TokenBuffer:
+    """ Finds the same tokens as lexer, but keeps them in the columns of a TokenBuffer instead of in Token objects. """
+    pattern, species = master_pattern(rules, unknowns)
+    codes, starts, lengths = array("B"), array("I"), array("I")
+    for match in pattern.finditer(code):
+        if match.lastindex != SPACE:
+            # The groups of the rules come right after the whitespace group, in the order of rules.
+            codes.append(match_group(match, species) - SPACE - 1)
+            starts.append(match.start())
+            lengths.append(match.end() - match.start())
+    return TokenBuffer(code, tuple(rules), codes, starts, lengths)
+
+
+# lexer_stream :: Iterable[str] -> Type[Enum] -> str -> Iterator[Token]
+def lexer_stream(chunks: Iterable[str], rules: Type[Enum] = TokenSpecies, unknowns: str = UNKNOWNS) -> Iterator[Token]:
+    """ Lazily yields the same tokens as lexer for the text that is given in chunks.
+    Every token pattern looks at most one character ahead or behind, so a match that ends before the end of the text
+    read so far is final. The rest is scanned again with the next chunk, with one character before it to look behind.
+    An unknown char raises a LexerError when its chunk is reached instead of before the first token. """
+    search = re.compile("|".join(list(map(lambda r: f"(?P<{r.name}>{r.value})", rules)))).finditer
+    find_unknown = re.compile(unknowns).search
+
+    carry = ""
+    base = 0  # Position of carry[0] in the whole text.
+    scan_from = 0
+    for chunk in chunks:
+        if unknown := find_unknown(chunk):
+            raise LexerError(unknown[0], "char pos", base + len(carry) + unknown.start())
+        buffer = carry + chunk
+        # Without a match that runs into the end, only a lone "!" or ":" at the end can still become a token.
+        rescan_from = max(scan_from, len(buffer) - 1)
+        for match in search(buffer, scan_from):
+            if match.end() >= len(buffer):
+                rescan_from = match.start()
+                break
+            rescan_from = max(match.end(), rescan_from)
+            yield Token(rules[match.lastgroup], match[0], base + match.start())
+
+        keep_from = max(rescan_from - 1, 0)
+        carry = buffer[keep_from:]
+        base += keep_from
+        scan_from = rescan_from - keep_from
+
+    for match in search(carry, scan_from):
+        yield Token(rules[match.lastgroup], match[0], base + match.start())
 
-    # Create regex search func.
-    joined_rules = "|".join(list(map(lambda r: f"(?P<{r.name}>{r.value})", rules)))
-    search = re.compile(joined_rules).finditer
 
-    # Create list of found tokens and return them
-    return list(map(lambda m: Token(rules[m.lastgroup], m[0], m.start()), search(code)))
+# find_unknown :: Iterable[str] -> str -> None
+def find_unknown(chunks: Iterable[str], unknowns: str = UNKNOWNS) -> None:
+    """ Raises a LexerError for the first unknown char in the text that is given in chunks. """
+    search = re.compile(unknowns).search
+    pos = 0
+    for chunk in chunks:
+        if unknown := search(chunk):
+            raise LexerError(unknown[0], "char pos", pos + unknown.start())
+        pos += len(chunk)
 
 
+# read_chunks :: str -> int -> Iterator[str]
+def read_chunks(filename: str, size: int = 1 << 16) -> Iterator[str]:
+    """ Reads a file as text in chunks of size characters. """
+    with open(filename) as file:
+        while chunk := file.read(size):
+            yield chunk
+
+
+# Decoding table of every morse code, made once instead of on every call.
+MORSE_CODES = FrozenDict({
+    ".-":   "a",
+    "-...": "b",
+    "-.-.": "c",
+    "-..":  "d",
+    ".":    "e",
+    "..-.": "f",
+    "--.":  "g",
+    "....": "h",
+    "..":   "i",
+    ".---": "j",
+    "-.-":  "k",
+    ".-..": "l",
+    "--":   "m",
+    "-.":   "n",
+    "---":  "o",
+    ".--.": "p",
+    "--.-": "q",
+    ".-.":  "r",
+    "...":  "s",
+    "-":    "t",
+    "..-":  "u",
+    "...-": "v",
+    ".--":  "w",
+    "-..-": "x",
+    "-.--": "y",
+    "--..": "z",
+    "-----": "0",
+    ".----": "1",
+    "..---": "2",
+    "...--": "3",
+    "....-": "4",
+    ".....": "5",
+    "-....": "6",
+    "--...": "7",
+    "---..": "8",
+    "----.": "9",
+
+    ".-.-.-": ".",
+    "--..--": ",",
+    "..--..": "?",
+    ".----.": "'",
+    "-.-.--": "!",
+    "-..-.":  "/",
+
+    "-.--.-": ")",
+    "-.--.":  "(",
+    ".–...":  "&",
+    "---...": ":",
+    "-.-.-.": ";",
+    "-...-":  "=",
+
+    ".-.-.":  "+",
+    "-....-": "-",
+    "..--.-": "_",
+    ".--.-.": "@",
+    "/":      " ",
+    "\n":     "\n",
+    "\t":     "\t"
+})
+
 # morse_converter :: str -> bool -> str
 @deepcopy_decorator
 def morse_to_string(text: str) -> str:
     """ Converts text to morse when is_morse is False and converts morse text to text if is_morse is True. """
-    morse = {
-        ".-":   "a",
-        "-...": "b",
-        "-.-.": "c",
-        "-..":  "d",
-        ".":    "e",
-        "..-.": "f",
-        "--.":  "g",
-        "....": "h",
-        "..":   "i",
-        ".---": "j",
-        "-.-":  "k",
-        ".-..": "l",
-        "--":   "m",
-        "-.":   "n",
-        "---":  "o",
-        ".--.": "p",
-        "--.-": "q",
-        ".-.":  "r",
-        "...":  "s",
-        "-":    "t",
-        "..-":  "u",
-        "...-": "v",
-        ".--":  "w",
-        "-..-": "x",
-        "-.--": "y",
-        "--..": "z",
-        "-----": "0",
-        ".----": "1",
-        "..---": "2",
-        "...--": "3",
-        "....-": "4",
-        ".....": "5",
-        "-....": "6",
-        "--...": "7",
-        "---..": "8",
-        "----.": "9",
-
-        ".-.-.-": ".",
-        "--..--": ",",
-        "..--..": "?",
-        ".----.": "'",
-        "-.-.--": "!",
-        "-..-.":  "/",
-
-        "-.--.-": ")",
-        "-.--.":  "(",
-        ".–...":  "&",
-        "---...": ":",
-        "-.-.-.": ";",
-        "-...-":  "=",
-
-        ".-.-.":  "+",
-        "-....-": "-",
-        "..--.-": "_",
-        ".--.-.": "@",
-        "/":      " ",
-        "\n":     "\n",
-        "\t":     "\t"
-
-    }
     new_text = text.lower()
 
     # Check for unknowns
@@ -100,11 +211,87 @@ def morse_to_string(text: str) -> str:
 
     # Convert to string
     morse_items = re.compile(r"[.\-\/]+").findall(new_text)
-    result = "".join(map(lambda x: morse[x], morse_items))
+    result = "".join(map(lambda x: MORSE_CODES[x], morse_items))
 
     return result
 
 
+# Finds a morse code or a single char that can't be part of morse text.
+MORSE_SCAN = re.compile(r"[.\-/]+|[^-./\s]")
+
+# Decoding table of the morse codes for chars that lexer doesn't consider unknown.
+MORSE_CHARS = FrozenDict(filter(lambda item: not re.match(UNKNOWNS, item[1]), MORSE_CODES.items()))
+
+# Species of the tokens that are always a single char.
+SINGLE_CHARS = FrozenDict({"?": TokenSpecies.DEF, ";": TokenSpecies.END, ",": TokenSpecies.SEP,
+                           "(": TokenSpecies.OPENBR, ")": TokenSpecies.CLOSEBR})
+
+KEYWORDS = FrozenDict({"while": TokenSpecies.WHILE, "if": TokenSpecies.IF, "print": TokenSpecies.PRINT})
+
+DIGITS = frozenset("0123456789")
+LETTERS = frozenset("abcdefghijklmnopqrstuvwxyz")
+WORD_CHARS = DIGITS | LETTERS | frozenset("_")
+
+
+# morse_lexer :: str -> Tuple[Token, ...]
+@deepcopy_decorator
+def morse_lexer(text: str) -> Tuple[Token, ...]:
+    """ Gives the tokens of lexer(morse_to_string(text)) in a single pass over the morse text without decoding it first.
+    A decoded char is handled once the char after it is known, which is as far as the TokenSpecies look around.
+    Token and error positions point into the morse text, an unknown code raises a LexerError as well. """
+    tokens = []
+    # continues holds the chars that make the current word longer, it is empty when there is no word.
+    word, word_pos, word_species, may_be_keyword, continues = "", 0, None, False, frozenset()
+    before, char, pos = " ", " ", 0
+    skip = False
+
+    # The two spaces at the end let the last char and word be handled.
+    for match in chain(MORSE_SCAN.finditer(text), (None, None)):
+        if match is None:
+            after, after_pos = " ", len(text)
+        elif (after := MORSE_CHARS.get(match[0])) is None:
+            raise LexerError(MORSE_CODES.get(match[0], match[0].lower()), "position", match.start())
+        else:
+            after_pos = match.start()
+
+        if skip:
+            # char is the second char of an operator.
+            skip = False
+        elif char in continues:
+            word += char
+        else:
+            if continues:
+                tokens.append(Token(KEYWORDS.get(word, word_species) if may_be_keyword else word_species, word, word_pos))
+                continues = frozenset()
+
+            if char in LETTERS:
+                word, word_pos, word_species, continues = char, pos, TokenSpecies.ID, WORD_CHARS
+                may_be_keyword = before not in WORD_CHARS
+            elif char in DIGITS:
+                word, word_pos, word_species, continues = char, pos, TokenSpecies.DIGIT, DIGITS
+            elif char in SINGLE_CHARS.keys():
+                tokens.append(Token(SINGLE_CHARS[char], char, pos))
+            elif char == "=":
+                if before not in "=:" and after not in "=:":
+                    tokens.append(Token(TokenSpecies.ASSIGN, char, pos))
+                elif after in "=:":
+                    tokens.append(Token(TokenSpecies.EQUALS if after == "=" else TokenSpecies.LESSER, char + after, pos))
+                    skip = True
+            elif char in "!:" and after == "=":
+                tokens.append(Token(TokenSpecies.NOTEQUAL if char == "!" else TokenSpecies.GREATER, char + after, pos))
+                skip = True
+            elif char in "+-":
+                if before != char and after != char:
+                    tokens.append(Token(TokenSpecies.ADD if char == "+" else TokenSpecies.SUB, char, pos))
+                elif after == char:
+                    tokens.append(Token(TokenSpecies.MUL if char == "+" else TokenSpecies.DIV, char + after, pos))
+                    skip = True
+
+        before, char, pos = char, after, after_pos
+
+    return FrozenTuple(tokens)
+
+
 if __name__ == "__main__":
     file = open("Worse.txt")
     file_content = file.read()
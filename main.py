@@ -1,38 +1,119 @@
-from lexer import lexer, morse_to_string, LexerError
+from lexer import lexer, lexer_stream, read_chunks, find_unknown, morse_lexer, LexerError
 from parse import parser, ParserError
-from runner import runner, RunnerError
+from runner import runner, RunnerError, Limits, NO_LIMITS, MemoCache
+from compiler import compiler
+from vm import vm_runner
+from transpiler import transpiler, py_runner
+from optimizer import optimizer, Passes
+from purity import pure_functions
+from cache import source_key, cached_parse
+from sinks import Sink
+from profiler import Profile
 from classes import *
+import asyncio
 import sys
 import os
 
 
-# worse :: str -> bool -> bool -> Optional[str]
+COMPILE_TARGETS = {"vm": lambda ast, sink: vm_runner(compiler(ast), "main", sink),
+                   "python": lambda ast, sink: py_runner(transpiler(ast), "main", sink)}
+
+
+# report_errors :: Callable -> Callable
+def report_errors(func):
+    """ Prints the error when func fails lexing, parsing or running instead of raising it, func can be a coroutine
+    function as well. The error is written to the Sink in the arguments of func if there is one. """
+    def report(args: tuple, error: Exception) -> None:
+        stage = "lexing" if isinstance(error, LexerError) else "parsing" if isinstance(error, ParserError) else "running"
+        msg = f"Failed {stage} because: {error}"
+        sink = next(filter(lambda arg: isinstance(arg, Sink), args), None)
+        if sink is None:
+            print(msg)
+        else:
+            sink.write(msg + "\n")
+            sink.flush()
+
+    def inner(*args):
+        try:
+            return func(*args)
+        except (LexerError, ParserError, RunnerError) as e:
+            report(args, e)
+
+    async def async_inner(*args):
+        try:
+            return await func(*args)
+        except (LexerError, ParserError, RunnerError) as e:
+            report(args, e)
+    return async_inner if asyncio.iscoroutinefunction(func) else inner
+
+
+# run_ast :: Tuple[FuncDefNode, ...] -> bool -> str -> bool -> Optional[Sink] -> Optional[Profile] -> Limits -> int
 @deepcopy_decorator
-def worse(text: str, is_morse: bool, to_compile: bool) -> Optional[str]:
-    """ Interprets text as Worse code. """
-    try:
-        normal_text = morse_to_string(text) if is_morse else text
-        tokens = lexer(normal_text)
-        ast = parser(tokens)
+def run_ast(ast: Tuple[FuncDefNode, ...], to_compile: bool, target: str, optimize: bool, sink: Optional[Sink],
+            profile: Optional[Profile] = None, limits: Limits = NO_LIMITS) -> int:
+    """ Runs the ast, to_compile runs it compiled to the target instead of walking the ast.
+    With a profile or limits the ast is always walked, the compiled targets can't be profiled or limited.
+    A profiled run makes every call of the program: helpers aren't inlined and nothing is remembered. """
+    ast = optimizer(ast, "main", Passes(inline=profile is None))[0] if optimize else ast
+    if to_compile and profile is None and limits.unlimited():
+        return COMPILE_TARGETS[target](ast, sink)
+    memo = MemoCache(pure_functions(ast), 0) if profile is not None else None
+    return runner(ast, "main", memo, sink, profile, limits)
 
-        return "" if to_compile else runner(ast)
 
-    except LexerError as e:
-        print(f"Failed lexing because: {e}")
+# worse :: str -> bool -> bool -> str -> bool -> Optional[str] -> Optional[Sink] -> Optional[Profile] -> Limits -> Optional[str]
+@deepcopy_decorator
+@report_errors
+def worse(text: str, is_morse: bool, to_compile: bool, target: str = "vm", optimize: bool = True,
+          cache_dir: Optional[str] = None, sink: Optional[Sink] = None, profile: Optional[Profile] = None,
+          limits: Limits = NO_LIMITS) -> Optional[str]:
+    """ Interprets text as Worse code, to_compile runs it compiled to the target instead of walking the ast.
+    With a cache_dir the parsed program is read from there when the same text has been parsed before.
+    The output goes to sink, or buffered to sys.stdout without one. The run is profiled in profile if one is given and stopped when it goes over limits. """
+    def parse_text() -> Tuple[FuncDefNode, ...]:
+        return parser(morse_lexer(text) if is_morse else lexer(text))
 
-    except ParserError as e:
-        print(f"Failed parsing because: {e}")
+    ast = cached_parse(cache_dir, source_key((text,), is_morse), parse_text) if cache_dir else parse_text()
+    return run_ast(ast, to_compile, target, optimize, sink, profile, limits)
 
-    except RunnerError as e:
-        print(f"Failed running because: {e}")
 
+# worse_file :: str -> bool -> bool -> str -> bool -> Optional[str] -> Optional[Sink] -> Optional[Profile] -> Limits -> Optional[str]
+@deepcopy_decorator
+@report_errors
+def worse_file(filename: str, is_morse: bool, to_compile: bool, target: str = "vm", optimize: bool = True,
+               cache_dir: Optional[str] = None, sink: Optional[Sink] = None, profile: Optional[Profile] = None,
+               limits: Limits = NO_LIMITS) -> Optional[str]:
+    """ Interprets a file as Worse code, plain text is lexed while it is read instead of reading the whole file first.
+    With a cache_dir plain text is hashed in chunks first, so the file is read twice when it isn't cached yet but
+    never has to fit in memory. Morse text is read whole.
+    An unknown char is only found when its chunk is lexed, so when parsing fails before that the rest of the file is
+    searched for one. An unknown char anywhere is reported before a parse error, like worse reports it. """
+    if is_morse:
+        file = open(filename)
+        file_content = file.read()
+        file.close()
+        return worse(file_content, is_morse, to_compile, target, optimize, cache_dir, sink, profile, limits)
 
-if __name__ == "__main__":
-    _, filename, do_morse = sys.argv
+    def parse_file() -> Tuple[FuncDefNode, ...]:
+        try:
+            return parser(TokenStream(lexer_stream(read_chunks(filename))))
+        except ParserError:
+            find_unknown(read_chunks(filename))
+            raise
 
-    file = open(filename)
-    file_content = file.read()
-    file.close()
+    ast = cached_parse(cache_dir, source_key(read_chunks(filename), False), parse_file) if cache_dir else parse_file()
+    return run_ast(ast, to_compile, target, optimize, sink, profile, limits)
 
-    worse(file_content, do_morse == "y", False)
 
+if __name__ == "__main__":
+    # With --profile the run is profiled, the table is printed after it and the stacks go to <filename>.collapsed.
+    do_profile = "--profile" in sys.argv
+    _, filename, do_morse, *do_compile = filter(lambda arg: arg != "--profile", sys.argv)
+
+    cache_dir = os.path.join(os.path.dirname(filename), "__worsecache__")
+    profile = Profile() if do_profile else None
+    worse_file(filename, do_morse == "y", do_compile in (["y"], ["py"]), "python" if do_compile == ["py"] else "vm", True, cache_dir,
+               None, profile)
+    if profile is not None:
+        print(profile.table())
+        profile.write_collapsed(filename + ".collapsed")
@@ -0,0 +1,363 @@
+from lexer import lexer
+from parse import parser
+from runner import get_op_func
+from purity import walk, called_functions
+from classes import *
+from collections import Counter
+
+
+Changes = Tuple[Tuple[str, int], ...]
+
+# Largest value, in nodes, of a helper that is inlined.
+INLINE_SIZE = 20
+
+
+class Passes(Frozen):
+    """ Switches for the passes of the optimizer. fold folds constants and removes dead branches, prune removes the
+    functions that can't be reached from the start function, inline replaces calls of small helpers by their value
+    and unused removes assignments to variables that are never read. """
+    __slots__ = ("fold", "prune", "inline", "unused")
+
+    def __init__(self, fold: bool = True, prune: bool = True, inline: bool = True, unused: bool = True):
+        """ Init for Passes, every pass is on by default. """
+        self._set(fold=fold, prune=prune, inline=inline, unused=unused)
+
+    def __str__(self) -> str:
+        return "Passes " + ", ".join(filter(lambda name: getattr(self, name), self.__slots__))
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+ALL_PASSES = Passes()
+
+
+class OptimizerReport(Frozen):
+    def __init__(self, changes: Changes, nodes_before: int, nodes_after: int, sizes: Tuple[Tuple[str, int], ...] = ()):
+        """ Creates a report of the (kind, character position) of every change the optimizer made, sizes has the
+        amount of nodes after every pass that ran. """
+        self._set(changes=tuple(changes), nodes_before=nodes_before, nodes_after=nodes_after, sizes=tuple(sizes))
+
+    def __str__(self) -> str:
+        kinds = ", ".join(map(lambda kind: f"{kind[0]}: {kind[1]}", sorted(Counter(map(lambda change: change[0], self.changes)).items())))
+        passes = " -> ".join(map(lambda size: f"{size[0]} {size[1]}", self.sizes))
+        return f"Optimized {self.nodes_before} nodes to {self.nodes_after} nodes ({kinds or 'no changes'})" + \
+               (f", after every pass: {passes}" if passes else "")
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# count_nodes :: Any -> int
+@deepcopy_decorator
+def count_nodes(tree: Any) -> int:
+    """ Counts all nodes in a node or a tuple of nodes. """
+    if isinstance(tree, tuple):
+        return sum(map(count_nodes, tree))
+    elif isinstance(tree, Node):
+        return 1 + sum(map(count_nodes, filter(lambda field: isinstance(field, (Node, tuple)), tree.fields().values())))
+    return 0
+
+
+# int_node :: int -> int -> IntNode
+@deepcopy_decorator
+def int_node(value: int, pos: int) -> IntNode:
+    """ Creates an IntNode for a value that has been calculated instead of being read from the source. """
+    return IntNode(Token(TokenSpecies.DIGIT, str(value), pos))
+
+
+# is_int :: Type[ValueNode] -> Optional[int] -> bool
+@deepcopy_decorator
+def is_int(value: Type[ValueNode], number: Optional[int] = None) -> bool:
+    """ Returns True if value is a constant, or the given constant if number is given. """
+    return isinstance(value, IntNode) and (number is None or int(value.value) == number)
+
+
+# simplify_operation :: OperationNode -> Tuple[Type[ValueNode], Changes]
+@deepcopy_decorator
+def simplify_operation(operation: OperationNode) -> Tuple[Type[ValueNode], Changes]:
+    """ Folds an operation of which both sides are constant or removes a side that doesn't change the outcome. """
+    lhs, rhs, species = operation.lhs, operation.rhs, operation.operator
+    if is_int(lhs) and is_int(rhs) and not (species == TokenSpecies.DIV and is_int(rhs, 0)):
+        return int_node(int(get_op_func(species)(int(lhs.value), int(rhs.value))), operation.pos), (("fold", operation.pos),)
+
+    if (species == TokenSpecies.ADD and is_int(lhs, 0)) or (species == TokenSpecies.MUL and is_int(lhs, 1)):
+        return rhs, (("simplify", operation.pos),)
+    if (species in (TokenSpecies.ADD, TokenSpecies.SUB) and is_int(rhs, 0)) \
+            or (species in (TokenSpecies.MUL, TokenSpecies.DIV) and is_int(rhs, 1)):
+        return lhs, (("simplify", operation.pos),)
+    return operation, ()
+
+
+# optimize_value :: Type[ValueNode] -> Tuple[Type[ValueNode], Changes]
+@deepcopy_decorator
+def optimize_value(value: Type[ValueNode]) -> Tuple[Type[ValueNode], Changes]:
+    """ Optimizes a value bottom up. """
+    if isinstance(value, OperationNode):
+        lhs, lhs_changes = optimize_value(value.lhs)
+        rhs, rhs_changes = optimize_value(value.rhs)
+        new_value, changes = simplify_operation(replace(value, lhs=lhs, rhs=rhs))
+        return new_value, lhs_changes + rhs_changes + changes
+
+    elif isinstance(value, FuncExeNode):
+        params, changes = optimize_values(value.params)
+        return replace(value, params=params), changes
+    return value, ()
+
+
+# optimize_values :: Tuple[Type[ValueNode], ...] -> Tuple[Tuple[Type[ValueNode], ...], Changes]
+@deepcopy_decorator
+def optimize_values(values: Tuple[Type[ValueNode], ...]) -> Tuple[Tuple[Type[ValueNode], ...], Changes]:
+    """ Optimizes every value in values. """
+    optimized = tuple(map(optimize_value, values))
+    return tuple(map(lambda opt: opt[0], optimized)), sum(map(lambda opt: opt[1], optimized), ())
+
+
+# optimize_actions :: Tuple[Type[ActionNode], ...] -> Tuple[Tuple[Type[ActionNode], ...], Changes]
+@deepcopy_decorator
+def optimize_actions(actions: Tuple[Type[ActionNode], ...]) -> Tuple[Tuple[Type[ActionNode], ...], Changes]:
+    """ Optimizes actions, an if or while with a condition of 0 is removed and an if that always runs is unwrapped. """
+    def optimize_action(action: Type[ActionNode]) -> Tuple[Tuple[Type[ActionNode], ...], Changes]:
+        if isinstance(action, AssignNode):
+            value, changes = optimize_value(action.value)
+            return (replace(action, value=value),), changes
+
+        elif isinstance(action, PrintNode):
+            values, changes = optimize_values(action.value)
+            return (replace(action, value=values),), changes
+
+        # IfWhileNode
+        condition, condition_changes = optimize_value(action.condition)
+        if is_int(condition, 0):
+            return (), condition_changes + (("remove", action.pos),)
+        body, body_changes = optimize_actions(action.actions)
+        if is_int(condition) and not action.is_while:
+            return body, condition_changes + body_changes + (("unwrap", action.pos),)
+        return (replace(action, condition=condition, actions=body),), condition_changes + body_changes
+
+    optimized = tuple(map(optimize_action, actions))
+    return sum(map(lambda opt: opt[0], optimized), ()), sum(map(lambda opt: opt[1], optimized), ())
+
+
+# fold_functions :: Tuple[FuncDefNode, ...] -> Tuple[Tuple[FuncDefNode, ...], Changes]
+@deepcopy_decorator
+def fold_functions(ast: Tuple[FuncDefNode, ...]) -> Tuple[Tuple[FuncDefNode, ...], Changes]:
+    """ Folds constants, simplifies identities and removes dead branches in every function. """
+    optimized = tuple(map(lambda func: optimize_actions(func.actions), ast))
+    new_ast = tuple(map(lambda func, opt: replace(func, actions=opt[0]), ast, optimized))
+    return new_ast, sum(map(lambda opt: opt[1], optimized), ())
+
+
+# prune_functions :: Tuple[FuncDefNode, ...] -> str -> Tuple[Tuple[FuncDefNode, ...], Changes]
+@deepcopy_decorator
+def prune_functions(ast: Tuple[FuncDefNode, ...], start_func_name: str) -> Tuple[Tuple[FuncDefNode, ...], Changes]:
+    """ Removes the functions that are never called when the program starts at start_func_name. Without a function
+    called start_func_name nothing is removed, the run fails before any function is called anyway. """
+    names = frozenset(map(lambda func: func.name, ast))
+    if start_func_name not in names:
+        return ast, ()
+    calls = FrozenDict(map(lambda func: (func.name, called_functions(func)), ast))
+
+    reached, found = frozenset(), frozenset((start_func_name,))
+    while found != reached:
+        reached = found
+        found = reached | frozenset(chain.from_iterable(map(lambda name: calls.get(name, ()), reached)))
+    removed = tuple(filter(lambda func: func.name not in reached, ast))
+    return tuple(filter(lambda func: func.name in reached, ast)), tuple(map(lambda func: ("prune", func.pos), removed))
+
+
+# inline_helper :: FuncDefNode -> Optional[Type[ValueNode]]
+@deepcopy_decorator
+def inline_helper(function: FuncDefNode) -> Optional[Type[ValueNode]]:
+    """ Returns the value that a call of function can be replaced with, or None if it can't be inlined.
+    That is a function that only assigns a value without calls or divisions to sos, which reads every param exactly
+    once and in order. The params of a call are then evaluated once and in the same order and nothing that is done
+    in between can fail, so the inlined value behaves the same as the call. """
+    if len(function.actions) != 1 or not isinstance(function.actions[0], AssignNode) or function.actions[0].name != "sos":
+        return None
+    value = function.actions[0].value
+    nodes = walk(value)
+    reads = tuple(map(lambda node: node.name, filter(lambda node: isinstance(node, VariableNode), nodes)))
+    if reads != function.params or len(nodes) > INLINE_SIZE or any(map(lambda node: isinstance(node, FuncExeNode)
+            or (isinstance(node, OperationNode) and node.operator == TokenSpecies.DIV), nodes)):
+        return None
+    return value
+
+
+# substitute :: Type[ValueNode] -> Dict[str, Type[ValueNode]] -> Type[ValueNode]
+@deepcopy_decorator
+def substitute(value: Type[ValueNode], arguments: Dict[str, Type[ValueNode]]) -> Type[ValueNode]:
+    """ Replaces every variable in value by its argument. """
+    if isinstance(value, OperationNode):
+        return replace(value, lhs=substitute(value.lhs, arguments), rhs=substitute(value.rhs, arguments))
+    elif isinstance(value, VariableNode):
+        return arguments[value.name]
+    return value
+
+
+# inline_value :: Type[ValueNode] -> Dict[str, Tuple[FuncDefNode, Type[ValueNode]]] -> Tuple[Type[ValueNode], Changes]
+@deepcopy_decorator
+def inline_value(value: Type[ValueNode], helpers: Dict[str, Tuple[FuncDefNode, Type[ValueNode]]]) -> Tuple[Type[ValueNode], Changes]:
+    """ Inlines the calls of helpers in value, a call with the wrong amount of params is left for the runner. """
+    if isinstance(value, OperationNode):
+        lhs, lhs_changes = inline_value(value.lhs, helpers)
+        rhs, rhs_changes = inline_value(value.rhs, helpers)
+        return replace(value, lhs=lhs, rhs=rhs), lhs_changes + rhs_changes
+
+    elif isinstance(value, FuncExeNode):
+        params, changes = inline_values(value.params, helpers)
+        if value.name in helpers and len(params) == len(helpers[value.name][0].params):
+            helper, helper_value = helpers[value.name]
+            return substitute(helper_value, FrozenDict(zip(helper.params, params))), changes + (("inline", value.pos),)
+        return replace(value, params=params), changes
+    return value, ()
+
+
+# inline_values :: Tuple[Type[ValueNode], ...] -> Dict[str, Tuple[FuncDefNode, Type[ValueNode]]] -> Tuple[Tuple[Type[ValueNode], ...], Changes]
+@deepcopy_decorator
+def inline_values(values: Tuple[Type[ValueNode], ...], helpers: Dict[str, Tuple[FuncDefNode, Type[ValueNode]]]) -> Tuple[Tuple[Type[ValueNode], ...], Changes]:
+    """ Inlines the calls of helpers in every value in values. """
+    inlined = tuple(map(lambda value: inline_value(value, helpers), values))
+    return tuple(map(lambda inl: inl[0], inlined)), sum(map(lambda inl: inl[1], inlined), ())
+
+
+# inline_actions :: Tuple[Type[ActionNode], ...] -> Dict[str, Tuple[FuncDefNode, Type[ValueNode]]] -> Tuple[Tuple[Type[ActionNode], ...], Changes]
+@deepcopy_decorator
+def inline_actions(actions: Tuple[Type[ActionNode], ...], helpers: Dict[str, Tuple[FuncDefNode, Type[ValueNode]]]) -> Tuple[Tuple[Type[ActionNode], ...], Changes]:
+    """ Inlines the calls of helpers in every value of actions. """
+    def inline_action(action: Type[ActionNode]) -> Tuple[Type[ActionNode], Changes]:
+        if isinstance(action, AssignNode):
+            value, changes = inline_value(action.value, helpers)
+            return replace(action, value=value), changes
+
+        elif isinstance(action, PrintNode):
+            values, changes = inline_values(action.value, helpers)
+            return replace(action, value=values), changes
+
+        # IfWhileNode
+        condition, condition_changes = inline_value(action.condition, helpers)
+        body, body_changes = inline_actions(action.actions, helpers)
+        return replace(action, condition=condition, actions=body), condition_changes + body_changes
+
+    inlined = tuple(map(inline_action, actions))
+    return tuple(map(lambda inl: inl[0], inlined)), sum(map(lambda inl: inl[1], inlined), ())
+
+
+# inline_functions :: Tuple[FuncDefNode, ...] -> Tuple[Tuple[FuncDefNode, ...], Changes]
+@deepcopy_decorator
+def inline_functions(ast: Tuple[FuncDefNode, ...]) -> Tuple[Tuple[FuncDefNode, ...], Changes]:
+    """ Replaces the calls of helpers that can be inlined by their value. The last definition of a name is the one
+    that is called, so only that one is looked at. Inlined helpers don't contain calls, so they can't be recursive. """
+    last = FrozenDict(map(lambda func: (func.name, func), ast))
+    helpers = FrozenDict(map(lambda func: (func.name, (func, inline_helper(func))),
+                             filter(lambda func: inline_helper(func) is not None, last.values())))
+    inlined = tuple(map(lambda func: inline_actions(func.actions, helpers), ast))
+    new_ast = tuple(map(lambda func, inl: replace(func, actions=inl[0]), ast, inlined))
+    return new_ast, sum(map(lambda inl: inl[1], inlined), ())
+
+
+# is_removable :: Type[ValueNode] -> Callable[[str], bool] -> bool
+@deepcopy_decorator
+def is_removable(value: Type[ValueNode], is_defined: Callable[[str], bool]) -> bool:
+    """ Returns True if evaluating value can't print or fail: it has no calls or divisions and only reads variables
+    for which is_defined holds. """
+    return not any(map(lambda node: isinstance(node, FuncExeNode) or (isinstance(node, VariableNode) and not is_defined(node.name))
+                       or (isinstance(node, OperationNode) and node.operator == TokenSpecies.DIV), walk(value)))
+
+
+# read_names :: Type[Node] -> Tuple[str, ...]
+@deepcopy_decorator
+def read_names(tree: Any) -> Tuple[str, ...]:
+    """ Returns the name of every variable that is read in tree, once for every time it is read. """
+    return tuple(map(lambda node: node.name, filter(lambda node: isinstance(node, VariableNode), walk(tree))))
+
+
+# remove_unused :: FuncDefNode -> Tuple[FuncDefNode, Changes]
+@deepcopy_decorator
+def remove_unused(function: FuncDefNode) -> Tuple[FuncDefNode, Changes]:
+    """ Removes the assignments to variables other than sos that are never read in function, if their value can be
+    left out. A variable is certainly defined before an action if it is a param or has been assigned to before in the
+    same body or a body around it.
+    Bodies are walked backwards and the reads of a removed value are subtracted from the counts of reads, so an
+    assignment that was only read by a later removed one is removed in the same walk. Everything is kept in lists,
+    dicts and closures, so a walk takes linear time. """
+    reads = Counter(read_names(function.actions))
+    params = frozenset(function.params)
+    changes = []
+
+    def remove(actions: Tuple[Type[ActionNode], ...], outer: Callable[[str], bool]) -> Tuple[Type[ActionNode], ...]:
+        # Index of the first assignment to every variable in this body.
+        first = {}
+        for index in range(len(actions)):
+            if isinstance(actions[index], AssignNode):
+                first.setdefault(actions[index].name, index)
+
+        kept = []
+        for index in reversed(range(len(actions))):
+            action = actions[index]
+            is_defined = lambda name, index=index: first.get(name, index) < index or outer(name)
+            if isinstance(action, AssignNode) and action.name != "sos" and reads[action.name] == 0 and is_removable(action.value, is_defined):
+                reads.subtract(read_names(action.value))
+                changes.append(("unused", action.pos))
+            elif isinstance(action, IfWhileNode):
+                kept.append(replace(action, actions=tuple(remove(action.actions, is_defined))))
+            else:
+                kept.append(action)
+        return tuple(reversed(kept))
+
+    actions = remove(function.actions, lambda name: name in params)
+    return replace(function, actions=actions) if changes else function, tuple(reversed(changes))
+
+
+# unused_assignments :: Tuple[FuncDefNode, ...] -> Tuple[Tuple[FuncDefNode, ...], Changes]
+@deepcopy_decorator
+def unused_assignments(ast: Tuple[FuncDefNode, ...]) -> Tuple[Tuple[FuncDefNode, ...], Changes]:
+    """ Removes unused assignments from every function until there are none left. A walk only misses an assignment
+    that was read by a removed one that comes before it, like in a while loop, so this rarely takes more than two
+    walks of a function. """
+    def remove_function(function: FuncDefNode) -> Tuple[FuncDefNode, Changes]:
+        changes = ()
+        while True:
+            function, more_changes = remove_unused(function)
+            if not more_changes:
+                return function, changes
+            changes += more_changes
+
+    removed = tuple(map(remove_function, ast))
+    return tuple(map(lambda rem: rem[0], removed)), sum(map(lambda rem: rem[1], removed), ())
+
+
+# optimizer :: Tuple[FuncDefNode, ...] -> str -> Passes -> Tuple[Tuple[FuncDefNode, ...], OptimizerReport]
+@deepcopy_decorator
+def optimizer(ast: Tuple[FuncDefNode, ...], start_func_name: str = "main", passes: Passes = ALL_PASSES) -> Tuple[Tuple[FuncDefNode, ...], OptimizerReport]:
+    """ Runs the passes that are switched on, the report tells what has been changed and how many nodes are left
+    after every pass. Folding runs before inlining, so helpers that only divide by constants can be inlined, and again
+    after it to fold the inlined values. Functions are pruned again at the end, inlining and removing dead branches
+    can leave functions that aren't called anymore. The program behaves the same when it is run from start_func_name, output and errors
+    included, only the calls that have been inlined aren't made anymore. """
+    pipeline = (("prune", passes.prune, lambda tree: prune_functions(tree, start_func_name)),
+                ("fold", passes.fold, fold_functions),
+                ("inline", passes.inline, inline_functions),
+                ("fold", passes.fold and passes.inline, fold_functions),
+                ("unused", passes.unused, unused_assignments),
+                ("prune", passes.prune, lambda tree: prune_functions(tree, start_func_name)))
+
+    new_ast, changes, size = tuple(ast), (), count_nodes(ast)
+    sizes = ()
+    for name, _, run_pass in filter(lambda step: step[1], pipeline):
+        new_ast, pass_changes = run_pass(new_ast)
+        # A pass that changed nothing left the size as it was, counting the nodes again would take as long as a pass.
+        size = count_nodes(new_ast) if pass_changes else size
+        changes, sizes = changes + pass_changes, sizes + ((name, size),)
+    return new_ast, OptimizerReport(changes, count_nodes(ast), size, sizes)
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    tokenized_code = lexer(file_content)
+    new_ast, report = optimizer(parser(tokenized_code))
+    print(new_ast)
+    print(report)
@@ -0,0 +1,147 @@
+from purity import walk
+from sinks import DiscardSink
+from classes import *
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+import math
+import os
+
+
+# function_costs :: Resolution -> Tuple[float, ...]
+@deepcopy_decorator
+def function_costs(resolution: Resolution) -> Tuple[float, ...]:
+    """ Estimates the cost of a call of every function as the amount of nodes that it runs, counting the nodes of the
+    functions it calls as well. A function with a while loop or that can end up calling itself has no bound, which is
+    an infinite cost. """
+    functions = resolution.functions
+    nodes = tuple(map(lambda function: walk(function.actions), functions))
+    costs = {}
+
+    def cost(index: int, calling: FrozenSet[int]) -> float:
+        if index in calling:
+            return math.inf
+        if index not in costs:
+            calls = filter(lambda node: isinstance(node, CallNode), nodes[index])
+            loops = any(map(lambda node: isinstance(node, IfWhileNode) and node.is_while, nodes[index]))
+            own = math.inf if loops else len(nodes[index])
+            costs[index] = own + sum(map(lambda call: cost(call.callee, calling | {index}), calls))
+        return costs[index]
+
+    return tuple(map(lambda index: cost(index, frozenset()), range(len(functions))))
+
+
+# simple_value :: Type[ValueNode] -> List[Optional[int]] -> Optional[int]
+def simple_value(node: Type[ValueNode], variables: List[Optional[int]]) -> Optional[int]:
+    """ Evaluates a value without calls like the runner does, or returns None if it would fail. """
+    if isinstance(node, ConstNode):
+        return node.value
+    elif isinstance(node, SlotNode):
+        return variables[node.slot]
+    lhs, rhs = simple_value(node.lhs, variables), simple_value(node.rhs, variables)
+    if lhs is None or rhs is None:
+        return None
+    try:
+        return int(node.function(lhs, rhs))
+    except ArithmeticError:
+        return None
+
+
+# is_simple :: Type[ValueNode] -> bool
+def is_simple(node: Type[ValueNode]) -> bool:
+    """ Returns True if node can be evaluated by simple_value. """
+    if isinstance(node, ApplyNode):
+        return is_simple(node.lhs) and is_simple(node.rhs)
+    return isinstance(node, (ConstNode, SlotNode))
+
+
+# The program of a worker process, set once when the pool starts.
+WORKER = {}
+
+
+# start_worker :: Resolution -> FrozenSet[str] -> int -> None
+def start_worker(resolution: Resolution, pure: FrozenSet[str], memo_size: int) -> None:
+    """ Keeps the program in the worker, so only the name and params of a call have to be sent to it. """
+    WORKER.update(resolution=resolution, pure=pure, memo_size=memo_size)
+
+
+# run_in_worker :: str -> Tuple[int, ...] -> int
+def run_in_worker(func_name: str, params: Tuple[int, ...]) -> int:
+    """ Runs a call of a pure function in a worker, serially and with a memo cache of its own. """
+    from runner import run_function, MemoCache
+    return run_function(func_name, params, WORKER["resolution"], MemoCache(WORKER["pure"], WORKER["memo_size"]), DiscardSink())
+
+
+class Parallel(Shared):
+    """ Runs calls of pure functions that are arguments of the same call or operation on a pool of workers processes.
+    Of the arguments that are calls that cost at least threshold, the first is run by the runner itself and the
+    others are sent to the pool, as long as less than depth calls are running on the pool. A divide and conquer
+    function therefore keeps splitting until depth calls are running. The params of a call that is sent have to be
+    values without calls that can be evaluated up front, other calls are left to the runner. The runner waits for the
+    results in the order of the arguments, so results and errors are the same as when everything runs serially.
+    Calls that run on the pool aren't profiled or limited. """
+
+    def __init__(self, workers: Optional[int] = None, threshold: float = 1000, depth: Optional[int] = None):
+        """ Init for Parallel, by default there is a worker for every core and depth is the amount of workers. """
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.threshold = threshold
+        self.depth = depth if depth is not None else self.workers
+        self.pool = None
+        self.pure = frozenset()
+        self.costs = ()
+        self.running = 0
+        self.sent = 0
+        # Whether a node is a call that may be sent, by the id of the node.
+        self.eligible = {}
+
+    def start(self, resolution: Resolution, pure: FrozenSet[str], memo_size: int) -> None:
+        """ Starts the pool for a run of resolution, pure are the functions that may be sent. """
+        self.pure = pure
+        self.costs = function_costs(resolution)
+        self.eligible = {}
+        self.pool = Pool(self.workers, start_worker, (resolution, pure, memo_size))
+
+    def close(self) -> None:
+        """ Stops the pool, calls that still run on it are stopped as well. """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.running = 0
+
+    def is_eligible(self, node: Type[ValueNode]) -> bool:
+        """ Returns True if node is a call of a pure function that costs enough and has params without calls. """
+        if id(node) not in self.eligible:
+            self.eligible[id(node)] = isinstance(node, CallNode) and node.name in self.pure \
+                and self.costs[node.callee] >= self.threshold and all(map(is_simple, node.params))
+        return self.eligible[id(node)]
+
+    def plan(self, arguments: Tuple[Type[ValueNode], ...], variables: List[Optional[int]]) -> Optional[List[tuple]]:
+        """ Sends the arguments that can run on the pool and returns what to do for every argument, which is
+        ("eval", argument) or ("wait", result). Returns None if none of them is sent. """
+        eligible = tuple(filter(self.is_eligible, arguments))
+        if len(eligible) < 2 or self.running >= self.depth:
+            return None
+
+        def send(argument: Type[ValueNode]) -> tuple:
+            if argument is eligible[0] or not self.is_eligible(argument) or self.running >= self.depth:
+                return "eval", argument
+            params = tuple(map(lambda param: simple_value(param, variables), argument.params))
+            if None in params:
+                return "eval", argument
+            self.running += 1
+            self.sent += 1
+            return "wait", self.pool.apply_async(run_in_worker, (argument.name, params))
+
+        steps = list(map(send, arguments))
+        return steps if any(map(lambda step: step[0] == "wait", steps)) else None
+
+    def wait(self, result: AsyncResult) -> int:
+        """ Returns the result of a call that was sent to the pool, or raises its error. """
+        self.running -= 1
+        return result.get()
+
+    def __str__(self) -> str:
+        return f"Parallel on {self.workers} workers, threshold {self.threshold}, depth {self.depth}, {self.sent} calls sent"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -17,141 +17,177 @@ class ParserError(Exception):
             super().__init__(f"Expected {self.wanted}, but got nothing because its at the end of the file.")
 
 
-# is_front :: List[TokenSpecies] -> bool
+# token_at :: Tuple[Token, ...] -> int -> Optional[Token]
 @deepcopy_decorator
-def is_front(tokens: List[Token], species: List[TokenSpecies]) -> bool:
-    """ Returns True if first token in tokens is of the given species. """
-    return len(tokens) != 0 and tokens[0].species in species
+def token_at(tokens: Tuple[Token, ...], pos: int) -> Optional[Token]:
+    """ Returns the token at pos or None if pos is at the end of the tokens. """
+    try:
+        return tokens[pos]
+    except IndexError:
+        return None
 
 
-# parse_def_parameters :: List[Token] -> Tuple[Dict[str, int], List[Token]]
+# is_front :: Tuple[Token, ...] -> int -> Tuple[TokenSpecies, ...] -> bool
 @deepcopy_decorator
-def parse_def_parameters(tokens: List[Token]) -> Tuple[Dict[str, int], List[Token]]:
-    """ Parse parameter names until an ending token is encountered. """
-    params = {tokens.pop(0).content: 0} if is_front(tokens, [TokenSpecies.ID]) else {}
-    if is_front(tokens, [TokenSpecies.SEP]):
-        other_params, tokens = parse_def_parameters(tokens[1:])
-        return {**params, **other_params}, tokens
-    elif is_front(tokens, [TokenSpecies.CLOSEBR]):
-        return params, tokens
-    else:
-        raise ParserError("Parameters", tokens[0] if len(tokens) != 0 else None)
+def is_front(tokens: Tuple[Token, ...], pos: int, species: Tuple[TokenSpecies, ...]) -> bool:
+    """ Returns True if the token at pos is of the given species. """
+    try:
+        return tokens[pos].species in species
+    except IndexError:
+        return False
 
 
-# get_or_riot :: List[Token] -> TokenSpecies -> Tuple[Token, List[Token]]
+# parse_def_parameters :: Tuple[Token, ...] -> int -> Tuple[Tuple[str, ...], int]
 @deepcopy_decorator
-def get_or_riot(tokens: List[Token], species: TokenSpecies) -> Tuple[Token, List[Token]]:
-    """ Returns a token if its the wanted species and otherwise it throws an error. """
-    if is_front(tokens, [species]):
-        return tokens[0], tokens[1:]
-    raise ParserError(species.name, tokens[0] if len(tokens) != 0 else None)
+def parse_def_parameters(tokens: Tuple[Token, ...], pos: int) -> Tuple[Tuple[str, ...], int]:
+    """ Parse parameter names until an ending token is encountered. """
+    params = []
+    while True:
+        if is_front(tokens, pos, (TokenSpecies.ID,)):
+            params.append(tokens[pos].content)
+            pos += 1
+        if is_front(tokens, pos, (TokenSpecies.CLOSEBR,)):
+            return tuple(dict.fromkeys(params)), pos
+        if not is_front(tokens, pos, (TokenSpecies.SEP,)):
+            raise ParserError("Parameters", token_at(tokens, pos))
+        pos += 1
+
+
+# get_or_riot :: Tuple[Token, ...] -> int -> TokenSpecies -> Tuple[Token, int]
+@deepcopy_decorator
+def get_or_riot(tokens: Tuple[Token, ...], pos: int, species: TokenSpecies) -> Tuple[Token, int]:
+    """ Returns the token at pos and the position after it if its the wanted species and otherwise it throws an error. """
+    if is_front(tokens, pos, (species,)):
+        return tokens[pos], pos + 1
+    raise ParserError(species.name, token_at(tokens, pos))
 
 
-# parser :: List[Token] -> List[FuncDefNode]
+# parser :: Tuple[Token, ...] -> Tuple[FuncDefNode, ...]
 @deepcopy_decorator
-def parser(tokens: List[Token]) -> List[FuncDefNode]:
-    """ Parse functions until no tokens are left. """
-    _, tokens0 = get_or_riot(tokens, TokenSpecies.DEF)
-    name, tokens1 = get_or_riot(tokens0, TokenSpecies.ID)
-    _, tokens2 = get_or_riot(tokens1, TokenSpecies.OPENBR)
-    param, tokens3 = parse_def_parameters(tokens2)
-    _, tokens4 = get_or_riot(tokens3, TokenSpecies.CLOSEBR)
-    instr, tokens5 = parse_instructions(tokens4)
-    _, tokens6 = get_or_riot(tokens5, TokenSpecies.END)
-
-    function_define = [FuncDefNode(name, param, instr)]
-    return function_define + parser(tokens6) if len(tokens6) != 0 else function_define
+def parser(tokens: Tuple[Token, ...]) -> Tuple[FuncDefNode, ...]:
+    """ Parse functions until no tokens are left, tokens can be a TokenStream that forgets every parsed function. """
+    function_define, pos = parse_function(tokens, 0)
+    functions = [function_define]
+    while token_at(tokens, pos) is not None:
+        function_define, pos = parse_function(tokens, pos)
+        functions.append(function_define)
+    return tuple(functions)
 
 
-# parse_instructions :: List[Token] -> Tuple[List[Type[ActionNode]], List[Token]]
+# parse_function :: Tuple[Token, ...] -> int -> Tuple[FuncDefNode, int]
 @deepcopy_decorator
-def parse_instructions(tokens: List[Token]) -> Tuple[List[Type[ActionNode]], List[Token]]:
+def parse_function(tokens: Tuple[Token, ...], pos: int) -> Tuple[FuncDefNode, int]:
+    """ Parse a single function definition starting at pos. """
+    _, pos0 = get_or_riot(tokens, pos, TokenSpecies.DEF)
+    name, pos1 = get_or_riot(tokens, pos0, TokenSpecies.ID)
+    _, pos2 = get_or_riot(tokens, pos1, TokenSpecies.OPENBR)
+    param, pos3 = parse_def_parameters(tokens, pos2)
+    _, pos4 = get_or_riot(tokens, pos3, TokenSpecies.CLOSEBR)
+    instr, pos5 = parse_instructions(tokens, pos4)
+    _, pos6 = get_or_riot(tokens, pos5, TokenSpecies.END)
+    if isinstance(tokens, TokenStream):
+        tokens.release(pos6)
+    return FuncDefNode(name, param, instr), pos6
+
+
+# parse_instructions :: Tuple[Token, ...] -> int -> Tuple[Tuple[Type[ActionNode], ...], int]
+@deepcopy_decorator
+def parse_instructions(tokens: Tuple[Token, ...], pos: int) -> Tuple[Tuple[Type[ActionNode], ...], int]:
     """ Parse instructions until a final ending token is encountered. """
-    if is_front(tokens, [TokenSpecies.ID]):
-        name, *tokens0 = tokens
-        _, tokens1 = get_or_riot(tokens0, TokenSpecies.ASSIGN)
-        value, tokens2 = parse_value(tokens1)
-        node = AssignNode(name, value)
-
-    elif is_front(tokens, [TokenSpecies.PRINT]):
-        _, *tokens0 = tokens
-        opened, tokens1 = get_or_riot(tokens0, TokenSpecies.OPENBR)
-        elements, tokens2 = parse_params(tokens1)
+    nodes = []
+    node, pos0 = parse_instruction(tokens, pos)
+    while node is not None:
+        nodes.append(node)
+        node, pos0 = parse_instruction(tokens, pos0)
+    return tuple(nodes), pos0
+
+
+# parse_instruction :: Tuple[Token, ...] -> int -> Tuple[Optional[Type[ActionNode]], int]
+@deepcopy_decorator
+def parse_instruction(tokens: Tuple[Token, ...], pos: int) -> Tuple[Optional[Type[ActionNode]], int]:
+    """ Parse a single instruction with its ending token, returns None if there is no instruction at pos. """
+    if is_front(tokens, pos, (TokenSpecies.ID,)):
+        _, pos1 = get_or_riot(tokens, pos + 1, TokenSpecies.ASSIGN)
+        value, pos2 = parse_value(tokens, pos1)
+        node = AssignNode(tokens[pos], value)
+
+    elif is_front(tokens, pos, (TokenSpecies.PRINT,)):
+        opened, pos1 = get_or_riot(tokens, pos + 1, TokenSpecies.OPENBR)
+        elements, pos2 = parse_params(tokens, pos1)
         node = PrintNode(elements, opened.pos)
 
-    elif is_front(tokens, [TokenSpecies.WHILE, TokenSpecies.IF]):
-        is_while = TokenSpecies.WHILE == tokens[0].species
+    elif is_front(tokens, pos, (TokenSpecies.WHILE, TokenSpecies.IF)):
+        is_while = TokenSpecies.WHILE == tokens[pos].species
 
-        _, tokens0 = get_or_riot(tokens[1:], TokenSpecies.OPENBR)
-        parameters, tokens1 = parse_value(tokens0)
-        _, tokens1_0 = get_or_riot(tokens1, TokenSpecies.CLOSEBR)
+        _, pos0 = get_or_riot(tokens, pos + 1, TokenSpecies.OPENBR)
+        parameters, pos1 = parse_value(tokens, pos0)
+        _, pos1_0 = get_or_riot(tokens, pos1, TokenSpecies.CLOSEBR)
 
-        instructions, tokens2 = parse_instructions(tokens1_0)
+        instructions, pos2 = parse_instructions(tokens, pos1_0)
         node = IfWhileNode(parameters, instructions, is_while)
     else:
-        return [], tokens
+        return None, pos
 
-    _, tokens3 = get_or_riot(tokens2, TokenSpecies.END)
-    other_nodes, tokens4 = parse_instructions(tokens3)
-    return [node] + other_nodes, tokens4
+    _, pos3 = get_or_riot(tokens, pos2, TokenSpecies.END)
+    return node, pos3
 
 
-# parse_params :: List[Token] -> Tuple[List[Type[ValueNode]], List[Token]]
+# parse_params :: Tuple[Token, ...] -> int -> Tuple[Tuple[Type[ValueNode], ...], int]
 @deepcopy_decorator
-def parse_params(tokens: List[Token]) -> Tuple[List[Type[ValueNode]], List[Token]]:
+def parse_params(tokens: Tuple[Token, ...], pos: int) -> Tuple[Tuple[Type[ValueNode], ...], int]:
     """ Parse values until an ending token is encountered. """
-    val, tokens0 = parse_value(tokens)
-    if is_front(tokens0, [TokenSpecies.SEP]):
-        _, *tokens1 = tokens0
-        other_val, tokens2 = parse_params(tokens1)
-        return [val] + other_val, tokens2
+    val, pos0 = parse_value(tokens, pos)
+    values = [val]
+    while is_front(tokens, pos0, (TokenSpecies.SEP,)):
+        val, pos0 = parse_value(tokens, pos0 + 1)
+        values.append(val)
 
-    _, tokens3 = get_or_riot(tokens0, TokenSpecies.CLOSEBR)
-    return [val], tokens3
+    _, pos1 = get_or_riot(tokens, pos0, TokenSpecies.CLOSEBR)
+    return tuple(values), pos1
 
 
-# parse_value :: List[Token] -> Token -> Optional[Type[ValueNode]] -> Tuple[Type[Node], List[Token]]
+# parse_value :: Tuple[Token, ...] -> int -> Token -> Optional[Type[ValueNode]] -> Tuple[Type[Node], int]
 @deepcopy_decorator
-def parse_value(tokens: List[Token], operation: Optional[Token] = None, lhs: Optional[Type[ValueNode]] = None) -> Tuple[Type[ValueNode], List[Token]]:
+def parse_value(tokens: Tuple[Token, ...], pos: int, operation: Optional[Token] = None, lhs: Optional[Type[ValueNode]] = None) -> Tuple[Type[ValueNode], int]:
     """ Parse value until an ending token is encountered. """
-    if is_front(tokens, [TokenSpecies.DIGIT]):
-        value_token, *tokens0 = tokens
-        val = IntNode(value_token)
-    elif is_front(tokens, [TokenSpecies.ID]) and is_front(tokens[1:], [TokenSpecies.OPENBR]):
-        name = tokens[0]
-        if is_front(tokens[2:], [TokenSpecies.CLOSEBR]):
-            tokens0 = tokens[3:]
-            val = FuncExeNode(name, [])
+    if is_front(tokens, pos, (TokenSpecies.DIGIT,)):
+        pos0 = pos + 1
+        val = IntNode(tokens[pos])
+    elif is_front(tokens, pos, (TokenSpecies.ID,)) and is_front(tokens, pos + 1, (TokenSpecies.OPENBR,)):
+        name = tokens[pos]
+        if is_front(tokens, pos + 2, (TokenSpecies.CLOSEBR,)):
+            pos0 = pos + 3
+            val = FuncExeNode(name, ())
         else:
-            pars, tokens0 = parse_params(tokens[2:])
+            pars, pos0 = parse_params(tokens, pos + 2)
             val = FuncExeNode(name, pars)
 
-    elif is_front(tokens, [TokenSpecies.ID]):
-        name, *tokens0 = tokens
-        val = VariableNode(name)
+    elif is_front(tokens, pos, (TokenSpecies.ID,)):
+        pos0 = pos + 1
+        val = VariableNode(tokens[pos])
     else:
-        raise ParserError("value, variable or function", tokens[0] if len(tokens) != 0 else None)
+        raise ParserError("value, variable or function", token_at(tokens, pos))
 
-    add_sub = [TokenSpecies.ADD, TokenSpecies.SUB]
-    div_mul = [TokenSpecies.DIV, TokenSpecies.MUL]
-    ne_ge_eq_le = [TokenSpecies.NOTEQUAL, TokenSpecies.GREATER, TokenSpecies.EQUALS, TokenSpecies.LESSER]
+    add_sub = (TokenSpecies.ADD, TokenSpecies.SUB)
+    div_mul = (TokenSpecies.DIV, TokenSpecies.MUL)
+    ne_ge_eq_le = (TokenSpecies.NOTEQUAL, TokenSpecies.GREATER, TokenSpecies.EQUALS, TokenSpecies.LESSER)
 
-    if (is_front(tokens0, div_mul) and operation is not None and operation.species in add_sub) \
-            or (is_front(tokens0, ne_ge_eq_le) and operation is not None and operation.species in add_sub + div_mul):
-        rhs, tokens1 = parse_value(tokens0[1:], tokens0[0], val)
+    if (is_front(tokens, pos0, div_mul) and operation is not None and operation.species in add_sub) \
+            or (is_front(tokens, pos0, ne_ge_eq_le) and operation is not None and operation.species in add_sub + div_mul):
+        rhs, pos1 = parse_value(tokens, pos0 + 1, tokens[pos0], val)
         val1 = OperationNode(lhs, operation, rhs)
     else:
         val01 = OperationNode(lhs, operation, val) if lhs else val
-        if is_front(tokens0, add_sub + div_mul + ne_ge_eq_le):
-            val1, tokens1 = parse_value(tokens0[1:], tokens0[0], val01)
+        if is_front(tokens, pos0, add_sub + div_mul + ne_ge_eq_le):
+            val1, pos1 = parse_value(tokens, pos0 + 1, tokens[pos0], val01)
         else:
             val1 = val01
-            tokens1 = tokens0
+            pos1 = pos0
 
-    if is_front(tokens1, [TokenSpecies.SEP, TokenSpecies.CLOSEBR, TokenSpecies.END]):
-        return val1, tokens1
+    if is_front(tokens, pos1, (TokenSpecies.SEP, TokenSpecies.CLOSEBR, TokenSpecies.END)):
+        return val1, pos1
 
-    raise ParserError(TokenSpecies.END.name, tokens1[0] if len(tokens1) != 0 else None)
+    raise ParserError(TokenSpecies.END.name, token_at(tokens, pos1))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+from classes import *
+import time
+
+
+class Profile(Shared):
+    """ Counters and timings that the runner fills while it runs a Worse program with profiling on.
+    calls, inclusive and exclusive are per Worse function, the time of a recursive function is only counted once in
+    inclusive. iterations counts how often the body of each IfWhileNode ran by (position, is_while) and operations
+    counts the evaluations of every operator. stacks is the exclusive time per stack of calls, for flame graphs.
+    A stack is numbered in paths by the number of the stack of its caller and the name of the function it ends with,
+    so entering a call doesn't take longer the deeper the recursion is. """
+    __slots__ = ("calls", "inclusive", "exclusive", "iterations", "operations", "paths", "stacks", "frames", "active", "clock")
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """ Init for Profile, clock gives the time in seconds. """
+        self.calls = {}
+        self.inclusive = {}
+        self.exclusive = {}
+        self.iterations = {}
+        self.operations = {}
+        self.paths = {}
+        self.stacks = {}
+        # Every open call as [name, start, time spent in its callees, number of its stack].
+        self.frames = []
+        self.active = {}
+        self.clock = clock
+
+    def enter(self, name: str) -> None:
+        """ Starts timing a call to function name. """
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.active[name] = self.active.get(name, 0) + 1
+        path = self.paths.setdefault((self.frames[-1][3] if self.frames else -1, name), len(self.paths))
+        self.frames.append([name, self.clock(), 0.0, path])
+
+    def leave(self) -> None:
+        """ Stops timing the innermost call. """
+        name, start, callees, path = self.frames.pop()
+        elapsed = self.clock() - start
+        self.active[name] -= 1
+        if self.active[name] == 0:
+            self.inclusive[name] = self.inclusive.get(name, 0.0) + elapsed
+        self.exclusive[name] = self.exclusive.get(name, 0.0) + elapsed - callees
+        self.stacks[path] = self.stacks.get(path, 0.0) + elapsed - callees
+        if self.frames:
+            self.frames[-1][2] += elapsed
+
+    def close(self) -> None:
+        """ Stops timing every call that is still open, like when the run failed halfway. """
+        while self.frames:
+            self.leave()
+
+    def iteration(self, loop: IfWhileNode) -> None:
+        """ Counts a run of the body of loop. """
+        key = loop.pos, loop.is_while
+        self.iterations[key] = self.iterations.get(key, 0) + 1
+
+    def operation(self, operator: TokenSpecies) -> None:
+        """ Counts an evaluation of operator. """
+        self.operations[operator] = self.operations.get(operator, 0) + 1
+
+    def table(self) -> str:
+        """ Returns the profile as text, every section is sorted with the most expensive first. """
+        functions = sorted(self.calls.keys(), key=lambda name: (-self.inclusive.get(name, 0.0), name))
+        loops = sorted(self.iterations.items(), key=lambda item: (-item[1], item[0]))
+        operations = sorted(self.operations.items(), key=lambda item: (-item[1], item[0].name))
+        return "\n".join(
+            [f"{'function':<20} {'calls':>10} {'inclusive (ms)':>15} {'exclusive (ms)':>15}"] +
+            list(map(lambda name: f"{name:<20} {self.calls[name]:>10} {self.inclusive.get(name, 0.0) * 1000:>15.3f} "
+                                  f"{self.exclusive.get(name, 0.0) * 1000:>15.3f}", functions)) +
+            ["", f"{'loop':<20} {'iterations':>10}"] +
+            list(map(lambda item: f"{('while' if item[0][1] else 'if') + ' at ' + str(item[0][0]):<20} {item[1]:>10}", loops)) +
+            ["", f"{'operator':<20} {'evaluations':>10}"] +
+            list(map(lambda item: f"{item[0].name:<20} {item[1]:>10}", operations)))
+
+    def collapsed(self) -> str:
+        """ Returns the stacks in the collapsed format of flamegraph.pl, with the exclusive time in microseconds. """
+        # A stack is always numbered after the stack of its caller, so the names of the caller are known by then.
+        names = {-1: ""}
+        for (caller, name), path in self.paths.items():
+            names[path] = names[caller] + ";" + name if caller != -1 else name
+        stacks = sorted(map(lambda item: (names[item[0]], item[1]), self.stacks.items()))
+        return "".join(map(lambda item: f"{item[0]} {round(item[1] * 1_000_000)}\n", stacks))
+
+    def write_collapsed(self, filename: str) -> None:
+        """ Writes the collapsed stacks to filename. """
+        file = open(filename, "w")
+        file.write(self.collapsed())
+        file.close()
+
+    def __str__(self) -> str:
+        return f"Profile of {sum(self.calls.values())} calls to {len(self.calls)} functions"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+if __name__ == "__main__":
+    from lexer import lexer
+    from parse import parser
+    from runner import runner
+
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    profile = Profile()
+    runner(parser(lexer(file_content)), "main", None, None, profile)
+    print(profile.table())
@@ -0,0 +1,54 @@
+from lexer import lexer
+from parse import parser
+from classes import *
+from itertools import chain
+
+
+# walk :: Any -> Tuple[Type[Node], ...]
+@deepcopy_decorator
+def walk(tree: Any) -> Tuple[Type[Node], ...]:
+    """ Returns every node in a node or a tuple of nodes, parents before their children. """
+    if isinstance(tree, tuple):
+        return tuple(chain.from_iterable(map(walk, tree)))
+    elif isinstance(tree, Node):
+        return (tree,) + walk(tuple(filter(lambda field: isinstance(field, (Node, tuple)), tree.fields().values())))
+    return ()
+
+
+# called_functions :: FuncDefNode -> FrozenSet[str]
+@deepcopy_decorator
+def called_functions(function: FuncDefNode) -> FrozenSet[str]:
+    """ Returns the names of all functions that are called by function. """
+    return frozenset(map(lambda node: node.name, filter(lambda node: isinstance(node, FuncExeNode), walk(function.actions))))
+
+
+# prints :: FuncDefNode -> bool
+@deepcopy_decorator
+def prints(function: FuncDefNode) -> bool:
+    """ Returns True if function contains a print itself. """
+    return any(map(lambda node: isinstance(node, PrintNode), walk(function.actions)))
+
+
+# pure_functions :: Tuple[FuncDefNode, ...] -> FrozenSet[str]
+@deepcopy_decorator
+def pure_functions(ast: Tuple[FuncDefNode, ...]) -> FrozenSet[str]:
+    """ Returns the names of the functions that don't print and only call functions that don't print either.
+    The result of a pure function only depends on its parameters, so it can be remembered. """
+    functions = FrozenDict(map(lambda func: (func.name, func), ast))
+    calls = FrozenDict(map(lambda name: (name, called_functions(functions[name])), functions.keys()))
+
+    impure = frozenset(filter(lambda name: prints(functions[name]), functions.keys()))
+    spread = impure | frozenset(filter(lambda name: calls[name] & impure, functions.keys()))
+    while spread != impure:
+        impure = spread
+        spread = impure | frozenset(filter(lambda name: calls[name] & impure, functions.keys()))
+    return frozenset(functions.keys()) - impure
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    tokenized_code = lexer(file_content)
+    print(pure_functions(parser(tokenized_code)))
@@ -0,0 +1,108 @@
+from lexer import lexer
+from parse import parser
+from compiler import collect_names
+from purity import walk
+from classes import *
+
+
+Problems = Tuple[str, ...]
+
+
+# resolve_value :: Type[ValueNode] -> Dict[str, int] -> Dict[str, bool] -> Dict[str, FuncDefNode] -> Dict[str, int] -> Tuple[Type[ValueNode], Problems]
+@deepcopy_decorator
+def resolve_value(value: Type[ValueNode], slots: Dict[str, int], assigned: Dict[str, bool], functions: Dict[str, FuncDefNode],
+                  index: Dict[str, int]) -> Tuple[Type[ValueNode], Problems]:
+    """ Resolves a value, a variable that is never assigned or a call that can't succeed is reported as a problem. """
+    if isinstance(value, OperationNode):
+        lhs, lhs_problems = resolve_value(value.lhs, slots, assigned, functions, index)
+        rhs, rhs_problems = resolve_value(value.rhs, slots, assigned, functions, index)
+        return ApplyNode(value, lhs, rhs), lhs_problems + rhs_problems
+
+    elif isinstance(value, VariableNode):
+        problems = () if value.name in assigned else (f"Variable \"{value.name}\" at character {value.pos} not defined.",)
+        return SlotNode(value, slots[value.name]), problems
+
+    elif isinstance(value, IntNode):
+        return ConstNode(int(value.value), value.pos), ()
+
+    # FuncExeNode
+    if value.name not in functions.keys():
+        # The error is raised before the params are evaluated.
+        msg = f"Function \"{value.name}\" at character {value.pos} does not exist."
+        return FailNode(msg, (), value.pos), (msg,)
+    params, problems = resolve_values(value.params, slots, assigned, functions, index)
+    if len(value.params) != len(functions[value.name].params):
+        msg = f"Params for \"{value.name}\" given at character {value.pos} dont match function."
+        return FailNode(msg, params, value.pos), problems + (msg,)
+    return CallNode(value, params, index[value.name]), problems
+
+
+# resolve_values :: Tuple[Type[ValueNode], ...] -> Dict[str, int] -> Dict[str, bool] -> Dict[str, FuncDefNode] -> Dict[str, int] -> Tuple[Tuple[Type[ValueNode], ...], Problems]
+@deepcopy_decorator
+def resolve_values(values: Tuple[Type[ValueNode], ...], slots: Dict[str, int], assigned: Dict[str, bool], functions: Dict[str, FuncDefNode],
+                   index: Dict[str, int]) -> Tuple[Tuple[Type[ValueNode], ...], Problems]:
+    """ Resolves every value in values. """
+    resolved = tuple(map(lambda value: resolve_value(value, slots, assigned, functions, index), values))
+    return tuple(map(lambda res: res[0], resolved)), sum(map(lambda res: res[1], resolved), ())
+
+
+# resolve_actions :: Tuple[Type[ActionNode], ...] -> Dict[str, int] -> Dict[str, bool] -> Dict[str, FuncDefNode] -> Dict[str, int] -> Tuple[Tuple[Type[ActionNode], ...], Problems]
+@deepcopy_decorator
+def resolve_actions(actions: Tuple[Type[ActionNode], ...], slots: Dict[str, int], assigned: Dict[str, bool], functions: Dict[str, FuncDefNode],
+                    index: Dict[str, int]) -> Tuple[Tuple[Type[ActionNode], ...], Problems]:
+    """ Resolves actions, assignments write to the slot of their variable. """
+    def resolve_action(action: Type[ActionNode]) -> Tuple[Type[ActionNode], Problems]:
+        if isinstance(action, AssignNode):
+            value, problems = resolve_value(action.value, slots, assigned, functions, index)
+            return SlotAssignNode(action, value, slots[action.name]), problems
+
+        elif isinstance(action, PrintNode):
+            values, problems = resolve_values(action.value, slots, assigned, functions, index)
+            return replace(action, value=values), problems
+
+        # IfWhileNode
+        condition, condition_problems = resolve_value(action.condition, slots, assigned, functions, index)
+        body, body_problems = resolve_actions(action.actions, slots, assigned, functions, index)
+        return replace(action, condition=condition, actions=body), condition_problems + body_problems
+
+    resolved = tuple(map(resolve_action, actions))
+    return tuple(map(lambda res: res[0], resolved)), sum(map(lambda res: res[1], resolved), ())
+
+
+# resolve_function :: FuncDefNode -> Dict[str, FuncDefNode] -> Dict[str, int] -> Tuple[ResolvedFunction, Problems]
+@deepcopy_decorator
+def resolve_function(function: FuncDefNode, functions: Dict[str, FuncDefNode], index: Dict[str, int]) -> Tuple[ResolvedFunction, Problems]:
+    """ Gives every variable of a function a slot, the params get the first slots in order. """
+    varnames = tuple(dict.fromkeys(function.params + collect_names(function.actions) + ("sos",)))
+    slots = FrozenDict(map(lambda slot: (varnames[slot], slot), range(len(varnames))))
+    # A FrozenDict instead of a frozenset, so deepcopy_decorator doesn't check every name on every call.
+    assignments = filter(lambda node: isinstance(node, AssignNode), walk(function.actions))
+    assigned = FrozenDict(map(lambda name: (name, True), function.params + tuple(map(lambda node: node.name, assignments))))
+
+    actions, problems = resolve_actions(function.actions, slots, assigned, functions, index)
+    if "sos" not in assigned:
+        problems += (f"Function \"{function.name}\" at character {function.pos} doesn't assign a value to sos",)
+    return ResolvedFunction(function, varnames, actions), problems
+
+
+# resolver :: Tuple[FuncDefNode, ...] -> Resolution
+@deepcopy_decorator
+def resolver(ast: Tuple[FuncDefNode, ...]) -> Resolution:
+    """ Resolves every variable to a slot and every call to the index of its function, a later definition of a
+    function replaces an earlier one. The problems are the errors that are raised when their code is run. """
+    functions = FrozenDict(map(lambda func: (func.name, func), ast))
+    index = FrozenDict(map(lambda name, i: (name, i), functions.keys(), range(len(functions))))
+    resolved = tuple(map(lambda func: resolve_function(func, functions, index), functions.values()))
+    problems = tuple(dict.fromkeys(sum(map(lambda res: res[1], resolved), ())))
+    return Resolution(tuple(map(lambda res: res[0], resolved)), problems)
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    tokenized_code = lexer(file_content)
+    resolution = resolver(parser(tokenized_code))
+    print(resolution)
+    print("\n".join(resolution.problems))
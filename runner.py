@@ -1,9 +1,16 @@
 from lexer import lexer
 from parse import parser
+from purity import pure_functions
+from resolver import resolver
+from sinks import Sink, BufferedSink, ChannelSink
+from profiler import Profile
+from parallel import Parallel
 from classes import *
-import operator
-from functools import reduce
+from collections import OrderedDict
+from typing import Generator
+import asyncio
 import sys
+import time
 sys.setrecursionlimit(10000)
 
 
@@ -13,108 +20,374 @@ class RunnerError(Exception):
         super().__init__(msg)
 
 
+class LimitError(RunnerError):
+    """ Error for when a run exceeds one of its Limits, pos is the character where it was stopped. """
+    def __init__(self, msg: str, pos: int):
+        super().__init__(msg)
+        self.pos = pos
+
+
+class Limits(Frozen):
+    """ Budget of a run, None means no limit. fuel is the amount of steps, which are calls and runs of the body of
+    an IfWhileNode, depth the amount of calls that may be running at once and seconds the wall clock time. """
+    __slots__ = ("fuel", "depth", "seconds")
+
+    def __init__(self, fuel: Optional[int] = None, depth: Optional[int] = None, seconds: Optional[float] = None):
+        """ Init for Limits. """
+        self._set(fuel=fuel, depth=depth, seconds=seconds)
+
+    def unlimited(self) -> bool:
+        """ Returns True if none of the limits is set. """
+        return self.fuel is None and self.depth is None and self.seconds is None
+
+    def __str__(self) -> str:
+        return f"Limits of {self.fuel} steps, {self.depth} calls deep and {self.seconds} seconds"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+NO_LIMITS = Limits()
+
+# Amount of steps after which the clock is read again when a run has a deadline.
+CHECK_INTERVAL = 1024
+
+# Amount of steps after which an async run lets other tasks run.
+STEP_INTERVAL = 1024
+
+
+class MemoCache(Shared):
+    """ Least recently used cache of the results of pure functions, keyed by function name and parameter values. """
+
+    def __init__(self, pure: FrozenSet[str], size: int = 4096):
+        """ Init for MemoCache, a size of 0 turns caching off. """
+        self.pure = pure
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: Tuple[str, Tuple[int, ...]]) -> Optional[int]:
+        """ Returns the remembered result for key or None if it isn't cached. """
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def store(self, key: Tuple[str, Tuple[int, ...]], result: int) -> None:
+        """ Remembers result for key and evicts the least recently used entry when the cache is full. """
+        self.entries[key] = result
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def __str__(self) -> str:
+        return f"MemoCache {len(self.entries)}/{self.size} entries, {self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
 # get_op_func :: Type[Enum] -> Callable
 @deepcopy_decorator
 def get_op_func(species: Type[Enum]) -> Callable:
     """ Give corresponding function to enum"""
-    op = {TokenSpecies.ADD: operator.add,
-          TokenSpecies.SUB: operator.sub,
-          TokenSpecies.GREATER: operator.gt,
-          TokenSpecies.LESSER: operator.lt,
-          TokenSpecies.EQUALS: operator.eq,
-          TokenSpecies.NOTEQUAL: operator.ne,
-          TokenSpecies.MUL: operator.mul,
-          TokenSpecies.DIV: operator.floordiv}
-    return op[species]
-
-
-# get_value :: Type[ValueNode] -> Dict[str, int] -> Dict[str, FuncDefNode] -> int
+    return OPERATORS[species]
+
+
+# check_limits :: int -> Limits -> Optional[float] -> int -> int
 @deepcopy_decorator
-def get_value(action: Type[ValueNode], variables: Dict[str, int], functions: Dict[str, FuncDefNode]) -> int:
-    """ Gets integer value of given action. """
-    value = 0
-    if isinstance(action, OperationNode):
-        lhs = get_value(action.lhs, variables, functions)
-        rhs = get_value(action.rhs, variables, functions)
-        value = int(get_op_func(action.operator)(lhs, rhs))
+def check_limits(steps: int, limits: Limits, deadline: Optional[float], pos: int) -> int:
+    """ Raises a LimitError if steps is more than the fuel or the deadline has passed, pos is where the run is.
+    Returns the step at which the limits have to be checked again, or -1 if that is never. """
+    if limits.fuel is not None and steps > limits.fuel:
+        raise LimitError(f"Ran out of fuel after {limits.fuel} steps at character {pos}", pos)
+    if deadline is not None and time.monotonic() > deadline:
+        raise LimitError(f"Ran longer than {limits.seconds} seconds at character {pos}", pos)
+    if deadline is not None:
+        return steps + CHECK_INTERVAL if limits.fuel is None else min(steps + CHECK_INTERVAL, limits.fuel + 1)
+    return limits.fuel + 1 if limits.fuel is not None else -1
 
-    elif isinstance(action, VariableNode):
-        if action.name not in variables.keys():
-            raise RunnerError(f"Variable \"{action.name}\" at character {action.pos} not defined.")
-        value = variables[action.name]
 
-    elif isinstance(action, IntNode):
-        value = int(action.value)
+# next_check :: int -> int -> int
+def next_check(check_at: int, yield_at: int) -> int:
+    """ Returns the first of the steps at which the limits are checked and the run yields, -1 means never. """
+    return min(check_at, yield_at) if check_at != -1 and yield_at != -1 else max(check_at, yield_at)
 
-    elif isinstance(action, FuncExeNode):
-        if action.name not in functions.keys():
-            raise RunnerError(f"Function \"{action.name}\" at character {action.pos} does not exist.")
-        param_values = list(map(lambda val: get_value(val, variables, functions), action.params))
-        if len(param_values) != len(functions[action.name].params.keys()):
-            raise RunnerError(f"Params for \"{action.name}\" given at character {action.pos} dont match function.")
 
-        parameters = dict(zip(functions[action.name].params.keys(), param_values))
-        value = run_function(action.name, parameters, functions)
+# Kinds of tasks on the task stack of run_function.
+EVAL, APPLY, CALL, STORE, PRINT, BRANCH, EXEC, RETURN, FAIL, AWAIT = range(10)
 
-    return value
+# Value of a slot of which the variable hasn't been assigned yet.
+UNSET = None
 
 
-# run_ifwhile :: IfWhileNode -> Dict[str, int] -> Dict[str, FuncDefNode] -> Dict[str, int]
-@deepcopy_decorator
-def run_ifwhile(loop: IfWhileNode, variables: Dict[str, int], functions: Dict[str, FuncDefNode]) -> Dict[str, int]:
-    """ Run if or while loop recursively. """
-    if get_value(loop.condition, variables, functions) != 0:
-        new_vars = reduce(lambda var, action: run_action(var, functions, action), loop.actions, variables)
-        if loop.is_while:
-            return run_ifwhile(loop, new_vars, functions)
-        return new_vars
-    return variables
+class Frame:
+    """ Call of a Worse function, kept on the heap instead of on the Python stack. """
+    __slots__ = ("function", "variables", "memo_key")
 
+    def __init__(self, function: ResolvedFunction, variables: List[Optional[int]], memo_key: Optional[Tuple[str, Tuple[int, ...]]]):
+        """ Init for Frame, variables has a slot for every variable of function and memo_key is the key to remember
+        the result under or None if it isn't remembered. """
+        self.function = function
+        self.variables = variables
+        self.memo_key = memo_key
 
-# run_action :: Dict[str, int] -> Dict[str, FuncDefNode] -> Type[ActionNode] -> Dict[str, int]
-@deepcopy_decorator
-def run_action(var: Dict[str, int], funcs: Dict[str, FuncDefNode], action: Type[ActionNode]) -> Dict[str, int]:
-    """ Runs action and returns updated variables and unchanged functions for the use of reduce. """
+    def __str__(self) -> str:
+        return f"Frame {self.function.name} {dict(zip(self.function.varnames, self.variables))}"
 
-    if isinstance(action, AssignNode):
-        new_vars = {**var, **{action.name: get_value(action.value, var, funcs)}}
-    elif isinstance(action, PrintNode):
-        print("".join(map(lambda val: chr(get_value(val, var, funcs)), action.value)))
-        new_vars = var
-    else:  # isinstance(action, IfWhileNode):
-        new_vars = run_ifwhile(action, var, funcs)
-    return new_vars
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# run_function ::  str -> Tuple[int, ...] -> Resolution -> MemoCache -> Sink -> Optional[Profile] -> Limits -> Optional[Parallel] -> int
+@deepcopy_decorator
+def run_function(func_name: str, params: Tuple[int, ...], resolution: Resolution, memo: MemoCache, sink: Sink,
+                 profile: Optional[Profile] = None, limits: Limits = NO_LIMITS, parallel: Optional[Parallel] = None) -> int:
+    """ Execute function and return the "sos" variable, results of pure functions come from memo when possible.
+    Prints are written to sink. With a profile the calls, loops and operators are counted in it, calls that come
+    from memo aren't counted. A LimitError is raised when the run goes over one of its limits. With parallel, calls
+    that are arguments of the same call or operation can be sent to its pool, which has to be started.
+    Calls, values and actions are kept on explicit stacks so the depth of the Worse recursion doesn't use the
+    Python stack. A call that is the last assignment to sos before a function returns reuses the frame of its caller,
+    except in a profiled run, which keeps every caller on the stack so its inclusive time contains its callees. """
+    steps = run_steps(func_name, params, resolution, memo, sink, profile, limits, parallel)
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
 
 
-# run_function ::  str -> Dict[str, int] ->  Dict[str, FuncDefNode] -> int
+# run_steps :: str -> Tuple[int, ...] -> Resolution -> MemoCache -> Sink -> Optional[Profile] -> Limits -> Optional[Parallel] -> Optional[int] -> Generator[int, None, int]
 @deepcopy_decorator
-def run_function(func_name: str, variables: Dict[str, int], functions: Dict[str, FuncDefNode]) -> int:
-    """ Execute function and return the "sos" variable. """
+def run_steps(func_name: str, params: Tuple[int, ...], resolution: Resolution, memo: MemoCache, sink: Sink,
+              profile: Optional[Profile] = None, limits: Limits = NO_LIMITS, parallel: Optional[Parallel] = None,
+              interval: Optional[int] = None) -> Generator[int, None, int]:
+    """ Runs function like run_function does, as a generator that returns the "sos" variable. With an interval it
+    yields the amount of steps every interval steps, so the run can be suspended there and resumed later. The
+    state of the run is on its own stacks, so nothing has to be saved to suspend it. """
     # Check is func exists.
-    if func_name not in functions.keys():
+    if func_name not in resolution.index.keys():
         raise RunnerError(f"Function \"{func_name}\" not defined")
 
-    # Run function
-    new_vars = reduce(lambda var, action: run_action(var, functions, action), functions[func_name].actions, variables)
+    functions = resolution.functions
+    function = functions[resolution.index[func_name]]
+    key = func_name, tuple(params)
+    is_memoized = memo.size != 0 and func_name in memo.pure
+    if is_memoized and (cached := memo.lookup(key)) is not None:
+        return cached
 
-    # Check if function returns value.
-    if "sos" in new_vars.keys():
-        return new_vars["sos"]
-    raise RunnerError(f"Function \"{func_name}\" at character {functions[func_name].pos} doesn't assign a value to sos")
+    deadline = time.monotonic() + limits.seconds if limits.seconds is not None else None
+    max_depth = limits.depth if limits.depth is not None else sys.maxsize
+    steps = 0
+    yield_at = interval if interval is not None else -1
+    check_at = next_check(check_limits(steps, limits, deadline, function.pos), yield_at)
 
+    frame = Frame(function, list(params) + [UNSET] * (len(function.varnames) - len(params)), key if is_memoized else None)
+    if profile is not None:
+        profile.enter(func_name)
+    frames = [frame]
+    values = []
+    tasks = [(RETURN, function)] + list(map(lambda action: (EXEC, action), reversed(function.actions)))
 
-# runner ::  List[FuncDefNode] -> str -> None
+    while tasks:
+        kind, node = tasks.pop()
+
+        if kind == EVAL:
+            if isinstance(node, ConstNode):
+                values.append(node.value)
+
+            elif isinstance(node, SlotNode):
+                value = frame.variables[node.slot]
+                if value is UNSET:
+                    raise RunnerError(f"Variable \"{node.name}\" at character {node.pos} not defined.")
+                values.append(value)
+
+            elif isinstance(node, ApplyNode):
+                if parallel is None or (plan := parallel.plan((node.lhs, node.rhs), frame.variables)) is None:
+                    tasks += ((APPLY, node), (EVAL, node.rhs), (EVAL, node.lhs))
+                else:
+                    tasks.append((APPLY, node))
+                    tasks += map(lambda step: (EVAL if step[0] == "eval" else AWAIT, step[1]), reversed(plan))
+
+            elif isinstance(node, CallNode):
+                tasks.append((CALL, node))
+                if parallel is None or (plan := parallel.plan(node.params, frame.variables)) is None:
+                    tasks += map(lambda param: (EVAL, param), reversed(node.params))
+                else:
+                    tasks += map(lambda step: (EVAL if step[0] == "eval" else AWAIT, step[1]), reversed(plan))
+
+            else:  # isinstance(node, FailNode)
+                tasks.append((FAIL, node))
+                tasks += map(lambda param: (EVAL, param), reversed(node.params))
+
+        elif kind == APPLY:
+            rhs = values.pop()
+            lhs = values.pop()
+            values.append(int(node.function(lhs, rhs)))
+            if profile is not None:
+                profile.operation(node.operator)
+
+        elif kind == EXEC:
+            if isinstance(node, SlotAssignNode):
+                tasks += ((STORE, node), (EVAL, node.value))
+            elif isinstance(node, PrintNode):
+                tasks.append((PRINT, node))
+                tasks += map(lambda val: (EVAL, val), reversed(node.value))
+            else:  # isinstance(node, IfWhileNode)
+                tasks += ((BRANCH, node), (EVAL, node.condition))
+
+        elif kind == STORE:
+            frame.variables[node.slot] = values.pop()
+
+        elif kind == PRINT:
+            characters = values[len(values) - len(node.value):]
+            del values[len(values) - len(node.value):]
+            sink.print_chars(characters)
+
+        elif kind == BRANCH:
+            if values.pop() != 0:
+                steps += 1
+                if steps == check_at:
+                    if steps == yield_at:
+                        yield steps
+                        yield_at += interval
+                    check_at = next_check(check_limits(steps, limits, deadline, node.pos), yield_at)
+                if profile is not None:
+                    profile.iteration(node)
+                if node.is_while:
+                    tasks += ((BRANCH, node), (EVAL, node.condition))
+                tasks += map(lambda action: (EXEC, action), reversed(node.actions))
+
+        elif kind == CALL:
+            steps += 1
+            if steps == check_at:
+                if steps == yield_at:
+                    yield steps
+                    yield_at += interval
+                check_at = next_check(check_limits(steps, limits, deadline, node.pos), yield_at)
+            callee = functions[node.callee]
+            param_values = tuple(values[len(values) - callee.argcount:])
+            del values[len(values) - callee.argcount:]
+
+            key = callee.name, param_values
+            is_memoized = memo.size != 0 and callee.name in memo.pure
+            if is_memoized and (cached := memo.lookup(key)) is not None:
+                values.append(cached)
+                continue
+
+            frame = Frame(callee, list(param_values) + [UNSET] * (len(callee.varnames) - callee.argcount), key if is_memoized else None)
+            if profile is None and tasks[-1][0] == STORE and tasks[-1][1].name == "sos" and tasks[-2][0] == RETURN:
+                # Tail call, the result of the callee is the result of the caller. Not with a profile, the caller
+                # has to stay on the profiled stack until its callee returns.
+                tasks.pop()
+                tasks[-1] = (RETURN, callee)
+                frames[-1] = frame
+            else:
+                if len(frames) == max_depth:
+                    raise LimitError(f"Calls went deeper than {max_depth} at character {node.pos}", node.pos)
+                tasks.append((RETURN, callee))
+                frames.append(frame)
+            if profile is not None:
+                profile.enter(callee.name)
+            tasks += map(lambda action: (EXEC, action), reversed(callee.actions))
+
+        elif kind == RETURN:
+            # Check if function returns value.
+            result = frame.variables[node.sos]
+            if result is UNSET:
+                raise RunnerError(f"Function \"{node.name}\" at character {node.pos} doesn't assign a value to sos")
+            if frame.memo_key is not None:
+                memo.store(frame.memo_key, result)
+            frames.pop()
+            frame = frames[-1] if frames else None
+            if profile is not None:
+                profile.leave()
+            values.append(result)
+
+        elif kind == AWAIT:
+            values.append(parallel.wait(node))
+
+        else:  # kind == FAIL
+            raise RunnerError(node.message)
+
+    return values.pop()
+
+
+# runner ::  Tuple[FuncDefNode, ...] -> str -> Optional[MemoCache] -> Optional[Sink] -> Optional[Profile] -> Limits -> None
 @deepcopy_decorator
-def runner(ast: List[FuncDefNode], start_func_name: str = "main") -> None:
-    """ Runs the ast by executing the start_func_name. """
+def runner(ast: Tuple[FuncDefNode, ...], start_func_name: str = "main", memo: Optional[MemoCache] = None,
+           sink: Optional[Sink] = None, profile: Optional[Profile] = None, limits: Limits = NO_LIMITS,
+           parallel: Optional[Parallel] = None) -> None:
+    """ Runs the ast by executing the start_func_name, calls to pure functions are remembered in memo.
+    The ast is resolved first, so variables are read from slots and calls go straight to their function.
+    All output goes to sink, which is flushed when the run ends. Without a sink it is buffered to sys.stdout.
+    The run is profiled in profile if one is given, also when it fails. A run that goes over one of its limits is
+    stopped with a LimitError. With parallel, independent calls of pure functions may run on its pool. """
+
+    memo = memo if memo is not None else MemoCache(pure_functions(ast))
+    return run_resolved(resolver(ast), start_func_name, memo, sink, profile, limits, parallel)
 
-    functions = dict(map(lambda func: (func.name, func), ast))
-    print(f"Process starting with function: {start_func_name}")
-    result = run_function(start_func_name, {}, functions)
-    print(f"Process finished with {result}")
+
+# run_resolved ::  Resolution -> str -> MemoCache -> Optional[Sink] -> Optional[Profile] -> Limits -> Optional[Parallel] -> int
+@deepcopy_decorator
+def run_resolved(resolution: Resolution, start_func_name: str, memo: MemoCache, sink: Optional[Sink] = None,
+                 profile: Optional[Profile] = None, limits: Limits = NO_LIMITS, parallel: Optional[Parallel] = None) -> int:
+    """ Runs a program that is already resolved like runner does, so a resolution can be kept and run again.
+    The pool of parallel is started for the run and stopped after it. """
+    sink = sink if sink is not None else BufferedSink()
+    try:
+        if parallel is not None:
+            parallel.start(resolution, memo.pure, memo.size)
+        sink.write(f"Process starting with function: {start_func_name}\n")
+        result = run_function(start_func_name, (), resolution, memo, sink, profile, limits, parallel)
+        sink.write(f"Process finished with {result}\n")
+    finally:
+        sink.flush()
+        if profile is not None:
+            profile.close()
+        if parallel is not None:
+            parallel.close()
     return result
 
 
+# async_runner :: Tuple[FuncDefNode, ...] -> str -> Optional[MemoCache] -> Optional[Sink] -> Limits -> int -> int
+async def async_runner(ast: Tuple[FuncDefNode, ...], start_func_name: str = "main", memo: Optional[MemoCache] = None,
+                       sink: Optional[Sink] = None, limits: Limits = NO_LIMITS, interval: int = STEP_INTERVAL) -> int:
+    """ Runs the ast like runner does, but in a coroutine that lets the event loop run other tasks every interval
+    steps. Many programs can so run at once in a single thread and each of them gets its turn after at most
+    interval steps. """
+    memo = memo if memo is not None else MemoCache(pure_functions(ast))
+    return await run_resolved_async(resolver(ast), start_func_name, memo, sink, limits, interval)
+
+
+# run_resolved_async :: Resolution -> str -> MemoCache -> Optional[Sink] -> Limits -> int -> int
+async def run_resolved_async(resolution: Resolution, start_func_name: str, memo: MemoCache, sink: Optional[Sink] = None,
+                             limits: Limits = NO_LIMITS, interval: int = STEP_INTERVAL) -> int:
+    """ Runs a program that is already resolved like async_runner does. The run can be cancelled like any task,
+    it then stops the next time it lets other tasks run. A timeout of the task is the seconds of limits, which
+    raises a LimitError like it does in runner. A ChannelSink is closed when the run ends, also when it fails. """
+    sink = sink if sink is not None else BufferedSink()
+    try:
+        sink.write(f"Process starting with function: {start_func_name}\n")
+        steps = run_steps(start_func_name, (), resolution, memo, sink, None, limits, None, interval)
+        try:
+            while True:
+                next(steps)
+                await asyncio.sleep(0)
+        except StopIteration as stop:
+            result = stop.value
+        sink.write(f"Process finished with {result}\n")
+    finally:
+        sink.flush()
+        if isinstance(sink, ChannelSink):
+            sink.close()
+    return result
+
 
 if __name__ == "__main__":
     file = open("Worse.txt")
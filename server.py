@@ -0,0 +1,140 @@
+from lexer import lexer, morse_lexer
+from parse import parser
+from resolver import resolver
+from purity import pure_functions
+from optimizer import optimizer, Passes
+from runner import run_resolved_async, MemoCache, Limits
+from cache import source_key
+from sinks import BytesSink
+from main import report_errors
+from classes import *
+from collections import OrderedDict
+import asyncio
+import json
+import os
+import socket
+import sys
+
+
+# A parsed program that is ready to run, as its resolution and the names of its pure functions.
+Prepared = Tuple[Resolution, FrozenSet[str]]
+
+
+class ProgramCache(Shared):
+    """ Least recently used cache of prepared programs, keyed by the source_key of their text. """
+
+    def __init__(self, size: int = 256):
+        """ Init for ProgramCache. """
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, text: str, is_morse: bool) -> Prepared:
+        """ Returns the prepared program of text, it is lexed, parsed, optimized and resolved if it isn't cached. """
+        key = source_key((text,), is_morse)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        # Every request can start at another function, so no function is pruned.
+        ast = optimizer(parser(morse_lexer(text) if is_morse else lexer(text)), "main", Passes(prune=False))[0]
+        self.entries[key] = resolver(ast), pure_functions(ast)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return self.entries[key]
+
+    def __str__(self) -> str:
+        return f"ProgramCache {len(self.entries)}/{self.size} programs, {self.hits} hits, {self.misses} misses"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# run_request :: str -> bool -> str -> Limits -> ProgramCache -> BytesSink -> Optional[int]
+@report_errors
+async def run_request(text: str, is_morse: bool, start: str, limits: Limits, programs: ProgramCache, sink: BytesSink) -> Optional[int]:
+    """ Runs text from start like worse does, but with the parsed program from programs. """
+    resolution, pure = programs.prepare(text, is_morse)
+    return await run_resolved_async(resolution, start, MemoCache(pure), sink, limits)
+
+
+# answer :: Dict[str, Any] -> ProgramCache -> Dict[str, Any]
+async def answer(request: Dict[str, Any], programs: ProgramCache) -> Dict[str, Any]:
+    """ Runs a request with the keys text, morse, start, fuel, depth and seconds, only text is required.
+    Returns the result of the start function, the output and the error, the output ends with the error as well. """
+    limits = Limits(request.get("fuel"), request.get("depth"), request.get("seconds"))
+    text, is_morse, start = request["text"], request.get("morse", False), request.get("start", "main")
+    sink = BytesSink()
+    try:
+        result = await run_request(text, is_morse, start, limits, programs, sink)
+    except Exception as e:
+        # Errors that report_errors leaves alone, like a division by zero or an expression that is nested too deep,
+        # only fail this request and not the connection it came from.
+        sink.write(f"Failed running because: {type(e).__name__}: {e}\n")
+        result = None
+    output = sink.getvalue().decode()
+    return {"result": result, "output": output, "error": output.splitlines()[-1] if result is None and output else None}
+
+
+# serve :: str -> ProgramCache -> None
+async def serve(path: str, programs: ProgramCache) -> None:
+    """ Answers requests on the Unix socket at path until it is cancelled. Every request and every answer is a line of
+    JSON and a connection can send as many requests as it likes. The programs of different connections run at the
+    same time in the event loop, taking turns every STEP_INTERVAL steps. """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await answer(json.loads(line), programs)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    response = {"result": None, "output": "", "error": f"Bad request: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = await asyncio.start_unix_server(handle, path, limit=1 << 24)
+    async with server:
+        await server.serve_forever()
+
+
+class Client:
+    """ Connection to a server, for sending requests one after another. """
+
+    def __init__(self, path: str):
+        """ Init for Client, connects to the socket at path. """
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(path)
+        self.file = self.connection.makefile("rwb")
+
+    def request(self, text: str, **options: Any) -> Dict[str, Any]:
+        """ Runs text on the server with the options of answer and returns the answer. """
+        self.file.write(json.dumps({"text": text, **options}).encode() + b"\n")
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def close(self) -> None:
+        """ Closes the connection. """
+        self.file.close()
+        self.connection.close()
+
+    def __str__(self) -> str:
+        return f"Client of {self.connection.getpeername()}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+if __name__ == "__main__":
+    # python server.py [socket path] [cache size]
+    path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/worse.sock"
+    programs = ProgramCache(int(sys.argv[2]) if len(sys.argv) > 2 else 256)
+    print(f"Serving Worse on {path}", file=sys.stderr)
+    try:
+        asyncio.run(serve(path, programs))
+    except KeyboardInterrupt:
+        print(programs, file=sys.stderr)
@@ -0,0 +1,138 @@
+from classes import *
+from typing import TextIO
+from abc import ABC, abstractmethod
+import asyncio
+import sys
+
+
+# chars_to_text :: List[int] -> str
+def chars_to_text(values: List[int]) -> str:
+    """ Converts the values of a PrintNode to text at once, values above 255 fall back to converting them one by one. """
+    try:
+        return bytes(values).decode("latin-1")
+    except ValueError:
+        return "".join(map(chr, values))
+
+
+class Sink(Shared, ABC):
+    """ Base for the places the output of a Worse program is written to, a sink without write can't be created. """
+    __slots__ = ()
+
+    @abstractmethod
+    def write(self, text: str) -> None:
+        """ Writes text to the sink. """
+
+    def print_chars(self, values: List[int]) -> None:
+        """ Writes the characters of the values of a PrintNode on a line of their own. """
+        self.write(chars_to_text(values) + "\n")
+
+    def flush(self) -> None:
+        """ Writes out everything that is still buffered. """
+
+    def __str__(self) -> str:
+        return type(self).__name__
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class BufferedSink(Sink):
+    """ Sink that collects text and writes it to a stream once size characters are buffered or when flushed. """
+    __slots__ = ("stream", "size", "parts", "buffered")
+
+    def __init__(self, stream: Optional[TextIO] = None, size: int = 1 << 16):
+        """ Init for BufferedSink, without a stream it writes to whatever sys.stdout is at the moment it flushes. """
+        self.stream = stream
+        self.size = size
+        self.parts = []
+        self.buffered = 0
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.parts:
+            stream.write("".join(self.parts))
+            self.parts.clear()
+            self.buffered = 0
+        stream.flush()
+
+    def __str__(self) -> str:
+        return f"BufferedSink with {self.buffered}/{self.size} characters buffered"
+
+
+class FileSink(BufferedSink):
+    """ Sink that writes to a file, which it opens itself and closes with close. """
+    __slots__ = ()
+
+    def __init__(self, filename: str, size: int = 1 << 16):
+        """ Init for FileSink, the file is overwritten. """
+        BufferedSink.__init__(self, open(filename, "w"), size)
+
+    def close(self) -> None:
+        """ Flushes the sink and closes its file. """
+        self.flush()
+        self.stream.close()
+
+    def __str__(self) -> str:
+        return f"FileSink {self.stream.name} with {self.buffered}/{self.size} characters buffered"
+
+
+class BytesSink(Sink):
+    """ Sink that keeps the output in memory as UTF-8 bytes. """
+    __slots__ = ("buffer",)
+
+    def __init__(self):
+        """ Init for BytesSink. """
+        self.buffer = bytearray()
+
+    def write(self, text: str) -> None:
+        self.buffer += text.encode()
+
+    def getvalue(self) -> bytes:
+        """ Returns everything that has been written so far. """
+        return bytes(self.buffer)
+
+    def __str__(self) -> str:
+        return f"BytesSink with {len(self.buffer)} bytes"
+
+
+class DiscardSink(Sink):
+    """ Sink that throws all output away. """
+    __slots__ = ()
+
+    def write(self, text: str) -> None:
+        pass
+
+
+class ChannelSink(Sink):
+    """ Sink that streams the output to an asyncio queue as it is written, so it can be read with async for while
+    the program runs. The output ends when the sink is closed. """
+    __slots__ = ("queue",)
+
+    def __init__(self):
+        """ Init for ChannelSink. """
+        self.queue = asyncio.Queue()
+
+    def write(self, text: str) -> None:
+        self.queue.put_nowait(text)
+
+    def close(self) -> None:
+        """ Ends the output, async for stops once everything before it has been read. """
+        self.queue.put_nowait(None)
+
+    def __aiter__(self) -> "ChannelSink":
+        return self
+
+    async def __anext__(self) -> str:
+        text = await self.queue.get()
+        if text is None:
+            raise StopAsyncIteration
+        return text
+
+    def __str__(self) -> str:
+        return f"ChannelSink with {self.queue.qsize()} parts waiting"
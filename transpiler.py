@@ -0,0 +1,213 @@
+from lexer import lexer
+from parse import parser
+from runner import RunnerError
+from sinks import Sink, BufferedSink
+from classes import *
+from types import TracebackType
+import sys
+
+
+FILENAME = "<worse>"
+
+PY_OPERATORS = {TokenSpecies.ADD: "{} + {}",
+                TokenSpecies.SUB: "{} - {}",
+                TokenSpecies.MUL: "{} * {}",
+                TokenSpecies.DIV: "{} // {}",
+                TokenSpecies.GREATER: "int({} > {})",
+                TokenSpecies.LESSER: "int({} < {})",
+                TokenSpecies.EQUALS: "int({} == {})",
+                TokenSpecies.NOTEQUAL: "int({} != {})"}
+
+# How tightly the Python operator of every arithmetic operator binds, the comparisons are wrapped in a call instead.
+PY_PRECEDENCES = {TokenSpecies.ADD: 1,
+                  TokenSpecies.SUB: 1,
+                  TokenSpecies.MUL: 2,
+                  TokenSpecies.DIV: 2}
+
+# Precedence of an expression that never needs parentheses, like a name, a number or a call.
+ATOM = 3
+
+
+class PyProgram(Frozen):
+    def __init__(self, source: str, lines: Tuple[Any, ...], namespace: Dict[str, Callable]):
+        """ Creates a transpiled program, lines tells for every source line which Worse node it came from. """
+        self._set(source=source, lines=tuple(lines), namespace=FrozenDict(namespace))
+
+    def __str__(self) -> str:
+        return self.source
+
+    def __repr__(self) -> str:
+        return f"PyProgram with {len(self.lines)} lines"
+
+
+# fail :: str -> int -> int
+def fail(msg: str, *values: int) -> int:
+    """ Raises a RunnerError from generated code once the given values have been evaluated. """
+    raise RunnerError(msg)
+
+
+# py_name :: str -> str
+def py_name(name: str) -> str:
+    """ Gives a Worse variable name that can't collide with a Python keyword or a generated name. """
+    return f"v_{name}"
+
+
+# py_func :: str -> str
+def py_func(name: str) -> str:
+    """ Gives a Worse function name that can't collide with a Python keyword or a generated name. """
+    return f"f_{name}"
+
+
+# variables_in :: Type[ValueNode] -> Tuple[VariableNode, ...]
+@deepcopy_decorator
+def variables_in(value: Type[ValueNode]) -> Tuple[VariableNode, ...]:
+    """ Returns the variables in value in the order in which they are evaluated. """
+    if isinstance(value, VariableNode):
+        return value,
+    elif isinstance(value, OperationNode):
+        return variables_in(value.lhs) + variables_in(value.rhs)
+    elif isinstance(value, FuncExeNode):
+        return sum(map(variables_in, value.params), ())
+    return ()
+
+
+# py_precedence :: Type[ValueNode] -> int
+def py_precedence(value: Type[ValueNode]) -> int:
+    """ Returns how tightly the Python expression of value binds. """
+    return PY_PRECEDENCES.get(value.operator, ATOM) if isinstance(value, OperationNode) else ATOM
+
+
+# transpile_value :: Type[ValueNode] -> Dict[str, FuncDefNode] -> str
+@deepcopy_decorator
+def transpile_value(value: Type[ValueNode], functions: Dict[str, FuncDefNode]) -> str:
+    """ Transpiles a value to a Python expression. An operand only gets parentheses when Python would group it
+    differently without them, Python groups operators of the same precedence from the left. So a long chain of
+    operators doesn't nest deeper than the parser of Python allows. """
+    if isinstance(value, OperationNode):
+        # The operands of a comparison are never grouped with it, they are compared inside its call.
+        precedence = PY_PRECEDENCES.get(value.operator, 0)
+        lhs = transpile_value(value.lhs, functions)
+        lhs = f"({lhs})" if py_precedence(value.lhs) < precedence else lhs
+        rhs = transpile_value(value.rhs, functions)
+        rhs = f"({rhs})" if py_precedence(value.rhs) <= precedence else rhs
+        return PY_OPERATORS[value.operator].format(lhs, rhs)
+
+    elif isinstance(value, VariableNode):
+        return py_name(value.name)
+
+    elif isinstance(value, IntNode):
+        return str(int(value.value))
+
+    # FuncExeNode
+    if value.name not in functions.keys():
+        msg = f"Function \"{value.name}\" at character {value.pos} does not exist."
+        return f"fail({msg!r})"
+    params = "".join(map(lambda param: transpile_value(param, functions) + ", ", value.params))
+    if len(value.params) != len(functions[value.name].params):
+        msg = f"Params for \"{value.name}\" given at character {value.pos} dont match function."
+        return f"fail({msg!r}, {params})"
+    return f"{py_func(value.name)}(sink, {params})"
+
+
+# transpile_actions :: Tuple[Type[ActionNode], ...] -> Dict[str, FuncDefNode] -> str -> Tuple[Tuple[str, Tuple[VariableNode, ...]], ...]
+@deepcopy_decorator
+def transpile_actions(actions: Tuple[Type[ActionNode], ...], functions: Dict[str, FuncDefNode], indent: str) -> Tuple[Tuple[str, Tuple[VariableNode, ...]], ...]:
+    """ Transpiles actions to lines of Python with the variables that are read on each line. """
+    def transpile_action(action: Type[ActionNode]) -> Tuple[Tuple[str, Tuple[VariableNode, ...]], ...]:
+        if isinstance(action, AssignNode):
+            return (f"{indent}{py_name(action.name)} = {transpile_value(action.value, functions)}", variables_in(action.value)),
+
+        elif isinstance(action, PrintNode):
+            values = ", ".join(map(lambda val: transpile_value(val, functions), action.value))
+            return (f"{indent}sink.print_chars([{values}])", sum(map(variables_in, action.value), ())),
+
+        # IfWhileNode
+        keyword = "while" if action.is_while else "if"
+        head = f"{indent}{keyword} {transpile_value(action.condition, functions)}:", variables_in(action.condition)
+        body = transpile_actions(action.actions, functions, indent + "    ")
+        return (head,) + (body if body else ((f"{indent}    pass", ()),))
+
+    return sum(map(transpile_action, actions), ())
+
+
+# transpile_function :: FuncDefNode -> Dict[str, FuncDefNode] -> Tuple[Tuple[str, Any], ...]
+@deepcopy_decorator
+def transpile_function(function: FuncDefNode, functions: Dict[str, FuncDefNode]) -> Tuple[Tuple[str, Any], ...]:
+    """ Transpiles a function definition to a Python function that returns sos, prints go to its first param sink. """
+    head = f"def {py_func(function.name)}({', '.join(('sink',) + tuple(map(py_name, function.params)))}):", ()
+    body = transpile_actions(function.actions, functions, "    ")
+    return (head,) + body + ((f"    return {py_name('sos')}", function),)
+
+
+# transpiler :: Tuple[FuncDefNode, ...] -> PyProgram
+@deepcopy_decorator
+def transpiler(ast: Tuple[FuncDefNode, ...]) -> PyProgram:
+    """ Transpiles all functions in the ast to Python and compiles them once. Raises a RunnerError when an expression
+    nests deeper than Python can transpile or compile. """
+    functions = FrozenDict(map(lambda func: (func.name, func), ast))
+    namespace = {"fail": fail}
+    try:
+        lines = sum(map(lambda func: transpile_function(func, functions) + (("", ()),), functions.values()), ())
+        source = "\n".join(map(lambda line: line[0], lines))
+        exec(compile(source, FILENAME, "exec"), namespace)
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        raise RunnerError(f"The program nests deeper than the python target allows: {e}. "
+                          f"Run it without compiling or on the vm instead.") from None
+    return PyProgram(source, map(lambda line: line[1], lines), namespace)
+
+
+# translate_name_error :: PyProgram -> TracebackType -> RunnerError
+def translate_name_error(program: PyProgram, traceback: TracebackType) -> RunnerError:
+    """ Gives the RunnerError the tree walking runner would raise for a NameError of the generated code. """
+    frames = []
+    while traceback is not None:
+        if traceback.tb_frame.f_code.co_filename == FILENAME:
+            frames.append(traceback)
+        traceback = traceback.tb_next
+    origin = program.lines[frames[-1].tb_lineno - 1]
+    if isinstance(origin, FuncDefNode):
+        return RunnerError(f"Function \"{origin.name}\" at character {origin.pos} doesn't assign a value to sos")
+    assigned = frames[-1].tb_frame.f_locals
+    variable = next(filter(lambda var: py_name(var.name) not in assigned, origin))
+    return RunnerError(f"Variable \"{variable.name}\" at character {variable.pos} not defined.")
+
+
+# execute_python :: PyProgram -> str -> Sink -> int
+@deepcopy_decorator
+def execute_python(program: PyProgram, start_func_name: str, sink: Sink) -> int:
+    """ Calls the transpiled start function and returns its sos, prints go to sink.
+    Every Worse call is a Python call, so unlike the tree walking runner and the vm the depth of the recursion is
+    limited by the recursion limit of Python. Going deeper raises a RunnerError. """
+    if py_func(start_func_name) not in program.namespace.keys():
+        raise RunnerError(f"Function \"{start_func_name}\" not defined")
+    try:
+        return program.namespace[py_func(start_func_name)](sink)
+    except NameError as e:
+        raise translate_name_error(program, e.__traceback__) from None
+    except RecursionError:
+        raise RunnerError(f"Calls went deeper than the python target allows, which is about {sys.getrecursionlimit()} "
+                          f"Python calls. Run it without compiling or on the vm instead.") from None
+
+
+# py_runner :: PyProgram -> str -> Optional[Sink] -> int
+@deepcopy_decorator
+def py_runner(program: PyProgram, start_func_name: str = "main", sink: Optional[Sink] = None) -> int:
+    """ Runs the transpiled program by executing the start_func_name, output goes to sink. The depth of the
+    recursion is limited by the recursion limit of Python. """
+    sink = sink if sink is not None else BufferedSink()
+    try:
+        sink.write(f"Process starting with function: {start_func_name}\n")
+        result = execute_python(program, start_func_name, sink)
+        sink.write(f"Process finished with {result}\n")
+    finally:
+        sink.flush()
+    return result
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    tokenized_code = lexer(file_content)
+    print(transpiler(parser(tokenized_code)))
@@ -0,0 +1,175 @@
+from lexer import lexer
+from parse import parser
+from purity import walk, pure_functions
+from resolver import resolver
+from runner import run_function, RunnerError, MemoCache
+from sinks import Sink, BufferedSink
+from classes import *
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# The smallest and largest values that fit in the int64 columns.
+INT_MIN, INT_MAX = -(1 << 63), (1 << 63) - 1
+
+# NumPy function of every operator, filled in when NumPy is available.
+UFUNCS = FrozenDict({TokenSpecies.ADD: numpy.add,
+                     TokenSpecies.SUB: numpy.subtract,
+                     TokenSpecies.MUL: numpy.multiply,
+                     TokenSpecies.DIV: numpy.floor_divide,
+                     TokenSpecies.GREATER: numpy.greater,
+                     TokenSpecies.LESSER: numpy.less,
+                     TokenSpecies.EQUALS: numpy.equal,
+                     TokenSpecies.NOTEQUAL: numpy.not_equal}) if numpy is not None else FrozenDict()
+
+
+class Vectors(Shared):
+    """ The int64 column of every variable of one vectorized run, the rows in which each of them is defined and the rows
+    that have to be run per element. They are changed in place while the body runs. """
+
+    def __init__(self, variables: List[Optional[Any]], defined: List[Any], fallback):
+        """ Init for Vectors, a variable that hasn't been assigned in any row yet has no column. """
+        self.variables = variables
+        self.defined = defined
+        self.fallback = fallback
+
+    def __str__(self) -> str:
+        return f"Vectors of {len(self.variables)} variables over {len(self.fallback)} rows, {int(self.fallback.sum())} run per element"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# is_vectorizable :: ResolvedFunction -> bool
+@deepcopy_decorator
+def is_vectorizable(function: ResolvedFunction) -> bool:
+    """ Returns True if the body of function only assigns and branches with if, on values without calls and with
+    constants that fit in an int64. Everything else is run per element. """
+    return numpy is not None and all(map(lambda node: isinstance(node, (SlotAssignNode, SlotNode, ApplyNode))
+                                         or (isinstance(node, IfWhileNode) and not node.is_while)
+                                         or (isinstance(node, ConstNode) and INT_MIN <= node.value <= INT_MAX),
+                                         walk(function.actions)))
+
+
+# overflows :: Type[Enum] -> numpy.ndarray -> numpy.ndarray -> numpy.ndarray -> numpy.ndarray
+@deepcopy_decorator
+def overflows(operator: Type[Enum], lhs, rhs, result):
+    """ Returns the mask of elements of which the int64 result of operator differs from the Python int. """
+    if operator == TokenSpecies.ADD:
+        return ((lhs ^ result) & (rhs ^ result)) < 0
+    elif operator == TokenSpecies.SUB:
+        return ((lhs ^ rhs) & (lhs ^ result)) < 0
+    elif operator == TokenSpecies.MUL:
+        # Products that are close to the limits are checked per element as well, floats are only approximate.
+        return numpy.abs(lhs.astype(numpy.float64) * rhs.astype(numpy.float64)) >= 2.0 ** 62
+    elif operator == TokenSpecies.DIV:
+        return (lhs == INT_MIN) & (rhs == -1)
+    return numpy.zeros(len(lhs), dtype=bool)
+
+
+# vector_value :: Type[ValueNode] -> Vectors -> numpy.ndarray -> numpy.ndarray
+@deepcopy_decorator
+def vector_value(node: Type[ValueNode], vectors: Vectors, active):
+    """ Evaluates node for every element at once. Elements that are active and would fail or overflow here are
+    marked in the fallback of vectors, their values are meaningless from then on. """
+    if isinstance(node, ConstNode):
+        return numpy.full(len(active), node.value, dtype=numpy.int64)
+
+    elif isinstance(node, SlotNode):
+        vectors.fallback |= active & ~vectors.defined[node.slot]
+        return vectors.variables[node.slot] if vectors.variables[node.slot] is not None else numpy.zeros(len(active), dtype=numpy.int64)
+
+    # ApplyNode
+    lhs = vector_value(node.lhs, vectors, active)
+    rhs = vector_value(node.rhs, vectors, active)
+    if node.operator == TokenSpecies.DIV:
+        zero = rhs == 0
+        vectors.fallback |= active & zero
+        rhs = numpy.where(zero, 1, rhs)
+    result = UFUNCS[node.operator](lhs, rhs).astype(numpy.int64)
+    vectors.fallback |= active & overflows(node.operator, lhs, rhs, result)
+    return result
+
+
+# vector_actions :: Tuple[Type[ActionNode], ...] -> Vectors -> numpy.ndarray -> None
+@deepcopy_decorator
+def vector_actions(actions: Tuple[Type[ActionNode], ...], vectors: Vectors, active) -> None:
+    """ Runs actions for every element at once, only the active elements are changed. An if becomes a select:
+    its body is run for all elements, but only the elements for which the condition holds are active in it. """
+    for action in actions:
+        if isinstance(action, SlotAssignNode):
+            value = vector_value(action.value, vectors, active)
+            old = vectors.variables[action.slot]
+            vectors.variables[action.slot] = value if old is None and active.all() else numpy.where(active, value, old if old is not None else 0)
+            vectors.defined[action.slot] = vectors.defined[action.slot] | active
+        else:  # IfWhileNode, without while
+            condition = vector_value(action.condition, vectors, active)
+            vector_actions(action.actions, vectors, active & (condition != 0))
+
+
+# vectorized :: FuncDefNode -> Tuple[Tuple[int, ...], ...] -> Tuple[FuncDefNode, ...] -> Optional[Sink] -> Tuple[int, ...]
+def vectorized(function: FuncDefNode, columns: Tuple[Tuple[int, ...], ...], ast: Tuple[FuncDefNode, ...] = (),
+               sink: Optional[Sink] = None) -> Tuple[int, ...]:
+    """ Runs function once for every row of columns, which has a column of values for every param, and returns the
+    results in order. The results and the errors are the same as those of run_function for every row, ast has the
+    functions that function can call.
+    With NumPy, a body that only assigns and branches with if is run on whole columns of int64 at once. Rows that
+    don't fit in an int64, overflow or fail are run per element afterwards, so big ints, -- and errors behave
+    exactly like they do in the runner. Bodies with while loops, calls or prints are run per element, prints are
+    written to sink.
+    It has no deepcopy_decorator, checking that every value of the columns is immutable costs about as much as the
+    vectorized run itself. The columns are only read. """
+    if len(columns) != len(function.params):
+        raise RunnerError(f"Params for \"{function.name}\" given at character {function.pos} dont match function.")
+    rows = len(columns[0]) if columns else 0
+    if any(map(lambda column: len(column) != rows, columns)):
+        raise ValueError("Every column should have the same amount of values")
+
+    # The function itself is added last, so it replaces an earlier definition with the same name.
+    program = tuple(ast) + (function,)
+    resolution = resolver(program)
+    resolved = resolution.functions[resolution.index[function.name]]
+    memo = MemoCache(pure_functions(program))
+    sink = sink if sink is not None else BufferedSink()
+
+    def run_row(row: int) -> int:
+        return run_function(function.name, tuple(map(lambda column: column[row], columns)), resolution, memo, sink)
+
+    try:
+        if not is_vectorizable(resolved) or rows == 0:
+            return tuple(map(run_row, range(rows)))
+
+        params = tuple(map(lambda column: numpy.array(column, dtype=object), columns))
+        fallback = numpy.zeros(rows, dtype=bool)
+        for param in params:
+            fallback |= (param < INT_MIN) | (param > INT_MAX)
+        vectors = Vectors(list(map(lambda param: numpy.where(fallback, 0, param).astype(numpy.int64), params)) +
+                          [None] * (len(resolved.varnames) - resolved.argcount),
+                          [numpy.ones(rows, dtype=bool)] * resolved.argcount +
+                          [numpy.zeros(rows, dtype=bool)] * (len(resolved.varnames) - resolved.argcount),
+                          fallback)
+
+        with numpy.errstate(all="ignore"):
+            vector_actions(resolved.actions, vectors, numpy.ones(rows, dtype=bool))
+        vectors.fallback |= ~vectors.defined[resolved.sos]
+
+        sos = vectors.variables[resolved.sos]
+        results = sos.tolist() if sos is not None else [0] * rows
+        for row in numpy.flatnonzero(vectors.fallback).tolist():
+            results[row] = run_row(row)
+        return tuple(results)
+    finally:
+        sink.flush()
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    ast = parser(lexer(file_content))
+    function = next(filter(lambda func: len(func.params) == 1, ast), None)
+    if function is not None:
+        print(function.name, vectorized(function, (range(0, 21),), ast))
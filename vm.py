@@ -0,0 +1,111 @@
+from lexer import lexer
+from parse import parser
+from compiler import compiler
+from runner import RunnerError
+from sinks import Sink, BufferedSink
+from classes import *
+
+
+UNSET = None
+
+
+# execute :: Program -> str -> Sink -> int
+@deepcopy_decorator
+def execute(program: Program, start_func_name: str, sink: Sink) -> int:
+    """ Executes the bytecode of the start function with a dispatch loop and returns its sos, prints go to sink. """
+    if start_func_name not in program.index.keys():
+        raise RunnerError(f"Function \"{start_func_name}\" not defined")
+
+    CONST, LOAD, STORE, ADD, SUB, MUL, DIV, EQUALS, NOTEQUAL, GREATER, LESSER, \
+        JUMP, JUMP_IF_ZERO, CALL, RETURN, PRINT, RAISE = map(int, Opcode)
+    codes = program.codes
+
+    code = codes[program.index[start_func_name]]
+    ops = code.ops
+    variables = [UNSET] * len(code.varnames)
+    stack = []
+    frames = []
+    pc = 0
+
+    while True:
+        op, arg = ops[pc]
+        pc += 1
+        if op == LOAD:
+            value = variables[arg]
+            if value is UNSET:
+                raise RunnerError(f"Variable \"{code.varnames[arg]}\" at character {code.positions[pc - 1]} not defined.")
+            stack.append(value)
+        elif op == CONST:
+            stack.append(arg)
+        elif op == STORE:
+            variables[arg] = stack.pop()
+        elif op == JUMP_IF_ZERO:
+            if stack.pop() == 0:
+                pc += arg
+        elif op == JUMP:
+            pc += arg
+        elif op <= LESSER:
+            rhs = stack.pop()
+            lhs = stack.pop()
+            if op == ADD:
+                stack.append(lhs + rhs)
+            elif op == SUB:
+                stack.append(lhs - rhs)
+            elif op == MUL:
+                stack.append(lhs * rhs)
+            elif op == DIV:
+                stack.append(lhs // rhs)
+            elif op == EQUALS:
+                stack.append(int(lhs == rhs))
+            elif op == NOTEQUAL:
+                stack.append(int(lhs != rhs))
+            elif op == GREATER:
+                stack.append(int(lhs > rhs))
+            else:
+                stack.append(int(lhs < rhs))
+        elif op == CALL:
+            frames.append((code, ops, variables, pc))
+            code = codes[arg]
+            ops = code.ops
+            variables = [UNSET] * len(code.varnames)
+            if code.argcount:
+                variables[:code.argcount] = stack[-code.argcount:]
+                del stack[-code.argcount:]
+            pc = 0
+        elif op == RETURN:
+            result = variables[arg]
+            if result is UNSET:
+                raise RunnerError(f"Function \"{code.name}\" at character {code.pos} doesn't assign a value to sos")
+            if not frames:
+                return result
+            stack.append(result)
+            code, ops, variables, pc = frames.pop()
+        elif op == PRINT:
+            characters = stack[len(stack) - arg:]
+            del stack[len(stack) - arg:]
+            sink.print_chars(characters)
+        else:  # op == RAISE
+            raise RunnerError(arg)
+
+
+# vm_runner :: Program -> str -> Optional[Sink] -> int
+@deepcopy_decorator
+def vm_runner(program: Program, start_func_name: str = "main", sink: Optional[Sink] = None) -> int:
+    """ Runs the compiled program by executing the start_func_name on the virtual machine, output goes to sink. """
+    sink = sink if sink is not None else BufferedSink()
+    try:
+        sink.write(f"Process starting with function: {start_func_name}\n")
+        result = execute(program, start_func_name, sink)
+        sink.write(f"Process finished with {result}\n")
+    finally:
+        sink.flush()
+    return result
+
+
+if __name__ == "__main__":
+    file = open("Worse.txt")
+    file_content = file.read()
+    file.close()
+
+    tokenized_code = lexer(file_content)
+    vm_runner(compiler(parser(tokenized_code)))